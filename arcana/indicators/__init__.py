@@ -1,2 +1,8 @@
-from .indicators import SMA, ESMA, EMA, WMA, RMA, HMA, FRAMA, TEMA, DEMA, KAMA
-from .cfg import SMACfg, ESMACfg, EMACfg, WMACfg, RMACfg, HMACgf, FRAMACfg, TEMACfg, DEMACfg, KAMACfg
+from .indicators import SMA, ESMA, EMA, WMA, RMA, HMA, FRAMA, TEMA, DEMA, KAMA, MACD, BollingerBands, KeltnerChannel
+from .cfg import (SMACfg, ESMACfg, EMACfg, WMACfg, RMACfg, HMACfg, HMACgf, FRAMACfg, TEMACfg, DEMACfg, KAMACfg, MovingAverageGridCfg,
+                  MACDCfg, BollingerBandsCfg, KeltnerChannelCfg)
+from .columnar import ColumnarIndicator
+from .sharding import compute_sharded
+
+from .streaming import (StreamingSMA, StreamingESMA, StreamingEMA, StreamingWMA, StreamingRMA, StreamingHMA,
+                        StreamingFRAMA, StreamingTEMA, StreamingDEMA, StreamingKAMA)
@@ -1,17 +1,24 @@
 from arcana.price_data.dev_types import PriceDataColumns
 
+import numpy as np
 from numpy import ndarray
 from collections.abc import Iterable
 from pandas import DataFrame, Index
 import ctypes
 
+# arrays are passed by pointer without copying (e.g. memory-mapped columns), only strided
+# inputs (a column of a DataFrame built from a 2-D array) are packed first, outputs are always contiguous
 CONVERSION_MAP = {
-    "to_d_ptr": lambda x: x.ctypes.data_as(ctypes.POINTER(ctypes.c_double)),
+    "to_d_ptr": lambda x: np.ascontiguousarray(x).ctypes.data_as(ctypes.POINTER(ctypes.c_double)),
+    "to_f_ptr": lambda x: np.ascontiguousarray(x).ctypes.data_as(ctypes.POINTER(ctypes.c_float)),
+    "to_i_ptr": lambda x: np.ascontiguousarray(x).ctypes.data_as(ctypes.POINTER(ctypes.c_int)),
     "to_i": ctypes.c_int,
     "to_d": ctypes.c_double,
 }
 SUP_CONVERSION_MAP = {
     "to_d_ptr": Iterable | ndarray,
+    "to_f_ptr": Iterable | ndarray,
+    "to_i_ptr": Iterable | ndarray,
     "to_i": Iterable | int,
     "to_d": Iterable | float,
 }
@@ -34,6 +41,28 @@ def ma_prepare_data_to_c(**kwargs):
 
     return res
 
+def ma_ptr_key(dtype) -> str:
+    """Return the conversion of float arrays of the dtype (float64 -> "to_d_ptr", float32 -> "to_f_ptr")."""
+    return "to_f_ptr" if np.dtype(dtype) == np.float32 else "to_d_ptr"
+
+def ma_stack_rows(rows: Iterable[ndarray], dtype=np.float64) -> tuple[ndarray, ndarray]:
+    """
+    Pack 1-D series into a contiguous row-major matrix for the batched C kernels.
+
+    Every row starts at column 0 and is padded with NaN up to the longest series.
+
+    :param rows: the 1-D series (one per symbol)
+    :param dtype: dtype of the matrix. default is float64
+    :return: the (n_rows, n_cols) matrix and the int32 array of row lengths
+    """
+    rows = list(rows)
+    lens = np.fromiter((len(row) for row in rows), dtype=np.intc, count=len(rows))
+    n_cols = int(lens.max()) if len(rows) else 0
+    matrix = np.full((len(rows), n_cols), np.nan, dtype=dtype)
+    for i, row in enumerate(rows):
+        matrix[i, :lens[i]] = row
+    return matrix, lens
+
 def ma_numpy_to_dataframe(data: Iterable, index: Index, symbol: str, name: str) -> DataFrame:
     df = DataFrame(data, columns=[name])
     df[PriceDataColumns.DATE] = index
@@ -41,3 +70,8 @@ def ma_numpy_to_dataframe(data: Iterable, index: Index, symbol: str, name: str)
     df[PriceDataColumns.SYMBOL] = symbol
     df = df.reindex(columns=[PriceDataColumns.SYMBOL, name])
     return df
+
+def ma_grid_to_dataframe(data: ndarray, index: Index, symbol: str, names: list[str]) -> DataFrame:
+    df = DataFrame(data, columns=names, index=index.rename(PriceDataColumns.DATE), copy=False)
+    df.insert(0, PriceDataColumns.SYMBOL, symbol)
+    return df
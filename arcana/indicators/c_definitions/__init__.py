@@ -1,12 +1,49 @@
 import ctypes
+import os
+from pathlib import Path
 
-ma_lib = ctypes.CDLL(r"D:\Arcana\arcana\indicators\c_definitions\moving_averages.dll")
+from .build import C_DEFINITIONS, library_name
+
+# version of indicators.h the bindings below are written for (MA_VERSION)
+MA_VERSION = 25
+_BUILD = f"python {C_DEFINITIONS / 'build.py'}"
+
+
+def _load_library() -> ctypes.CDLL:
+    """Load the library ($ARCANA_MA_LIB or the library of this platform in c_definitions) and check its version."""
+    path = Path(os.environ.get("ARCANA_MA_LIB") or C_DEFINITIONS / library_name())
+    if not path.is_file():
+        raise ImportError(f"There is no moving averages library at {path}. Build it with: {_BUILD}")
+    lib = ctypes.CDLL(str(path))
+    try:
+        lib.ma_version.argtypes = []
+        lib.ma_version.restype = ctypes.c_int
+        version = lib.ma_version()
+    except AttributeError:
+        version = None
+    if version != MA_VERSION:
+        raise ImportError(f"The moving averages library at {path} is out of date "
+                          f"(version {version} != {MA_VERSION}). Rebuild it with: {_BUILD}")
+    return lib
+
+
+ma_lib = _load_library()
 
 _D_PTR = [ctypes.POINTER(ctypes.c_double)]
+_I_PTR = [ctypes.POINTER(ctypes.c_int)]
 _I = [ctypes.c_int]
 _D = [ctypes.c_double]
 
 _BASE_MA_ARGS = 2*_D_PTR + 2*_I
+_BASE_MA_BATCH_ARGS = 2*_D_PTR + _I_PTR + 3*_I
+_BASE_MA_GRID_ARGS = 2*_D_PTR + _I_PTR + 2*_I
+
+# per-thread scratch space of the composite kernels (grows only, reused across calls)
+ma_lib.ma_scratch_size.argtypes = []
+ma_lib.ma_scratch_size.restype = ctypes.c_size_t
+
+ma_lib.ma_scratch_release.argtypes = []
+ma_lib.ma_scratch_release.restype = None
 
 ma_lib.sma.argtypes = _BASE_MA_ARGS
 ma_lib.sma.restype = None
@@ -38,6 +75,105 @@ ma_lib.kama.restype = None
 ma_lib.frama.argtypes = 4*_D_PTR + 2*_I
 ma_lib.frama.restype = None
 
+# batched moving averages (symbols x bars matrix)
+ma_lib.sma_batch.argtypes = _BASE_MA_BATCH_ARGS
+ma_lib.sma_batch.restype = None
+
+ma_lib.esma_batch.argtypes = _BASE_MA_BATCH_ARGS + _D
+ma_lib.esma_batch.restype = None
+
+ma_lib.ema_batch.argtypes = _BASE_MA_BATCH_ARGS
+ma_lib.ema_batch.restype = None
+
+ma_lib.wma_batch.argtypes = _BASE_MA_BATCH_ARGS
+ma_lib.wma_batch.restype = None
+
+ma_lib.hma_batch.argtypes = _BASE_MA_BATCH_ARGS
+ma_lib.hma_batch.restype = None
+
+ma_lib.rma_batch.argtypes = _BASE_MA_BATCH_ARGS
+ma_lib.rma_batch.restype = None
+
+ma_lib.tema_batch.argtypes = _BASE_MA_BATCH_ARGS
+ma_lib.tema_batch.restype = None
+
+ma_lib.dema_batch.argtypes = _BASE_MA_BATCH_ARGS
+ma_lib.dema_batch.restype = None
+
+ma_lib.kama_batch.argtypes = _BASE_MA_BATCH_ARGS + 2*_I
+ma_lib.kama_batch.restype = None
+
+ma_lib.frama_batch.argtypes = 4*_D_PTR + _I_PTR + 3*_I
+ma_lib.frama_batch.restype = None
+
+# parameter grids (bars x periods matrix)
+ma_lib.sma_grid.argtypes = _BASE_MA_GRID_ARGS
+ma_lib.sma_grid.restype = None
+
+ma_lib.ema_grid.argtypes = _BASE_MA_GRID_ARGS
+ma_lib.ema_grid.restype = None
+
+ma_lib.wma_grid.argtypes = _BASE_MA_GRID_ARGS
+ma_lib.wma_grid.restype = None
+
+ma_lib.rma_grid.argtypes = _BASE_MA_GRID_ARGS
+ma_lib.rma_grid.restype = None
+
+ma_lib.tema_grid.argtypes = _BASE_MA_GRID_ARGS
+ma_lib.tema_grid.restype = None
+
+ma_lib.dema_grid.argtypes = _BASE_MA_GRID_ARGS
+ma_lib.dema_grid.restype = None
+
+# single precision variants (float data and output, double accumulators)
+_F_PTR = [ctypes.POINTER(ctypes.c_float)]
+
+_BASE_MA_F32_ARGS = 2*_F_PTR + 2*_I
+_BASE_MA_BATCH_F32_ARGS = 2*_F_PTR + _I_PTR + 3*_I
+
+for _name in ("sma", "ema", "wma", "hma", "rma", "tema", "dema"):
+    getattr(ma_lib, f"{_name}_f32").argtypes = _BASE_MA_F32_ARGS
+    getattr(ma_lib, f"{_name}_f32").restype = None
+    getattr(ma_lib, f"{_name}_batch_f32").argtypes = _BASE_MA_BATCH_F32_ARGS
+    getattr(ma_lib, f"{_name}_batch_f32").restype = None
+
+ma_lib.esma_f32.argtypes = _BASE_MA_F32_ARGS + _D
+ma_lib.esma_f32.restype = None
+
+ma_lib.kama_f32.argtypes = _BASE_MA_F32_ARGS + 2*_I
+ma_lib.kama_f32.restype = None
+
+ma_lib.frama_f32.argtypes = 4*_F_PTR + 2*_I
+ma_lib.frama_f32.restype = None
+
+ma_lib.esma_batch_f32.argtypes = _BASE_MA_BATCH_F32_ARGS + _D
+ma_lib.esma_batch_f32.restype = None
+
+ma_lib.kama_batch_f32.argtypes = _BASE_MA_BATCH_F32_ARGS + 2*_I
+ma_lib.kama_batch_f32.restype = None
+
+ma_lib.frama_batch_f32.argtypes = 4*_F_PTR + _I_PTR + 3*_I
+ma_lib.frama_batch_f32.restype = None
+
+# multi-output indicators (data, outputs, extra inputs)
+ma_lib.macd.argtypes = 4*_D_PTR + 4*_I
+ma_lib.macd.restype = None
+
+ma_lib.bollinger.argtypes = 4*_D_PTR + 2*_I + _D
+ma_lib.bollinger.restype = None
+
+ma_lib.keltner.argtypes = 7*_D_PTR + 3*_I + _D
+ma_lib.keltner.restype = None
+
+ma_lib.macd_batch.argtypes = 4*_D_PTR + _I_PTR + 5*_I
+ma_lib.macd_batch.restype = None
+
+ma_lib.bollinger_batch.argtypes = 4*_D_PTR + _I_PTR + 3*_I + _D
+ma_lib.bollinger_batch.restype = None
+
+ma_lib.keltner_batch.argtypes = 7*_D_PTR + _I_PTR + 4*_I + _D
+ma_lib.keltner_batch.restype = None
+
 '''import numpy as np
 from arcana.indicators.adapters import ma_prepare_data_to_c
 
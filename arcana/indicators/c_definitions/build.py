@@ -0,0 +1,59 @@
+"""
+Build the moving averages library next to its sources:
+
+    python arcana/indicators/c_definitions/build.py [--cc gcc] [--output path]
+
+It is a standalone script, since importing arcana.indicators needs the library. The bindings check
+the version of the library at import, so it has to be rebuilt after every change of moving_averages.c
+or indicators.h.
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+C_DEFINITIONS = Path(__file__).parent
+SOURCES = (C_DEFINITIONS / "moving_averages.c",)
+
+
+def library_name() -> str:
+    """Return the file name of the library on this platform."""
+    if sys.platform == "win32":
+        return "moving_averages.dll"
+    if sys.platform == "darwin":
+        return "libmoving_averages.dylib"
+    return "libmoving_averages.so"
+
+
+def build(output: str | Path = None, cc: str = None) -> Path:
+    """
+    Compile the library.
+
+    :param output: path of the library. default is the library of this platform in c_definitions
+    :param cc: C compiler. default is $CC, then gcc, cc or clang (the first found)
+    :return: path of the library
+    """
+    output = Path(output) if output is not None else C_DEFINITIONS / library_name()
+    cc = cc or os.environ.get("CC") or next((c for c in ("gcc", "cc", "clang") if shutil.which(c)), None)
+    if cc is None:
+        raise RuntimeError("There is no C compiler. Install gcc or clang or set CC.")
+    flags = ["-O2", "-shared", "-std=c11"]
+    if sys.platform != "win32":
+        flags.append("-fPIC")
+    cmd = [cc, *flags, "-o", str(output), *map(str, SOURCES), "-lm"]
+    subprocess.run(cmd, check=True)
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the moving averages library.")
+    parser.add_argument("--cc", default=None, help="C compiler")
+    parser.add_argument("--output", default=None, help="path of the library")
+    args = parser.parse_args()
+    print(build(args.output, args.cc))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,17 @@
-#ifdef INDICATORS_H
+#ifndef INDICATORS_H
 #define INDICATORS_H
 
+#include <stddef.h>
+
+// bumped whenever an export is added or changed, the Python bindings refuse an older library
+#define MA_VERSION 25
+
+int ma_version(void);
+
+// per-thread scratch space used by the composite kernels
+size_t ma_scratch_size(void);
+void ma_scratch_release(void);
+
 // moving averages
 void sma(const double *data, double *out, const int len, const int period);
 void esma(const double *data, double *out, const int len, const int period, const double alpha);
@@ -13,5 +24,60 @@ void dema(const double *data, double *out, const int len, const int period);
 void kama(const double *data, double *out, const int len, const int period, const int n_fast, const int n_slow);
 void frama(const double *data, double *out, const double *high, const double *low, const int len, const int period);
 
+// batched moving averages over a row-major n_rows x n_cols matrix, row r holds lens[r] bars
+void sma_batch(const double *data, double *out, const int *lens, const int n_rows, const int n_cols, const int period);
+void esma_batch(const double *data, double *out, const int *lens, const int n_rows, const int n_cols, const int period, const double alpha);
+void ema_batch(const double *data, double *out, const int *lens, const int n_rows, const int n_cols, const int period);
+void wma_batch(const double *data, double *out, const int *lens, const int n_rows, const int n_cols, const int period);
+void hma_batch(const double *data, double *out, const int *lens, const int n_rows, const int n_cols, const int period);
+void rma_batch(const double *data, double *out, const int *lens, const int n_rows, const int n_cols, const int period);
+void tema_batch(const double *data, double *out, const int *lens, const int n_rows, const int n_cols, const int period);
+void dema_batch(const double *data, double *out, const int *lens, const int n_rows, const int n_cols, const int period);
+void kama_batch(const double *data, double *out, const int *lens, const int n_rows, const int n_cols, const int period, const int n_fast, const int n_slow);
+void frama_batch(const double *data, double *out, const double *high, const double *low, const int *lens, const int n_rows, const int n_cols, const int period);
+
+// parameter grids, out is a row-major len x n_periods matrix (bars x periods)
+void sma_grid(const double *data, double *out, const int *periods, const int len, const int n_periods);
+void ema_grid(const double *data, double *out, const int *periods, const int len, const int n_periods);
+void wma_grid(const double *data, double *out, const int *periods, const int len, const int n_periods);
+void rma_grid(const double *data, double *out, const int *periods, const int len, const int n_periods);
+void tema_grid(const double *data, double *out, const int *periods, const int len, const int n_periods);
+void dema_grid(const double *data, double *out, const int *periods, const int len, const int n_periods);
+
+// single precision variants (float data and output, double accumulators)
+void sma_f32(const float *data, float *out, const int len, const int period);
+void esma_f32(const float *data, float *out, const int len, const int period, const double alpha);
+void ema_f32(const float *data, float *out, const int len, const int period);
+void wma_f32(const float *data, float *out, const int len, const int period);
+void hma_f32(const float *data, float *out, const int len, const int period);
+void rma_f32(const float *data, float *out, const int len, const int period);
+void tema_f32(const float *data, float *out, const int len, const int period);
+void dema_f32(const float *data, float *out, const int len, const int period);
+void kama_f32(const float *data, float *out, const int len, const int period, const int n_fast, const int n_slow);
+void frama_f32(const float *data, float *out, const float *high, const float *low, const int len, const int period);
+
+void sma_batch_f32(const float *data, float *out, const int *lens, const int n_rows, const int n_cols, const int period);
+void esma_batch_f32(const float *data, float *out, const int *lens, const int n_rows, const int n_cols, const int period, const double alpha);
+void ema_batch_f32(const float *data, float *out, const int *lens, const int n_rows, const int n_cols, const int period);
+void wma_batch_f32(const float *data, float *out, const int *lens, const int n_rows, const int n_cols, const int period);
+void hma_batch_f32(const float *data, float *out, const int *lens, const int n_rows, const int n_cols, const int period);
+void rma_batch_f32(const float *data, float *out, const int *lens, const int n_rows, const int n_cols, const int period);
+void tema_batch_f32(const float *data, float *out, const int *lens, const int n_rows, const int n_cols, const int period);
+void dema_batch_f32(const float *data, float *out, const int *lens, const int n_rows, const int n_cols, const int period);
+void kama_batch_f32(const float *data, float *out, const int *lens, const int n_rows, const int n_cols, const int period, const int n_fast, const int n_slow);
+void frama_batch_f32(const float *data, float *out, const float *high, const float *low, const int *lens, const int n_rows, const int n_cols, const int period);
+
+// multi-output indicators (every output is written in the same traversal)
+void macd(const double *data, double *line, double *signal, double *hist, const int len, const int fast, const int slow, const int signal_period);
+void bollinger(const double *data, double *mid, double *upper, double *lower, const int len, const int period, const double mult);
+void keltner(const double *data, double *mid, double *upper, double *lower, const double *high, const double *low, const double *close,
+             const int len, const int period, const int atr_period, const double mult);
+
+void macd_batch(const double *data, double *line, double *signal, double *hist, const int *lens, const int n_rows, const int n_cols,
+                const int fast, const int slow, const int signal_period);
+void bollinger_batch(const double *data, double *mid, double *upper, double *lower, const int *lens, const int n_rows, const int n_cols,
+                     const int period, const double mult);
+void keltner_batch(const double *data, double *mid, double *upper, double *lower, const double *high, const double *low, const double *close,
+                   const int *lens, const int n_rows, const int n_cols, const int period, const int atr_period, const double mult);
 
 #endif
\ No newline at end of file
@@ -1,9 +1,47 @@
 #include <math.h>
 #include <stdio.h> // for printf
+#include <stdlib.h>
 #include "indicators.h"
 
 // nowe data dopisywane na dole df
 
+int ma_version(void) {
+    return MA_VERSION;
+}
+
+// scratch space
+// composite kernels need O(period) scratch space (never O(len), nothing lives on the stack);
+// it comes from a per-thread buffer owned by the library which only grows, so repeated calls,
+// every row of a batch and every symbol reuse the same allocation. Kernels never nest its use.
+#if defined(_MSC_VER)
+#define MA_THREAD_LOCAL __declspec(thread)
+#else
+#define MA_THREAD_LOCAL _Thread_local
+#endif
+
+static MA_THREAD_LOCAL void *scratch = NULL;
+static MA_THREAD_LOCAL size_t scratch_size = 0;
+
+static void *ma_scratch(const size_t bytes) {
+    if (bytes > scratch_size) {
+        void *buf = realloc(scratch, bytes);
+        if (!buf) return NULL;
+        scratch = buf;
+        scratch_size = bytes;
+    }
+    return scratch;
+}
+
+size_t ma_scratch_size(void) {
+    return scratch_size;
+}
+
+void ma_scratch_release(void) {
+    free(scratch);
+    scratch = NULL;
+    scratch_size = 0;
+}
+
 void sma(const double *data, double *out, const int len, const int period) {
     if (period > len || period < 0) return;
 
@@ -34,96 +72,545 @@ void ema(const double *data, double *out, const int len, const int period) {
     esma(data, out, len, period, 2.0 / ((double)period + 1.0));
 }
 
+// running state of a weighted moving average, shared by wma, hma and wma_grid
+typedef struct {
+    int period;
+    int n;
+    int since_anchor;
+    double sum;
+    double weighted_sum;
+} wma_state;
+
+static void wma_state_init(wma_state *st, const int period) {
+    st->period = period;
+    st->n = 0;
+    st->since_anchor = 1;
+    st->sum = 0.0;
+    st->weighted_sum = 0.0;
+}
+
+// push the newest bar last[0]; last[-k] holds the bar pushed k steps earlier (k <= period)
+static double wma_push(wma_state *st, const double *last) {
+    const int period = st->period;
+    const int i = st->n++;
+    const double x = last[0];
+
+    if (i < period) {
+        st->sum += x;
+        st->weighted_sum += (double)(i + 1) * x;
+        return st->weighted_sum / ((double)(i + 1) * ((double)i + 2.0) / 2.0);
+    }
+
+    if (st->since_anchor == period) {
+        // re-sum the window once per period to stop the rounding drift of the running sums
+        // (O(period) every period bars keeps the whole pass linear)
+        st->sum = 0.0;
+        st->weighted_sum = 0.0;
+        for (int j = 0; j < period; j++) {
+            st->sum += last[j - period + 1];
+            st->weighted_sum += (double)(j + 1) * last[j - period + 1];
+        }
+        st->since_anchor = 0;
+    } else {
+        // every bar in the window loses one weight unit, the new bar enters with weight period
+        st->weighted_sum += (double)period * x - st->sum;
+        st->sum += x - last[-period];
+    }
+    st->since_anchor++;
+    return st->weighted_sum / ((double)period * ((double)period + 1.0) / 2.0);
+}
+
 void wma(const double *data, double *out, const int len, const int period) {
-    // linear time
-    // older data hase higher weight; to change it, reverse weights
+    // linear time: the weighted sum is updated from the plain sum of the window
+    // the newest bar has the highest weight (period)
     if (period > len || period < 0) return;
 
-    double weights[len];
-    for (int i=0;i<period;i++) {weights[i]=(double)(i+1);}
+    wma_state st;
+    wma_state_init(&st, period);
+    for (int i = 0; i < len; i++) {
+        out[i] = wma_push(&st, data + i);
+    }
+}
 
-    int i;
-    double weights_sum;
-    double sum;
-    for (i=0;i<period-1 && i<len; i++) {
-        int cur_period = i+1;
-
-        sum = 0.0;
-        weights_sum = 0.0;
-        for (int j=0;j<cur_period;j++) {
-            sum += weights[j]*data[i-cur_period+1+j];
-            weights_sum += weights[j];
+void hma(const double *data, double *out, const int len, const int period) {
+    // single pass: both WMAs of the data are pushed bar by bar and their difference goes
+    // into the final WMA through a ring buffer, so the scratch space is O(sqrt(period))
+    if (period > len || period < 0) return;
+
+    const int hull_period = (int)floor(sqrt(period));
+    // ring of the last hull_period + 1 differences, written twice to keep the window contiguous
+    const int cap = hull_period + 1;
+    double *ring = ma_scratch(2 * (size_t)cap * sizeof(double));
+    if (!ring) return;
+
+    wma_state half, full, hull;
+    wma_state_init(&half, period / 2);
+    wma_state_init(&full, period);
+    wma_state_init(&hull, hull_period);
+
+    int pos;
+    for (int i = 0; i < len; i++) {
+        pos = i % cap;
+        ring[pos] = ring[pos + cap] = 2.0*wma_push(&half, data + i) - wma_push(&full, data + i);
+        out[i] = wma_push(&hull, ring + pos + cap);
+    }
+}
+
+void rma(const double *data, double *out, const int len, const int period) {
+    if (period > len || period < 0) return;
+
+    esma(data, out, len, period, 1.0/period);
+}
+
+void tema(const double *data, double *out, const int len, const int period) {
+    if (period > len || period < 0 || len <= 0) return;
+
+    // the three chained EMAs are advanced together, no scratch space needed
+    const double alpha = 2.0 / ((double)period + 1.0);
+    double ema_1 = data[0], ema_2 = data[0], ema_3 = data[0];
+
+    out[0] = 3.0*ema_1 - 3.0*ema_2 + ema_3;
+    for (int i=1; i<len; i++) {
+        ema_1 = alpha * data[i] + (1.0 - alpha) * ema_1;
+        ema_2 = alpha * ema_1 + (1.0 - alpha) * ema_2;
+        ema_3 = alpha * ema_2 + (1.0 - alpha) * ema_3;
+        out[i] = 3.0*ema_1 - 3.0*ema_2 + ema_3;
+    }
+}
+
+void dema(const double *data, double *out, const int len, const int period) {
+    if (period > len || period < 0 || len <= 0) return;
+
+    // the two chained EMAs are advanced together, no scratch space needed
+    const double alpha = 2.0 / ((double)period + 1.0);
+    double ema_1 = data[0], ema_2 = data[0];
+
+    out[0] = 2.0*ema_1 - ema_2;
+    for (int i=1; i<len; i++) {
+        ema_1 = alpha * data[i] + (1.0 - alpha) * ema_1;
+        ema_2 = alpha * ema_1 + (1.0 - alpha) * ema_2;
+        out[i] = 2.0*ema_1 - ema_2;
+    }
+}
+
+void kama(const double *data, double *out, const int len, const int period, int n_fast, int n_slow) {
+    if (period > len || period <= 0 || n_fast < 0 || n_slow < 0 || n_fast > len || n_slow > len) return;
+    if (n_fast > n_slow) {
+        double temp = n_fast;
+        n_fast = n_slow;
+        n_slow = temp;
+    }
+
+    double sc_fast = 2.0 / (double)(n_fast + 1.0);
+    double sc_slow = 2.0 / (double)(n_slow + 1.0);
+    double er, sc;
+
+    // warm-up with SMA, KAMA starts at bar `period`
+    sma(data, out, len, period);
+
+    // volatility (sum of absolute bar-to-bar changes) over the window, kept as a rolling sum
+    double volatility = 0.0;
+    for (int j = 0; j < period && period < len; j++) {
+        volatility += fabs(data[period - j] - data[period - j - 1]);
+    }
+
+    for (int i = period; i < len; i++) {
+        if (i > period) {
+            volatility += fabs(data[i] - data[i - 1]) - fabs(data[i - period] - data[i - period - 1]);
         }
 
-        out[i] = sum / weights_sum;
+        // a flat window has no direction, so it has no efficiency either
+        er = volatility > 0.0 ? fabs(data[i] - data[i - period]) / volatility : 0.0;
+
+        sc = pow(er*(sc_fast-sc_slow) + sc_slow, 2);
+
+        out[i] = out[i-1] + sc*(data[i] - out[i-1]);
+    }
+}
+
+// monotonic deque of bar indices over a sliding window of `cap` bars
+// gives the window max (keep_max = 1) or min (keep_max = 0) in O(1) amortized time
+typedef struct {
+    int *idx;
+    int cap;
+    int head;
+    int size;
+    int keep_max;
+} mono_deque;
+
+static void mono_deque_init(mono_deque *dq, int *buf, const int cap, const int keep_max) {
+    dq->idx = buf;
+    dq->cap = cap;
+    dq->head = 0;
+    dq->size = 0;
+    dq->keep_max = keep_max;
+}
+
+static void mono_deque_push(mono_deque *dq, const double *x, const int i) {
+    // drop bars which left the window [i - cap + 1, i]
+    while (dq->size > 0 && dq->idx[dq->head] <= i - dq->cap) {
+        dq->head = (dq->head + 1) % dq->cap;
+        dq->size--;
     }
+    // drop bars which can never become the window extreme again
+    while (dq->size > 0) {
+        int back = dq->idx[(dq->head + dq->size - 1) % dq->cap];
+        if (dq->keep_max ? x[back] > x[i] : x[back] < x[i]) break;
+        dq->size--;
+    }
+    dq->idx[(dq->head + dq->size) % dq->cap] = i;
+    dq->size++;
+}
+
+static double mono_deque_front(const mono_deque *dq, const double *x) {
+    return x[dq->idx[dq->head]];
+}
+
+void frama(const double *data, double *out, const double *high, const double *low, const int len, const int period) {
+    if (period <= 0 || period > len) return;
+
+    double D, N, range_1, range_2, alpha;
+    const int half = period / 2;
+
+    // sliding max/min of the whole window [t-period+1, t], of its first half
+    // [t-period+1, t-period+half] and of its second half [t-half+1, t]
+    int *buf = ma_scratch((2 * (size_t)period + 4 * (size_t)half) * sizeof(int));
+    if (!buf) return;
+
+    // warm-up with SMA, FRAMA starts at bar `period - 1` (the SMA of the first window)
+    sma(data, out, len, period);
 
-    weights_sum = (double)period*((double)period+1.0)/2.0;
+    // a single bar window has no fractal dimension: D = 1, alpha = 1, FRAMA follows the data
+    if (half == 0) return;
 
-    for (i;i<len;i++) {
-        sum = 0.0;
-        for (int j=0; j<period; j++) {
-            sum += weights[j]*data[i-period+1+j];
+    mono_deque full_h, full_l, first_h, first_l, second_h, second_l;
+    mono_deque_init(&full_h, buf, period, 1);
+    mono_deque_init(&full_l, buf + period, period, 0);
+    mono_deque_init(&first_h, buf + 2*period, half, 1);
+    mono_deque_init(&first_l, buf + 2*period + half, half, 0);
+    mono_deque_init(&second_h, buf + 2*period + 2*half, half, 1);
+    mono_deque_init(&second_l, buf + 2*period + 3*half, half, 0);
+
+    int first_end;
+    for (int t = 0; t < len; t++) {
+        mono_deque_push(&full_h, high, t);
+        mono_deque_push(&full_l, low, t);
+        mono_deque_push(&second_h, high, t);
+        mono_deque_push(&second_l, low, t);
+
+        first_end = t - period + half;
+        if (first_end >= 0) {
+            mono_deque_push(&first_h, high, first_end);
+            mono_deque_push(&first_l, low, first_end);
+        }
+
+        if (t < period) continue;
+
+        N = mono_deque_front(&full_h, high) - mono_deque_front(&full_l, low);
+        range_1 = mono_deque_front(&first_h, high) - mono_deque_front(&first_l, low);
+        range_2 = mono_deque_front(&second_h, high) - mono_deque_front(&second_l, low);
+
+        if (N <= 0.0) {
+            D = 0.0;
+        } else {
+            D = (log(range_1 + range_2) - log(N)) / log(2.0);
         }
+        if (D < 1.0) D = 1.0;
+        if (D > 2.0) D = 2.0;
+
+        alpha = exp(-4.6 * (D - 1.0));
+        if (alpha < 0.01) alpha = 0.01;
+        if (alpha > 1.0)   alpha = 1.0;
 
-        out[i] = sum / weights_sum;
+        out[t] = alpha * data[t] + (1.0 - alpha) * out[t - 1];
     }
 }
 
-void hma(const double *data, double *out, const int len, const int period) {
-    if (period > len || period < 0) return;
 
-    double wma_1[len];
-    double wma_2[len];
-    double wma_3[len];
 
-    wma(data, wma_1, len, floor(period / 2));
-    wma(data, wma_2, len, period);
-    for (int i=0; i<len; i++) {
-        wma_3[i] = 2.0*wma_1[i] - wma_2[i];
+// batched moving averages
+// data and out are contiguous row-major n_rows x n_cols matrices (symbols x bars);
+// row r holds lens[r] bars starting at column 0, the rest of the row is padding
+
+#define BATCH_MA(name) \
+void name##_batch(const double *data, double *out, const int *lens, const int n_rows, const int n_cols, const int period) { \
+    for (int r = 0; r < n_rows; r++) { \
+        if (lens[r] > n_cols) continue; \
+        name(data + (size_t)r * n_cols, out + (size_t)r * n_cols, lens[r], period); \
+    } \
+}
+
+BATCH_MA(sma)
+BATCH_MA(ema)
+BATCH_MA(wma)
+BATCH_MA(hma)
+BATCH_MA(rma)
+BATCH_MA(tema)
+BATCH_MA(dema)
+
+void esma_batch(const double *data, double *out, const int *lens, const int n_rows, const int n_cols, const int period, const double alpha) {
+    for (int r = 0; r < n_rows; r++) {
+        if (lens[r] > n_cols) continue;
+        esma(data + (size_t)r * n_cols, out + (size_t)r * n_cols, lens[r], period, alpha);
+    }
+}
+
+void kama_batch(const double *data, double *out, const int *lens, const int n_rows, const int n_cols, const int period, const int n_fast, const int n_slow) {
+    for (int r = 0; r < n_rows; r++) {
+        if (lens[r] > n_cols) continue;
+        kama(data + (size_t)r * n_cols, out + (size_t)r * n_cols, lens[r], period, n_fast, n_slow);
     }
+}
 
-    wma(wma_3, out, len, floor(sqrt(period)));
+void frama_batch(const double *data, double *out, const double *high, const double *low, const int *lens, const int n_rows, const int n_cols, const int period) {
+    size_t offset;
+    for (int r = 0; r < n_rows; r++) {
+        if (lens[r] > n_cols) continue;
+        offset = (size_t)r * n_cols;
+        frama(data + offset, out + offset, high + offset, low + offset, lens[r], period);
+    }
 }
 
-void rma(const double *data, double *out, const int len, const int period) {
+
+
+// parameter grids
+// one traversal of the data computes the moving average for every period in `periods`;
+// out is a contiguous row-major len x n_periods matrix (bars x periods),
+// column k holds exactly what the single-period kernel gives for periods[k]
+
+void sma_grid(const double *data, double *out, const int *periods, const int len, const int n_periods) {
+    double *sum = ma_scratch((size_t)(n_periods > 0 ? n_periods : 1) * sizeof(double));
+    if (!sum) return;
+    for (int k = 0; k < n_periods; k++) sum[k] = 0.0;
+
+    int period;
+    double *row;
+    for (int i = 0; i < len; i++) {
+        row = out + (size_t)i * n_periods;
+        for (int k = 0; k < n_periods; k++) {
+            period = periods[k];
+            if (period > len || period < 0) continue;
+
+            sum[k] += data[i];
+            if (i < period) {
+                row[k] = sum[k] / (i + 1);
+            } else {
+                sum[k] -= data[i - period];
+                row[k] = sum[k] / period;
+            }
+        }
+    }
+}
+
+void wma_grid(const double *data, double *out, const int *periods, const int len, const int n_periods) {
+    wma_state *states = ma_scratch((size_t)(n_periods > 0 ? n_periods : 1) * sizeof(wma_state));
+    if (!states) return;
+    for (int k = 0; k < n_periods; k++) wma_state_init(&states[k], periods[k]);
+
+    int period;
+    double *row;
+    for (int i = 0; i < len; i++) {
+        row = out + (size_t)i * n_periods;
+        for (int k = 0; k < n_periods; k++) {
+            period = periods[k];
+            if (period > len || period < 0) continue;
+
+            row[k] = wma_push(&states[k], data + i);
+        }
+    }
+}
+
+// EMA family: `depth` chained EMAs per period (1: ema/rma, 2: dema, 3: tema)
+static void esma_chain_grid(const double *data, double *out, const int *periods, const int len, const int n_periods, const int depth, const int wilder) {
+    const size_t n = n_periods > 0 ? n_periods : 1;
+    double *alpha = ma_scratch(4 * n * sizeof(double));
+    if (!alpha) return;
+    double *e1 = alpha + n, *e2 = alpha + 2*n, *e3 = alpha + 3*n;
+    for (int k = 0; k < n_periods; k++) {
+        alpha[k] = wilder ? 1.0 / periods[k] : 2.0 / ((double)periods[k] + 1.0);
+    }
+
+    int period;
+    double a, *row;
+    for (int i = 0; i < len; i++) {
+        row = out + (size_t)i * n_periods;
+        for (int k = 0; k < n_periods; k++) {
+            period = periods[k];
+            if (period > len || period < 0) continue;
+
+            a = alpha[k];
+            if (i == 0) {
+                e1[k] = e2[k] = e3[k] = data[0];
+            } else {
+                e1[k] = a * data[i] + (1.0 - a) * e1[k];
+                if (depth > 1) e2[k] = a * e1[k] + (1.0 - a) * e2[k];
+                if (depth > 2) e3[k] = a * e2[k] + (1.0 - a) * e3[k];
+            }
+
+            if (depth == 1) {
+                row[k] = e1[k];
+            } else if (depth == 2) {
+                row[k] = 2.0*e1[k] - e2[k];
+            } else {
+                row[k] = 3.0*e1[k] - 3.0*e2[k] + e3[k];
+            }
+        }
+    }
+}
+
+void ema_grid(const double *data, double *out, const int *periods, const int len, const int n_periods) {
+    esma_chain_grid(data, out, periods, len, n_periods, 1, 0);
+}
+
+void rma_grid(const double *data, double *out, const int *periods, const int len, const int n_periods) {
+    esma_chain_grid(data, out, periods, len, n_periods, 1, 1);
+}
+
+void dema_grid(const double *data, double *out, const int *periods, const int len, const int n_periods) {
+    esma_chain_grid(data, out, periods, len, n_periods, 2, 0);
+}
+
+void tema_grid(const double *data, double *out, const int *periods, const int len, const int n_periods) {
+    esma_chain_grid(data, out, periods, len, n_periods, 3, 0);
+}
+
+
+
+// single precision
+// float data and output halve the memory traffic, every running sum, EMA state and weight
+// is still kept in double, so the result differs from the double kernels only by the final rounding
+
+void sma_f32(const float *data, float *out, const int len, const int period) {
     if (period > len || period < 0) return;
 
-    esma(data, out, len, period, 1.0/period);
+    double sum = 0.0;
+    int i;
+    for (i = 0;i < period && i < len; i++) {
+        sum += data[i];
+        out[i] = (float)(sum / (i + 1));
+    }
+
+    for (; i<len; i++) {
+        sum += data[i];
+        sum -= data[i - period];
+        out[i] = (float)(sum / period);
+    }
 }
 
-void tema(const double *data, double *out, const int len, const int period) {
+void esma_f32(const float *data, float *out, const int len, const int period, const double alpha) {
+    if (period > len || period < 0 || alpha < 0.0) return;
+
+    double prev = data[0];
+    out[0] = data[0];
+    for (int i = 1; i < len; i++) {
+        prev = alpha * data[i] + (1.0 - alpha) * prev;
+        out[i] = (float)prev;
+    }
+}
+
+void ema_f32(const float *data, float *out, const int len, const int period) {
+    esma_f32(data, out, len, period, 2.0 / ((double)period + 1.0));
+}
+
+void rma_f32(const float *data, float *out, const int len, const int period) {
     if (period > len || period < 0) return;
 
-    double ema_1[len], ema_2[len], ema_3[len];
+    esma_f32(data, out, len, period, 1.0/period);
+}
+
+void tema_f32(const float *data, float *out, const int len, const int period) {
+    if (period > len || period < 0 || len <= 0) return;
 
-    ema(data, ema_1, len, period);
-    ema(ema_1, ema_2, len, period);
-    ema(ema_2, ema_3, len, period);
+    const double alpha = 2.0 / ((double)period + 1.0);
+    double ema_1 = data[0], ema_2 = data[0], ema_3 = data[0];
 
-    for (int i=0; i<len; i++) {
-        out[i] = 3.0*ema_1[i] - 3.0*ema_2[i] + ema_3[i];
+    out[0] = (float)(3.0*ema_1 - 3.0*ema_2 + ema_3);
+    for (int i=1; i<len; i++) {
+        ema_1 = alpha * data[i] + (1.0 - alpha) * ema_1;
+        ema_2 = alpha * ema_1 + (1.0 - alpha) * ema_2;
+        ema_3 = alpha * ema_2 + (1.0 - alpha) * ema_3;
+        out[i] = (float)(3.0*ema_1 - 3.0*ema_2 + ema_3);
     }
+}
+
+void dema_f32(const float *data, float *out, const int len, const int period) {
+    if (period > len || period < 0 || len <= 0) return;
+
+    const double alpha = 2.0 / ((double)period + 1.0);
+    double ema_1 = data[0], ema_2 = data[0];
 
+    out[0] = (float)(2.0*ema_1 - ema_2);
+    for (int i=1; i<len; i++) {
+        ema_1 = alpha * data[i] + (1.0 - alpha) * ema_1;
+        ema_2 = alpha * ema_1 + (1.0 - alpha) * ema_2;
+        out[i] = (float)(2.0*ema_1 - ema_2);
+    }
 }
 
-void dema(const double *data, double *out, const int len, const int period) {
+// same as wma_push for float bars
+static double wma_push_f32(wma_state *st, const float *last) {
+    const int period = st->period;
+    const int i = st->n++;
+    const double x = last[0];
+
+    if (i < period) {
+        st->sum += x;
+        st->weighted_sum += (double)(i + 1) * x;
+        return st->weighted_sum / ((double)(i + 1) * ((double)i + 2.0) / 2.0);
+    }
+
+    if (st->since_anchor == period) {
+        st->sum = 0.0;
+        st->weighted_sum = 0.0;
+        for (int j = 0; j < period; j++) {
+            st->sum += last[j - period + 1];
+            st->weighted_sum += (double)(j + 1) * last[j - period + 1];
+        }
+        st->since_anchor = 0;
+    } else {
+        st->weighted_sum += (double)period * x - st->sum;
+        st->sum += x - last[-period];
+    }
+    st->since_anchor++;
+    return st->weighted_sum / ((double)period * ((double)period + 1.0) / 2.0);
+}
+
+void wma_f32(const float *data, float *out, const int len, const int period) {
     if (period > len || period < 0) return;
 
-    double ema_1[len], ema_2[len];
+    wma_state st;
+    wma_state_init(&st, period);
+    for (int i = 0; i < len; i++) {
+        out[i] = (float)wma_push_f32(&st, data + i);
+    }
+}
 
-    ema(data, ema_1, len, period);
-    ema(data, ema_2, len, period);
+void hma_f32(const float *data, float *out, const int len, const int period) {
+    if (period > len || period < 0) return;
 
-    for (int i=0; i<len; i++) {
-        out[i] = 2.0*ema_1[i] - ema_2[i];
+    // the ring of differences stays in double, only the data and the output are float
+    const int hull_period = (int)floor(sqrt(period));
+    const int cap = hull_period + 1;
+    double *ring = ma_scratch(2 * (size_t)cap * sizeof(double));
+    if (!ring) return;
+
+    wma_state half, full, hull;
+    wma_state_init(&half, period / 2);
+    wma_state_init(&full, period);
+    wma_state_init(&hull, hull_period);
+
+    int pos;
+    for (int i = 0; i < len; i++) {
+        pos = i % cap;
+        ring[pos] = ring[pos + cap] = 2.0*wma_push_f32(&half, data + i) - wma_push_f32(&full, data + i);
+        out[i] = (float)wma_push(&hull, ring + pos + cap);
     }
 }
 
-void kama(const double *data, double *out, const int len, const int period, int n_fast, int n_slow) {
-    if (period > len || period < 0 || n_fast < 0 || n_slow < 0 || n_fast > len || n_slow > len) return;
+void kama_f32(const float *data, float *out, const int len, const int period, int n_fast, int n_slow) {
+    if (period > len || period <= 0 || n_fast < 0 || n_slow < 0 || n_fast > len || n_slow > len) return;
     if (n_fast > n_slow) {
-        double temp = n_fast;
+        int temp = n_fast;
         n_fast = n_slow;
         n_slow = temp;
     }
@@ -132,61 +619,96 @@ void kama(const double *data, double *out, const int len, const int period, int
     double sc_slow = 2.0 / (double)(n_slow + 1.0);
     double er, sc;
 
-    int i = 0;
-    for (i; i<period && i<len; i++) {
-        sma(data, out, len, period);
+    sma_f32(data, out, len, period);
+
+    double volatility = 0.0;
+    for (int j = 0; j < period && period < len; j++) {
+        volatility += fabs((double)data[period - j] - data[period - j - 1]);
     }
 
-    double denominator;
-    for (i; i<len; i++) {
-        denominator = 0.0;
-        for (int j=0; j<period; j++) {
-            denominator += abs(data[i-j] - data[i-j-1]);
+    // the recursion runs in double from the unrounded SMA of the first window,
+    // out[] only receives the rounded values
+    double prev = 0.0;
+    for (int j = 0; j < period; j++) prev += data[j];
+    prev /= period;
+    for (int i = period; i < len; i++) {
+        if (i > period) {
+            volatility += fabs((double)data[i] - data[i - 1]) - fabs((double)data[i - period] - data[i - period - 1]);
         }
 
-        er = abs(data[i] - data[i-period]) / denominator;
+        er = volatility > 0.0 ? fabs((double)data[i] - data[i - period]) / volatility : 0.0;
 
         sc = pow(er*(sc_fast-sc_slow) + sc_slow, 2);
 
-        out[i] = out[i-1] + sc*(data[i] - out[i-1]);
+        prev = prev + sc*(data[i] - prev);
+        out[i] = (float)prev;
     }
 }
 
-void frama(const double *data, double *out, const double *high, const double *low, const int len, const int period) {
+static void mono_deque_push_f32(mono_deque *dq, const float *x, const int i) {
+    while (dq->size > 0 && dq->idx[dq->head] <= i - dq->cap) {
+        dq->head = (dq->head + 1) % dq->cap;
+        dq->size--;
+    }
+    while (dq->size > 0) {
+        int back = dq->idx[(dq->head + dq->size - 1) % dq->cap];
+        if (dq->keep_max ? x[back] > x[i] : x[back] < x[i]) break;
+        dq->size--;
+    }
+    dq->idx[(dq->head + dq->size) % dq->cap] = i;
+    dq->size++;
+}
+
+static double mono_deque_front_f32(const mono_deque *dq, const float *x) {
+    return x[dq->idx[dq->head]];
+}
+
+void frama_f32(const float *data, float *out, const float *high, const float *low, const int len, const int period) {
     if (period <= 0 || period > len) return;
 
-    double D, N, range_1, range_2, alpha, l, h;
-    int half;
+    double D, N, range_1, range_2, alpha;
+    const int half = period / 2;
+
+    // the same O(period) deques as frama, the extremes are widened to double when read
+    int *buf = ma_scratch((2 * (size_t)period + 4 * (size_t)half) * sizeof(int));
+    if (!buf) return;
 
+    sma_f32(data, out, len, period);
+
+    if (half == 0) return;
+
+    mono_deque full_h, full_l, first_h, first_l, second_h, second_l;
+    mono_deque_init(&full_h, buf, period, 1);
+    mono_deque_init(&full_l, buf + period, period, 0);
+    mono_deque_init(&first_h, buf + 2*period, half, 1);
+    mono_deque_init(&first_l, buf + 2*period + half, half, 0);
+    mono_deque_init(&second_h, buf + 2*period + 2*half, half, 1);
+    mono_deque_init(&second_l, buf + 2*period + 3*half, half, 0);
+
+    // the recursion runs in double from the unrounded SMA of the first window,
+    // out[] only receives the rounded values
+    double prev = 0.0;
+    for (int j = 0; j < period; j++) prev += data[j];
+    prev /= period;
+
+    int first_end;
     for (int t = 0; t < len; t++) {
-        if (t < period - 1) {
-            sma(data, out, len, period);
+        mono_deque_push_f32(&full_h, high, t);
+        mono_deque_push_f32(&full_l, low, t);
+        mono_deque_push_f32(&second_h, high, t);
+        mono_deque_push_f32(&second_l, low, t);
+
+        first_end = t - period + half;
+        if (first_end >= 0) {
+            mono_deque_push_f32(&first_h, high, first_end);
+            mono_deque_push_f32(&first_l, low, first_end);
         }
 
-        h = high[t - period + 1];
-        l = low[t - period + 1];
-        for (int i = t - period + 1; i <= t; i++) {
-            if (high[i] > h) h = high[i];
-            if (low[i]  < l) l = low[i];
-        }
-        N = h - l;
-
-        half = period / 2;
-        h = high[t - period + 1];
-        l = low[t - period + 1];
-        for (int i = t - period + 1; i < t - period + 1 + half; i++) {
-            if (high[i] > h) h = high[i];
-            if (low[i]  < l) l = low[i];
-        }
-        range_1 = h - l;
+        if (t < period) continue;
 
-        h = high[t - half + 1];
-        l = low[t - half + 1];
-        for (int i = t - half + 1; i <= t; i++) {
-            if (high[i] > h) h = high[i];
-            if (low[i]  < l) l = low[i];
-        }
-        range_2 = h - l;
+        N = mono_deque_front_f32(&full_h, high) - mono_deque_front_f32(&full_l, low);
+        range_1 = mono_deque_front_f32(&first_h, high) - mono_deque_front_f32(&first_l, low);
+        range_2 = mono_deque_front_f32(&second_h, high) - mono_deque_front_f32(&second_l, low);
 
         if (N <= 0.0) {
             D = 0.0;
@@ -200,13 +722,159 @@ void frama(const double *data, double *out, const double *high, const double *lo
         if (alpha < 0.01) alpha = 0.01;
         if (alpha > 1.0)   alpha = 1.0;
 
-        if (t == period - 1) {
-            double sum = 0.0;
-            for (int i = 0; i < period; i++) sum += data[i];
-            out[t] = sum / period;
+        prev = alpha * data[t] + (1.0 - alpha) * prev;
+        out[t] = (float)prev;
+    }
+}
+
+#define BATCH_MA_F32(name) \
+void name##_batch_f32(const float *data, float *out, const int *lens, const int n_rows, const int n_cols, const int period) { \
+    for (int r = 0; r < n_rows; r++) { \
+        if (lens[r] > n_cols) continue; \
+        name##_f32(data + (size_t)r * n_cols, out + (size_t)r * n_cols, lens[r], period); \
+    } \
+}
+
+BATCH_MA_F32(sma)
+BATCH_MA_F32(ema)
+BATCH_MA_F32(wma)
+BATCH_MA_F32(hma)
+BATCH_MA_F32(rma)
+BATCH_MA_F32(tema)
+BATCH_MA_F32(dema)
+
+void esma_batch_f32(const float *data, float *out, const int *lens, const int n_rows, const int n_cols, const int period, const double alpha) {
+    for (int r = 0; r < n_rows; r++) {
+        if (lens[r] > n_cols) continue;
+        esma_f32(data + (size_t)r * n_cols, out + (size_t)r * n_cols, lens[r], period, alpha);
+    }
+}
+
+void kama_batch_f32(const float *data, float *out, const int *lens, const int n_rows, const int n_cols, const int period, const int n_fast, const int n_slow) {
+    for (int r = 0; r < n_rows; r++) {
+        if (lens[r] > n_cols) continue;
+        kama_f32(data + (size_t)r * n_cols, out + (size_t)r * n_cols, lens[r], period, n_fast, n_slow);
+    }
+}
+
+void frama_batch_f32(const float *data, float *out, const float *high, const float *low, const int *lens, const int n_rows, const int n_cols, const int period) {
+    size_t offset;
+    for (int r = 0; r < n_rows; r++) {
+        if (lens[r] > n_cols) continue;
+        offset = (size_t)r * n_cols;
+        frama_f32(data + offset, out + offset, high + offset, low + offset, lens[r], period);
+    }
+}
+// multi-output indicators
+// every output is computed in the same traversal of the data; the warm-up follows the
+// moving averages above (EMAs start at the first bar, rolling windows grow up to `period`)
+
+void macd(const double *data, double *line, double *signal, double *hist, const int len, const int fast, const int slow, const int signal_period) {
+    if (len <= 0 || fast <= 0 || slow <= 0 || signal_period <= 0) return;
+
+    const double alpha_fast = 2.0 / ((double)fast + 1.0);
+    const double alpha_slow = 2.0 / ((double)slow + 1.0);
+    const double alpha_signal = 2.0 / ((double)signal_period + 1.0);
+    double ema_fast = data[0], ema_slow = data[0];
+
+    line[0] = 0.0;
+    signal[0] = 0.0;
+    hist[0] = 0.0;
+    for (int i = 1; i < len; i++) {
+        ema_fast = alpha_fast * data[i] + (1.0 - alpha_fast) * ema_fast;
+        ema_slow = alpha_slow * data[i] + (1.0 - alpha_slow) * ema_slow;
+        line[i] = ema_fast - ema_slow;
+        signal[i] = alpha_signal * line[i] + (1.0 - alpha_signal) * signal[i - 1];
+        hist[i] = line[i] - signal[i];
+    }
+}
+
+void bollinger(const double *data, double *mid, double *upper, double *lower, const int len, const int period, const double mult) {
+    // rolling mean and variance with Welford's update (a sum of squares loses all precision
+    // on prices far from zero); the window is re-summed once per period to stop the drift
+    if (period > len || period <= 0) return;
+
+    double mean = 0.0, m2 = 0.0, old_mean, delta, dev;
+    int n = 0, since_anchor = 0;
+    for (int i = 0; i < len; i++) {
+        if (i < period) {
+            n++;
+            delta = data[i] - mean;
+            mean += delta / n;
+            m2 += delta * (data[i] - mean);
+        } else if (since_anchor == period) {
+            mean = 0.0;
+            for (int j = i - period + 1; j <= i; j++) mean += data[j];
+            mean /= period;
+            m2 = 0.0;
+            for (int j = i - period + 1; j <= i; j++) m2 += (data[j] - mean) * (data[j] - mean);
+            since_anchor = 0;
         } else {
-            out[t] = alpha * data[t] + (1.0 - alpha) * out[t - 1];
+            // the oldest bar leaves the window and the newest enters it
+            old_mean = mean;
+            delta = data[i] - data[i - period];
+            mean += delta / period;
+            m2 += delta * (data[i] - mean + data[i - period] - old_mean);
         }
+        if (i >= period) since_anchor++;
+        if (m2 < 0.0) m2 = 0.0;
+
+        dev = mult * sqrt(m2 / n);
+        mid[i] = mean;
+        upper[i] = mean + dev;
+        lower[i] = mean - dev;
     }
 }
 
+void keltner(const double *data, double *mid, double *upper, double *lower, const double *high, const double *low, const double *close,
+             const int len, const int period, const int atr_period, const double mult) {
+    // EMA of the data +/- mult * ATR (Wilder's smoothing of the true range)
+    if (len <= 0 || period <= 0 || atr_period <= 0) return;
+
+    const double alpha = 2.0 / ((double)period + 1.0);
+    const double alpha_atr = 1.0 / (double)atr_period;
+    double ema = data[0], atr = high[0] - low[0], tr;
+
+    mid[0] = ema;
+    upper[0] = ema + mult * atr;
+    lower[0] = ema - mult * atr;
+    for (int i = 1; i < len; i++) {
+        tr = fmax(high[i] - low[i], fmax(fabs(high[i] - close[i - 1]), fabs(low[i] - close[i - 1])));
+        ema = alpha * data[i] + (1.0 - alpha) * ema;
+        atr = alpha_atr * tr + (1.0 - alpha_atr) * atr;
+        mid[i] = ema;
+        upper[i] = ema + mult * atr;
+        lower[i] = ema - mult * atr;
+    }
+}
+
+void macd_batch(const double *data, double *line, double *signal, double *hist, const int *lens, const int n_rows, const int n_cols,
+                const int fast, const int slow, const int signal_period) {
+    size_t offset;
+    for (int r = 0; r < n_rows; r++) {
+        if (lens[r] > n_cols) continue;
+        offset = (size_t)r * n_cols;
+        macd(data + offset, line + offset, signal + offset, hist + offset, lens[r], fast, slow, signal_period);
+    }
+}
+
+void bollinger_batch(const double *data, double *mid, double *upper, double *lower, const int *lens, const int n_rows, const int n_cols,
+                     const int period, const double mult) {
+    size_t offset;
+    for (int r = 0; r < n_rows; r++) {
+        if (lens[r] > n_cols) continue;
+        offset = (size_t)r * n_cols;
+        bollinger(data + offset, mid + offset, upper + offset, lower + offset, lens[r], period, mult);
+    }
+}
+
+void keltner_batch(const double *data, double *mid, double *upper, double *lower, const double *high, const double *low, const double *close,
+                   const int *lens, const int n_rows, const int n_cols, const int period, const int atr_period, const double mult) {
+    size_t offset;
+    for (int r = 0; r < n_rows; r++) {
+        if (lens[r] > n_cols) continue;
+        offset = (size_t)r * n_cols;
+        keltner(data + offset, mid + offset, upper + offset, lower + offset, high + offset, low + offset, close + offset,
+                lens[r], period, atr_period, mult);
+    }
+}
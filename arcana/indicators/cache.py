@@ -0,0 +1,115 @@
+from collections import OrderedDict
+from hashlib import blake2b
+from threading import Lock
+
+import numpy as np
+
+
+class ResultCache:
+    """
+    Content-addressed cache of indicator results with LRU eviction.
+
+    Entries are keyed by a fingerprint of the input price arrays and the
+    kernel parameters, so the same computation requested under different
+    user names (or by different callers) is served from memory without
+    calling the C backend. The cache is safe to use from several threads.
+
+    A cache with `max_bytes == 0` is disabled: nothing is fingerprinted or stored.
+    """
+    __slots__ = ("_max_bytes", "_entries", "_nbytes", "_hits", "_misses", "_evictions", "_lock")
+
+    def __init__(self, max_bytes: int = 0):
+        """
+        :param max_bytes: memory budget of the stored arrays. default is 0 (disabled)
+        """
+        if max_bytes < 0:
+            raise ValueError(f"{max_bytes} should be non-negative.")
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[bytes, tuple[np.ndarray, ...]] = OrderedDict()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_bytes > 0
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, v: int):
+        if v < 0:
+            raise ValueError(f"{v} should be non-negative.")
+        with self._lock:
+            self._max_bytes = v
+            self._evict()
+
+    @staticmethod
+    def fingerprint(*arrays: np.ndarray, **params) -> bytes:
+        """
+        Return the fingerprint of the input arrays and parameters.
+
+        :param arrays: input arrays (the content, dtype and shape are hashed)
+        :param params: kernel name and parameters (hashed by `repr`)
+        :return: the key of the computation
+        """
+        h = blake2b(digest_size=20)
+        h.update(repr(sorted(params.items())).encode())
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+            h.update(f"{array.dtype.str}{array.shape}".encode())
+            h.update(array)
+        return h.digest()
+
+    def get(self, key: bytes) -> tuple[np.ndarray, ...] | None:
+        """Return the stored arrays or None, if the key is unknown."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: bytes, *arrays: np.ndarray):
+        """Store the arrays (made read-only) and evict the least recently used entries over the budget."""
+        nbytes = sum(array.nbytes for array in arrays)
+        if nbytes > self._max_bytes:
+            return
+        for array in arrays:
+            array.setflags(write=False)
+        with self._lock:
+            if key in self._entries:
+                self._nbytes -= sum(array.nbytes for array in self._entries.pop(key))
+            self._entries[key] = arrays
+            self._nbytes += nbytes
+            self._evict()
+
+    def _evict(self):
+        while self._nbytes > self._max_bytes and self._entries:
+            _, arrays = self._entries.popitem(last=False)
+            self._nbytes -= sum(array.nbytes for array in arrays)
+            self._evictions += 1
+
+    def clear(self):
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss/eviction counters and the memory usage."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "nbytes": self._nbytes,
+                "max_bytes": self._max_bytes,
+            }
@@ -2,7 +2,7 @@ from dataclasses import field
 
 import attrs
 
-from .converters import src_converter
+from .converters import src_converter, periods_converter, precision_converter
 
 
 @attrs.define(slots=True, kw_only=True)
@@ -21,6 +21,14 @@ class MovingAverageCfg(IndicatorCfg):
     """Configuration base class for every moving average indicator."""
     src = attrs.field(validator=attrs.validators.instance_of(str), converter=src_converter)
     period = attrs.field(validator=[attrs.validators.instance_of(int), attrs.validators.gt(0)])
+    precision = attrs.field(default="float64", converter=precision_converter)
+
+@attrs.define(slots=True, kw_only=True)
+class MovingAverageGridCfg(IndicatorCfg):
+    """Configuration for a moving average computed for many periods at once (parameter grid)."""
+    src = attrs.field(validator=attrs.validators.instance_of(str), converter=src_converter)
+    periods = attrs.field(validator=attrs.validators.instance_of(tuple), converter=periods_converter)
+    precision = attrs.field(default="float64", converter=precision_converter)
 
 @attrs.define(slots=True, kw_only=True)
 class SMACfg(MovingAverageCfg):
@@ -43,10 +51,12 @@ class WMACfg(MovingAverageCfg):
     pass
 
 @attrs.define(slots=True, kw_only=True)
-class HMACgf(MovingAverageCfg):
+class HMACfg(MovingAverageCfg):
     """Configuration for Hull Moving Average (HMA)."""
     pass
 
+HMACgf = HMACfg
+
 @attrs.define(slots=True, kw_only=True)
 class RMACfg(MovingAverageCfg):
     """Configuration for Rolling Moving Average (RMA)."""
@@ -72,3 +82,31 @@ class KAMACfg(MovingAverageCfg):
 class FRAMACfg(MovingAverageCfg):
     """Configuration for Fractal Adaptive Moving Average (FRAMA)."""
     pass
+
+@attrs.define(slots=True, kw_only=True)
+class MACDCfg(IndicatorCfg):
+    """Configuration for Moving Average Convergence Divergence (MACD)."""
+    src = attrs.field(default="close", validator=attrs.validators.instance_of(str), converter=src_converter)
+    fast = attrs.field(default=12, validator=[attrs.validators.instance_of(int), attrs.validators.gt(0)])
+    slow = attrs.field(default=26, validator=[attrs.validators.instance_of(int), attrs.validators.gt(0)])
+    signal = attrs.field(default=9, validator=[attrs.validators.instance_of(int), attrs.validators.gt(0)])
+
+    @slow.validator
+    def _slow_validator(self, attribute, value):
+        if value <= self.fast:
+            raise ValueError(f"slow ({value}) should be greater than fast ({self.fast}).")
+
+@attrs.define(slots=True, kw_only=True)
+class BollingerBandsCfg(IndicatorCfg):
+    """Configuration for Bollinger Bands (SMA +/- mult * standard deviation)."""
+    src = attrs.field(default="close", validator=attrs.validators.instance_of(str), converter=src_converter)
+    period = attrs.field(default=20, validator=[attrs.validators.instance_of(int), attrs.validators.gt(0)])
+    mult = attrs.field(default=2.0, converter=float, validator=attrs.validators.gt(0.0))
+
+@attrs.define(slots=True, kw_only=True)
+class KeltnerChannelCfg(IndicatorCfg):
+    """Configuration for Keltner Channel (EMA +/- mult * ATR)."""
+    src = attrs.field(default="close", validator=attrs.validators.instance_of(str), converter=src_converter)
+    period = attrs.field(default=20, validator=[attrs.validators.instance_of(int), attrs.validators.gt(0)])
+    atr_period = attrs.field(default=10, validator=[attrs.validators.instance_of(int), attrs.validators.gt(0)])
+    mult = attrs.field(default=2.0, converter=float, validator=attrs.validators.gt(0.0))
@@ -0,0 +1,136 @@
+from collections.abc import Iterable
+
+import attrs
+import numpy as np
+from numpy import ndarray
+from pandas import Categorical, DataFrame, DatetimeIndex, Index, MultiIndex, to_datetime
+
+from arcana.price_data.converters import index_to_timestamps
+from arcana.price_data.dev_types import PriceDataColumns
+from .adapters import ma_numpy_to_dataframe
+
+
+@attrs.frozen
+class ColumnarIndicator:
+    """
+    Compact form of an indicator computed for many symbols.
+
+    Every symbol holds a float array of values (float64 or float32) and an int64 array of timestamps.
+    The timestamps are views of the price data index and the values are the arrays
+    written by the C backend, so nothing is copied. Symbols are dictionary encoded,
+    DataFrames are only built on request (`to_frames`, `to_frame`).
+
+    Attributes
+    ----------
+    name : str
+        User name of the indicator.
+    symbols : tuple[str]
+        Symbols dictionary (position is the symbol code).
+    timestamps : tuple[numpy.ndarray]
+        int64 nanosecond timestamps for every symbol.
+    values : tuple[numpy.ndarray]
+        Indicator values for every symbol.
+    tz : str, optional
+        Time zone of the timestamps (None for naive timestamps).
+    """
+    name: str
+    symbols: tuple = attrs.field(converter=tuple)
+    timestamps: tuple = attrs.field(converter=tuple, eq=False, repr=False)
+    values: tuple = attrs.field(converter=tuple, eq=False, repr=False)
+    tz: str | None = None
+
+    def __attrs_post_init__(self):
+        if not len(self.symbols) == len(self.timestamps) == len(self.values):
+            raise ValueError(f"Symbols, timestamps and values should have the same length. "
+                             f"Got {len(self.symbols)}, {len(self.timestamps)} and {len(self.values)}.")
+        for symbol, timestamps, values in zip(self.symbols, self.timestamps, self.values):
+            if len(timestamps) != len(values):
+                raise ValueError(f"{symbol}: {len(timestamps)} timestamps != {len(values)} values.")
+
+    @classmethod
+    def from_arrays(cls, name: str, indexes: Iterable[Index], symbols: Iterable[str], values: Iterable[ndarray]) -> "ColumnarIndicator":
+        """
+        Build the compact form from computed values.
+
+        :param name: user name of the indicator
+        :param indexes: date index of the price data of every symbol
+        :param symbols: symbols
+        :param values: indicator values of every symbol
+        """
+        indexes = list(indexes)
+        tz = str(indexes[0].tz) if indexes and getattr(indexes[0], "tz", None) is not None else None
+        return cls(name, symbols, [index_to_timestamps(index) for index in indexes], values, tz)
+
+    @classmethod
+    def from_frames(cls, name: str, frames: Iterable[DataFrame]) -> "ColumnarIndicator":
+        """
+        Build the compact form from indicator DataFrames (one per symbol).
+
+        :param name: user name (column) of the indicator
+        :param frames: indicator data of every symbol
+        """
+        frames = [df for df in frames if len(df)]
+        return cls.from_arrays(
+            name,
+            (df.index for df in frames),
+            (df[PriceDataColumns.SYMBOL].iloc[0] for df in frames),
+            (df[name].to_numpy() for df in frames),
+        )
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory used by values and timestamps (shared timestamps are counted once)."""
+        timestamps = {id(ts): ts.nbytes for ts in self.timestamps}
+        return sum(timestamps.values()) + sum(values.nbytes for values in self.values)
+
+    def position(self, symbol: str) -> int:
+        """Return the code of the symbol."""
+        try:
+            return self.symbols.index(symbol)
+        except ValueError:
+            raise KeyError(f"{symbol} is not a symbol of {self.name}.") from None
+
+    def symbol_arrays(self, symbol: str) -> tuple[ndarray, ndarray]:
+        """Return timestamps and values of the symbol (no copy)."""
+        i = self.position(symbol)
+        return self.timestamps[i], self.values[i]
+
+    def to_arrays(self) -> tuple[ndarray, ndarray, ndarray]:
+        """
+        Return the long format as flat arrays (every symbol after another).
+
+        :return: int32 symbol codes, int64 timestamps and values
+        """
+        lens = np.fromiter((len(values) for values in self.values), dtype=np.int64, count=len(self.values))
+        codes = np.repeat(np.arange(len(self.symbols), dtype=np.int32), lens)
+        if not len(self.values):
+            return codes, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        return codes, np.concatenate(self.timestamps), np.concatenate(self.values)
+
+    def _index(self, timestamps: ndarray) -> DatetimeIndex:
+        index = to_datetime(timestamps, unit="ns", utc=self.tz is not None)
+        return index.tz_convert(self.tz) if self.tz is not None else index
+
+    def symbol_frame(self, symbol: str) -> DataFrame:
+        """Return the indicator DataFrame of the symbol (as returned by `compute`)."""
+        timestamps, values = self.symbol_arrays(symbol)
+        return ma_numpy_to_dataframe(values, self._index(timestamps), symbol, self.name)
+
+    def to_frames(self) -> list[DataFrame]:
+        """Return the indicator DataFrames of every symbol (as returned by `compute`)."""
+        return [
+            ma_numpy_to_dataframe(values, self._index(timestamps), symbol, self.name)
+            for symbol, timestamps, values in zip(self.symbols, self.timestamps, self.values)
+        ]
+
+    def to_frame(self) -> DataFrame:
+        """Return the long format DataFrame indexed by date and categorical symbol (one row per symbol and bar)."""
+        codes, timestamps, values = self.to_arrays()
+        index = MultiIndex.from_arrays(
+            [self._index(timestamps), Categorical.from_codes(codes, categories=list(self.symbols))],
+            names=[PriceDataColumns.DATE, PriceDataColumns.SYMBOL],
+        )
+        return DataFrame({self.name: values}, index=index, copy=False)
@@ -1,3 +1,5 @@
+import numpy as np
+
 from arcana.price_data.dev_types import PriceDataColumns
 
 OHLC_ALIES = {
@@ -13,3 +15,25 @@ def src_converter(v):
         return inv_alies[v]
     raise ValueError(f"{v} is not valid src. Use {[al.value for al in OHLC_ALIES.keys()]}")
 
+
+PRECISIONS = ("float64", "float32")
+
+def precision_converter(v):
+    try:
+        precision = np.dtype(v).name
+    except TypeError:
+        precision = None
+    if precision not in PRECISIONS:
+        raise ValueError(f"{v} is not valid precision. Use {list(PRECISIONS)}")
+    return precision
+
+
+def periods_converter(v):
+    if isinstance(v, int):
+        v = (v,)
+    periods = tuple(dict.fromkeys(v))
+    if not periods:
+        raise ValueError("Provide at least one period.")
+    if not all(isinstance(period, int) and period > 0 for period in periods):
+        raise ValueError(f"{periods} are not valid periods. Use positive integers.")
+    return periods
@@ -7,9 +7,14 @@ from collections.abc import Iterable
 from arcana.utils.classes_utils import validate_classes_names
 from arcana.price_data.dev_types import PriceDataColumns
 from .c_definitions import ma_lib
-from .adapters import ma_prepare_data_to_c, ma_numpy_to_dataframe
+from .adapters import ma_prepare_data_to_c, ma_numpy_to_dataframe, ma_stack_rows, ma_grid_to_dataframe, ma_ptr_key
+from .plan import Node, source, kernel, linear
+from .cache import ResultCache
+from .store import IndicatorStore
+from .columnar import ColumnarIndicator
 from .cfg import *
 from arcana.utils.RegistryTree import RegistryTree
+from arcana.utils.metrics import metrics
 
 
 class Indicator(ABC):
@@ -23,10 +28,15 @@ class Indicator(ABC):
     ----------
     registry : RegistryTree
         Registry containing the inheritance tree of all defined indicators.
+    user_store : IndicatorStore
+        Indexed store of registered user-defined indicators.
+    result_cache : ResultCache
+        Content-addressed cache of computed indicator arrays (disabled by default).
     """
     __slots__ = ()
     registry = RegistryTree("Indicator")
-    user_registry = RegistryTree("Indicator")
+    user_store = IndicatorStore("Indicator")
+    result_cache = ResultCache()
 
     def __init_subclass__(cls, **kwargs):
         """
@@ -61,16 +71,9 @@ class MovingAverage(Indicator):
     """
     Abstract base class for all moving averages.
     Handles data preparation, validation, and registry for user-defined indicators.
-
-    Attributes
-    ----------
-    user_registry : RegistryTree
-        Stores registered user-defined moving averages.
     """
     __slots__ = ()
 
-    Indicator.user_registry.add_key("MovingAverage", parent="Indicator")
-
     @classmethod
     def compute(cls, df: list[DataFrame], * ,ma_cfg: MovingAverageCfg) -> list[DataFrame]:
         """
@@ -92,7 +95,7 @@ class MovingAverage(Indicator):
         raise NotImplementedError
 
     @classmethod
-    def calculate(cls, df: DataFrame, *, ma, src, period, user_name, extra: dict = None) -> DataFrame:
+    def calculate(cls, df: DataFrame, *, ma, src, period, user_name, extra: dict = None, dtype=np.float64) -> DataFrame:
         """
         Prepare data, call the C backend function, and return the result as DataFrame.
 
@@ -110,35 +113,230 @@ class MovingAverage(Indicator):
             Name under which the indicator will be registered.
         extra : dict, optional
             Additional parameters passed to the C function.
+        dtype : numpy.dtype, default float64
+            Precision of the data and of the result (float32 requires a single precision C function).
 
         Returns
         -------
         DataFrame
             Pandas DataFrame containing the calculated indicator values.
         """
-        data_to_prepare = dict()
+        ind = cls.calculate_values(df, ma=ma, src=src, period=period, extra=extra, dtype=dtype)
+        symbol = df[PriceDataColumns.SYMBOL].iloc[0]
+        with metrics.stage("indicator.to_dataframe", symbol=symbol, indicator=cls.name()) as stage:
+            res = ma_numpy_to_dataframe(ind, df.index, symbol, user_name)
+            if stage:
+                stage.add(rows=len(res), nbytes=int(res.memory_usage(index=True).sum()))
+        return res
+
+    @classmethod
+    def calculate_values(cls, df: DataFrame, *, ma, src, period, extra: dict = None, dtype=np.float64) -> np.ndarray:
+        """
+        Prepare data, call the C backend function, and return the raw result.
+
+        Parameters are the same as in `calculate`.
+
+        Returns
+        -------
+        numpy.ndarray
+            Array of the calculated indicator values (of the requested dtype).
+        """
+        symbol = df[PriceDataColumns.SYMBOL].iloc[0] if metrics.enabled and len(df) else None
+        with metrics.stage("indicator.prepare", symbol=symbol, indicator=cls.name()) as stage:
+            data_to_prepare = dict()
+
+            data = df[src].to_numpy(dtype=dtype)
+            ind = np.zeros_like(data)
+            data_to_prepare[ma_ptr_key(dtype)] = [data, ind]
+
+            length = len(data)
+            data_to_prepare["to_i"] = [length, period]
+
+            if extra:
+                for key, val in extra.items():
+                    if key not in data_to_prepare:
+                        data_to_prepare[key] = []
+                    if not isinstance(val, Iterable):
+                        data_to_prepare[key].append(val)
+                    else:
+                        data_to_prepare[key].extend(val)
+            stage.add(rows=length, nbytes=data.nbytes + ind.nbytes)
+
+        return cls.call_kernel(ma, data_to_prepare, ind, symbol=symbol, rows=length)
+
+    @classmethod
+    def calculate_batch(cls, df_list: list[DataFrame], *, ma_batch, src, period, user_name, extra: dict = None,
+                        dtype=np.float64) -> list[DataFrame]:
+        """
+        Prepare data for every symbol at once, make a single call to the batched C backend function
+        and return the results as DataFrames.
+
+        Parameters
+        ----------
+        df_list : list[DataFrame]
+            Input OHLCV data for every symbol.
+        ma_batch : Callable
+            Batched C function implementing the moving average.
+        src : str
+            Column name used as source data (e.g. "close").
+        period : int
+            Period (window) of the moving average.
+        user_name : str
+            Name under which the indicator will be registered.
+        extra : dict, optional
+            Additional parameters passed to the C function.
+        dtype : numpy.dtype, default float64
+            Precision of the data and of the result (float32 requires a single precision C function).
+
+        Returns
+        -------
+        list[DataFrame]
+            Pandas DataFrames containing the calculated indicator values (one per symbol).
+        """
+        values = cls.calculate_batch_values(df_list, ma_batch=ma_batch, src=src, period=period, extra=extra, dtype=dtype)
+        indicators = []
+        for ind, df in zip(values, df_list):
+            symbol = df[PriceDataColumns.SYMBOL].iloc[0]
+            with metrics.stage("indicator.to_dataframe", symbol=symbol, indicator=cls.name()) as stage:
+                res = ma_numpy_to_dataframe(ind, df.index, symbol, user_name)
+                if stage:
+                    stage.add(rows=len(res), nbytes=int(res.memory_usage(index=True).sum()))
+            indicators.append(res)
+        return indicators
 
-        data = df[src].to_numpy(dtype=np.float64)
-        ind = np.zeros_like(data)
-        data_to_prepare["to_d_ptr"] = [data, ind]
+    @classmethod
+    def calculate_batch_values(cls, df_list: list[DataFrame], *, ma_batch, src, period, extra: dict = None,
+                               dtype=np.float64) -> list[np.ndarray]:
+        """
+        Make a single call to the batched C backend function and return the raw results.
+
+        Parameters are the same as in `calculate_batch`.
+
+        Returns
+        -------
+        list[numpy.ndarray]
+            Arrays of the calculated indicator values (views of one matrix, one per symbol).
+        """
+        # a batch spans every symbol, so its stages are recorded per indicator only
+        with metrics.stage("indicator.prepare", indicator=cls.name()) as stage:
+            data_to_prepare = dict()
+
+            data, lens = ma_stack_rows((df[src].to_numpy(dtype=dtype) for df in df_list), dtype=dtype)
+            ind = np.zeros_like(data)
+            data_to_prepare[ma_ptr_key(dtype)] = [data, ind]
+            data_to_prepare["to_i_ptr"] = [lens]
+
+            n_rows, n_cols = data.shape
+            data_to_prepare["to_i"] = [n_rows, n_cols, period]
+
+            if extra:
+                for key, val in extra.items():
+                    if key not in data_to_prepare:
+                        data_to_prepare[key] = []
+                    if not isinstance(val, Iterable):
+                        data_to_prepare[key].append(val)
+                    else:
+                        data_to_prepare[key].extend(val)
+            stage.add(rows=int(lens.sum()), nbytes=data.nbytes + ind.nbytes)
+
+        ind = cls.call_kernel(ma_batch, data_to_prepare, ind, rows=int(lens.sum()))
+        return [ind[row, :lens[row]] for row in range(len(df_list))]
 
-        length = len(data)
-        data_to_prepare["to_i"] = [length, period]
+    @classmethod
+    def calculate_grid(cls, df: DataFrame, *, ma_grid, src, periods, user_name, dtype=np.float64) -> DataFrame:
+        """
+        Compute the moving average for every period with one traversal of the source data.
 
-        if extra:
-            for key, val in extra.items():
-                if key not in data_to_prepare:
-                    data_to_prepare[key] = []
-                if not isinstance(val, Iterable):
-                    data_to_prepare[key].append(val)
-                else:
-                    data_to_prepare[key].extend(val)
-        res = ma_prepare_data_to_c(**data_to_prepare)
-        ma(*res)
+        Parameters
+        ----------
+        df : DataFrame
+            Input OHLCV data.
+        ma_grid : Callable
+            C function implementing the moving average parameter grid.
+        src : str
+            Column name used as source data (e.g. "close").
+        periods : tuple[int]
+            Periods (windows) of the moving average.
+        user_name : str
+            Name under which the indicator will be registered. Columns are named `<user_name>_<period>`.
+        dtype : numpy.dtype, default float64
+            Precision of the data and of the result. There are no single precision grid kernels,
+            so float32 runs the single precision C function once per period.
 
+        Returns
+        -------
+        DataFrame
+            Pandas DataFrame containing the bars x periods matrix of the indicator values.
+        """
         symbol = df[PriceDataColumns.SYMBOL].iloc[0]
-        ind = ma_numpy_to_dataframe(ind, df.index, symbol, user_name)
-        return ind
+        if np.dtype(dtype) == np.float32:
+            ind = np.empty((len(df), len(periods)), dtype=np.float32)
+            for j, period in enumerate(periods):
+                ind[:, j] = cls.calculate_values(df, ma=cls.ma_f32, src=src, period=period, dtype=np.float32)
+        else:
+            with metrics.stage("indicator.prepare", symbol=symbol, indicator=cls.name()) as stage:
+                data = df[src].to_numpy(dtype=np.float64)
+                periods_ = np.asarray(periods, dtype=np.intc)
+                ind = np.zeros((len(data), len(periods_)), dtype=np.float64)
+                data_to_prepare = {"to_d_ptr": [data, ind], "to_i_ptr": [periods_], "to_i": [len(data), len(periods_)]}
+                stage.add(rows=len(data), nbytes=data.nbytes + ind.nbytes)
+            ind = cls.call_kernel(ma_grid, data_to_prepare, ind, symbol=symbol, rows=len(data))
+
+        names = [f"{user_name}_{period}" for period in periods]
+        with metrics.stage("indicator.to_dataframe", symbol=symbol, indicator=cls.name()) as stage:
+            res = ma_grid_to_dataframe(ind, df.index, symbol, names)
+            if stage:
+                stage.add(rows=len(res), nbytes=int(res.memory_usage(index=True).sum()))
+        return res
+
+    @classmethod
+    def call_kernel(cls, ma, data_to_prepare: dict, out: np.ndarray, *, symbol: str = None, rows: int = 0,
+                    name: str = None) -> np.ndarray:
+        """
+        Call the C backend function through the result cache.
+
+        Parameters
+        ----------
+        ma : Callable
+            C function.
+        data_to_prepare : dict
+            Arguments of `ma_prepare_data_to_c` (with `out` among the pointers).
+        out : numpy.ndarray
+            Array written by the C function.
+        symbol : str, optional
+            Symbol recorded in the metrics.
+        rows : int, default 0
+            Number of bars recorded in the metrics.
+        name : str, optional
+            Indicator recorded in the metrics. Default is the class name.
+
+        Returns
+        -------
+        numpy.ndarray
+            `out`, or a copy of the cached result (callers never share the cached array).
+        """
+        name = name or cls.name()
+        key = cls._cache_key(ma, data_to_prepare, out)
+        cached = cls.result_cache.get(key) if key else None
+        if cached:
+            return cached[0].copy()
+        with metrics.stage("indicator.convert", symbol=symbol, indicator=name):
+            res = ma_prepare_data_to_c(**data_to_prepare)
+        with metrics.stage("indicator.kernel", symbol=symbol, indicator=name, rows=rows):
+            ma(*res)
+        if key:
+            cls.result_cache.put(key, out.copy())
+        return out
+
+    @classmethod
+    def _cache_key(cls, ma, data_to_prepare: dict, out: np.ndarray) -> bytes | None:
+        """Return the result cache key of the C call (None if the cache is disabled)."""
+        if not cls.result_cache.enabled:
+            return None
+        pointers = ("to_d_ptr", "to_f_ptr", "to_i_ptr")
+        arrays = [arr for key in pointers for arr in data_to_prepare.get(key, []) if arr is not out]
+        params = {key: val for key, val in data_to_prepare.items() if key not in pointers}
+        return cls.result_cache.fingerprint(*arrays, kernel=ma.__name__, **params)
 
     @classmethod
     def _validate_names(cls, other: IndicatorCfg):
@@ -151,9 +349,14 @@ class BaseMovingAverage_(MovingAverage):
     """Base implementation of a moving average that integrates with the C backend."""
     __slots__ = ()
     ma = None
+    ma_batch = None
+    ma_grid = None
+    ma_f32 = None
+    ma_batch_f32 = None
 
     @classmethod
-    def compute(cls, df_list: list[DataFrame], *, ma_cfg: MovingAverageCfg) -> list[DataFrame]:
+    def compute(cls, df_list: list[DataFrame], *, ma_cfg: MovingAverageCfg, register: bool = True,
+                columnar: bool = False) -> list[DataFrame] | ColumnarIndicator:
         """
         Compute moving average for each OHLCV data in the input list.
 
@@ -166,26 +369,150 @@ class BaseMovingAverage_(MovingAverage):
             List of OHLCV DataFrames.
         ma_cfg : MovingAverageCfg
             Configuration object containing parameters for computation.
+        register : bool, default True
+            Whether to register the result in the user store.
+        columnar : bool, default False
+            Whether to return (and register) the compact `ColumnarIndicator` instead of DataFrames.
 
         Returns
         -------
-        list[pandas.DataFrame]
-            List of DataFrames with computed moving average values.
+        list[pandas.DataFrame] | ColumnarIndicator
+            List of DataFrames with computed moving average values, or their compact form.
         """
         validate_classes_names(cls.name(), ma_cfg.name)
+        ma, _ = cls.kernels(ma_cfg)
+        dtype = np.dtype(ma_cfg.precision)
+        if columnar:
+            values = [
+                cls.calculate_values(df, ma=ma, src=ma_cfg.src, period=ma_cfg.period, extra=cls.extra(df=df, ma_cfg=ma_cfg), dtype=dtype)
+                for df in df_list
+            ]
+            indicators = cls.to_columnar(df_list, values, ma_cfg.user_name)
+        else:
+            indicators = []
+            for df in df_list:
+                indicator = cls.calculate(df, ma=ma, src=ma_cfg.src, period=ma_cfg.period, user_name=ma_cfg.user_name, extra=cls.extra(df=df, ma_cfg=ma_cfg), dtype=dtype)
+                indicators.append(indicator)
+
+        if register:
+            cls.register(ma_cfg.user_name, indicators)
+        return indicators
+
+    @classmethod
+    def compute_batch(cls, df_list: list[DataFrame], *, ma_cfg: MovingAverageCfg, register: bool = True,
+                      columnar: bool = False) -> list[DataFrame] | ColumnarIndicator:
+        """
+        Compute moving average for every OHLCV data in the input list with a single call
+        to the batched C backend.
+
+        Gives the same result as `compute`, but the per-symbol Python overhead
+        (data extraction, ctypes conversion and the foreign call) is paid only once.
+
+        Parameters
+        ----------
+        df_list : list[pandas.DataFrame]
+            List of OHLCV DataFrames.
+        ma_cfg : MovingAverageCfg
+            Configuration object containing parameters for computation.
+        register : bool, default True
+            Whether to register the result in the user store.
+        columnar : bool, default False
+            Whether to return (and register) the compact `ColumnarIndicator` instead of DataFrames.
+
+        Returns
+        -------
+        list[pandas.DataFrame] | ColumnarIndicator
+            List of DataFrames with computed moving average values, or their compact form.
+        """
+        validate_classes_names(cls.name(), ma_cfg.name)
+        _, ma_batch = cls.kernels(ma_cfg)
+        dtype = np.dtype(ma_cfg.precision)
+        extra = cls.extra_batch(df_list=df_list, ma_cfg=ma_cfg)
+        if columnar:
+            values = cls.calculate_batch_values(df_list, ma_batch=ma_batch, src=ma_cfg.src, period=ma_cfg.period, extra=extra, dtype=dtype)
+            indicators = cls.to_columnar(df_list, values, ma_cfg.user_name)
+        else:
+            indicators = cls.calculate_batch(df_list, ma_batch=ma_batch, src=ma_cfg.src, period=ma_cfg.period, user_name=ma_cfg.user_name, extra=extra, dtype=dtype)
+
+        if register:
+            cls.register(ma_cfg.user_name, indicators)
+        return indicators
+
+    @classmethod
+    def compute_grid(cls, df_list: list[DataFrame], *, grid_cfg: MovingAverageGridCfg) -> list[DataFrame]:
+        """
+        Compute moving average for every period of the grid and every OHLCV data in the input list.
+
+        All periods share a single traversal of the source data, so sweeping
+        hundreds of periods costs about as much as one pass.
+
+        Parameters
+        ----------
+        df_list : list[pandas.DataFrame]
+            List of OHLCV DataFrames.
+        grid_cfg : MovingAverageGridCfg
+            Configuration object containing the source, the periods and the precision.
+
+        Returns
+        -------
+        list[pandas.DataFrame]
+            List of DataFrames (bars x periods) with computed moving average values.
+        """
+        validate_classes_names("MovingAverageGrid", grid_cfg.name)
+        if cls.ma_grid is None:
+            raise ValueError(f"{cls.name()} does not support parameter grids.")
+        if grid_cfg.precision == "float32" and cls.ma_f32 is None:
+            raise ValueError(f"{cls.name()} does not support float32 precision.")
+        dtype = np.dtype(grid_cfg.precision)
         indicators = []
         for df in df_list:
-            indicator = cls.calculate(df, ma=cls.ma, src=ma_cfg.src, period=ma_cfg.period, user_name=ma_cfg.user_name, extra=cls.extra(df=df, ma_cfg=ma_cfg))
+            indicator = cls.calculate_grid(df, ma_grid=cls.ma_grid, src=grid_cfg.src, periods=grid_cfg.periods,
+                                           user_name=grid_cfg.user_name, dtype=dtype)
             indicators.append(indicator)
 
-        cls.user_registry.add_key(ma_cfg.user_name, parent="MovingAverage", raw_data=indicators)
+        cls.register(grid_cfg.user_name, indicators)
         return indicators
 
+    @classmethod
+    def kernels(cls, ma_cfg: MovingAverageCfg) -> tuple:
+        """Return the single and the batched C functions for the precision of the Cfg."""
+        if ma_cfg.precision == "float32":
+            if cls.ma_f32 is None:
+                raise ValueError(f"{cls.name()} does not support float32 precision.")
+            return cls.ma_f32, cls.ma_batch_f32
+        return cls.ma, cls.ma_batch
+
+    @staticmethod
+    def to_columnar(df_list: list[DataFrame], values: list[np.ndarray], user_name: str) -> ColumnarIndicator:
+        """Wrap computed values into the compact form (symbols without data are skipped)."""
+        pairs = [(df, ind) for df, ind in zip(df_list, values) if len(df)]
+        return ColumnarIndicator.from_arrays(
+            user_name,
+            (df.index for df, _ in pairs),
+            (df[PriceDataColumns.SYMBOL].iloc[0] for df, _ in pairs),
+            (ind for _, ind in pairs),
+        )
+
+    @classmethod
+    def register(cls, user_name: str, indicators: list[DataFrame] | ColumnarIndicator):
+        """Register the computed moving average in the user store."""
+        cls.user_store.add(user_name, kind=cls.name(), category="MovingAverage", data=indicators)
+
     @staticmethod
     def extra(*, df, ma_cfg) -> dict:
         """Return extra parameters required by some indicators (default: empty)."""
         return dict()
 
+    @classmethod
+    def extra_batch(cls, *, df_list, ma_cfg) -> dict:
+        """Return extra parameters required by some batched indicators (default: same as `extra`)."""
+        return cls.extra(df=None, ma_cfg=ma_cfg)
+
+    @classmethod
+    def plan(cls, ma_cfg: MovingAverageCfg) -> Node:
+        """Return the dependency graph node of the moving average (default: the kernel applied to `src`)."""
+        return kernel(cls.ma.__name__, source(ma_cfg.src), params=(ma_cfg.period,))
+
 class ExtraMovingAverage_(BaseMovingAverage_):
     """
     Abstract base for moving averages that require additional parameters.
@@ -201,54 +528,367 @@ class SMA(BaseMovingAverage_):
     """Simple Moving Average (SMA)."""
     __slots__ = ()
     ma = ma_lib.sma
+    ma_batch = ma_lib.sma_batch
+    ma_f32 = ma_lib.sma_f32
+    ma_batch_f32 = ma_lib.sma_batch_f32
+    ma_grid = ma_lib.sma_grid
     is_in_registry = True
 
 class ESMA(ExtraMovingAverage_):
     __slots__ = ()
     ma = ma_lib.esma
+    ma_batch = ma_lib.esma_batch
+    ma_f32 = ma_lib.esma_f32
+    ma_batch_f32 = ma_lib.esma_batch_f32
 
     @staticmethod
     def extra(ma_cfg: ESMACfg, **kwargs):
         return {"to_d": ma_cfg.alpha}
 
+    @classmethod
+    def plan(cls, ma_cfg: ESMACfg) -> Node:
+        return kernel("esma", source(ma_cfg.src), params=(ma_cfg.period, ma_cfg.alpha))
+
 class EMA(BaseMovingAverage_):
     __slots__ = ()
     ma = ma_lib.ema
+    ma_batch = ma_lib.ema_batch
+    ma_f32 = ma_lib.ema_f32
+    ma_batch_f32 = ma_lib.ema_batch_f32
+    ma_grid = ma_lib.ema_grid
+
+    @classmethod
+    def plan(cls, ma_cfg: MovingAverageCfg) -> Node:
+        return cls.ema_node(source(ma_cfg.src), ma_cfg.period)
+
+    @staticmethod
+    def ema_node(node: Node, period: int) -> Node:
+        """Return the EMA of the node (EMA is ESMA with alpha = 2 / (period + 1))."""
+        return kernel("esma", node, params=(period, 2.0 / (period + 1.0)))
 
 class WMA(BaseMovingAverage_):
     __slots__ = ()
     ma = ma_lib.wma
+    ma_batch = ma_lib.wma_batch
+    ma_f32 = ma_lib.wma_f32
+    ma_batch_f32 = ma_lib.wma_batch_f32
+    ma_grid = ma_lib.wma_grid
 
 class HMA(BaseMovingAverage_):
     __slots__ = ()
     ma = ma_lib.hma
+    ma_batch = ma_lib.hma_batch
+    ma_f32 = ma_lib.hma_f32
+    ma_batch_f32 = ma_lib.hma_batch_f32
+
+    @classmethod
+    def plan(cls, ma_cfg: MovingAverageCfg) -> Node:
+        src = source(ma_cfg.src)
+        diff = linear((2.0, kernel("wma", src, params=(ma_cfg.period // 2,))), (-1.0, kernel("wma", src, params=(ma_cfg.period,))))
+        return kernel("wma", diff, params=(int(np.sqrt(ma_cfg.period)),))
 
 class RMA(BaseMovingAverage_):
     __slots__ = ()
     ma = ma_lib.rma
+    ma_batch = ma_lib.rma_batch
+    ma_f32 = ma_lib.rma_f32
+    ma_batch_f32 = ma_lib.rma_batch_f32
+    ma_grid = ma_lib.rma_grid
+
+    @classmethod
+    def plan(cls, ma_cfg: MovingAverageCfg) -> Node:
+        return kernel("esma", source(ma_cfg.src), params=(ma_cfg.period, 1.0 / ma_cfg.period))
 
 class TEMA(BaseMovingAverage_):
     __slots__ = ()
     ma = ma_lib.tema
+    ma_batch = ma_lib.tema_batch
+    ma_f32 = ma_lib.tema_f32
+    ma_batch_f32 = ma_lib.tema_batch_f32
+    ma_grid = ma_lib.tema_grid
+
+    @classmethod
+    def plan(cls, ma_cfg: MovingAverageCfg) -> Node:
+        ema_1 = EMA.ema_node(source(ma_cfg.src), ma_cfg.period)
+        ema_2 = EMA.ema_node(ema_1, ma_cfg.period)
+        ema_3 = EMA.ema_node(ema_2, ma_cfg.period)
+        return linear((3.0, ema_1), (-3.0, ema_2), (1.0, ema_3))
 
 class DEMA(BaseMovingAverage_):
     __slots__ = ()
     ma = ma_lib.dema
+    ma_batch = ma_lib.dema_batch
+    ma_f32 = ma_lib.dema_f32
+    ma_batch_f32 = ma_lib.dema_batch_f32
+    ma_grid = ma_lib.dema_grid
+
+    @classmethod
+    def plan(cls, ma_cfg: MovingAverageCfg) -> Node:
+        ema_1 = EMA.ema_node(source(ma_cfg.src), ma_cfg.period)
+        ema_2 = EMA.ema_node(ema_1, ma_cfg.period)
+        return linear((2.0, ema_1), (-1.0, ema_2))
 
 class KAMA(ExtraMovingAverage_):
     __slots__ = ()
     ma = ma_lib.kama
+    ma_batch = ma_lib.kama_batch
+    ma_f32 = ma_lib.kama_f32
+    ma_batch_f32 = ma_lib.kama_batch_f32
 
     @staticmethod
     def extra(ma_cfg: KAMACfg, **kwargs):
         return {"to_i": [ma_cfg.n_fast, ma_cfg.n_slow]}
 
+    @classmethod
+    def plan(cls, ma_cfg: KAMACfg) -> Node:
+        return kernel("kama", source(ma_cfg.src), params=(ma_cfg.period, ma_cfg.n_fast, ma_cfg.n_slow))
+
 class FRAMA(ExtraMovingAverage_):
     __slots__ = ()
     ma = ma_lib.frama
+    ma_batch = ma_lib.frama_batch
+    ma_f32 = ma_lib.frama_f32
+    ma_batch_f32 = ma_lib.frama_batch_f32
+
+    @staticmethod
+    def extra(df: DataFrame, ma_cfg: FRAMACfg, **kwargs):
+        dtype = np.dtype(ma_cfg.precision)
+        high = df[PriceDataColumns.HIGH].to_numpy(dtype=dtype)
+        low = df[PriceDataColumns.LOW].to_numpy(dtype=dtype)
+        return {ma_ptr_key(dtype): [high, low]}
+
+    @classmethod
+    def extra_batch(cls, *, df_list, ma_cfg: FRAMACfg, **kwargs):
+        dtype = np.dtype(ma_cfg.precision)
+        high, _ = ma_stack_rows((df[PriceDataColumns.HIGH].to_numpy(dtype=dtype) for df in df_list), dtype=dtype)
+        low, _ = ma_stack_rows((df[PriceDataColumns.LOW].to_numpy(dtype=dtype) for df in df_list), dtype=dtype)
+        return {ma_ptr_key(dtype): [high, low]}
+
+    @classmethod
+    def plan(cls, ma_cfg: MovingAverageCfg) -> Node:
+        return kernel("frama", source(ma_cfg.src), source(PriceDataColumns.HIGH), source(PriceDataColumns.LOW), params=(ma_cfg.period,))
+
+class MultiOutputIndicator_(Indicator):
+    """
+    Base implementation of indicators computing several outputs with one traversal
+    of the data (fused C backend).
+
+    The outputs of a symbol are returned as a single DataFrame with one column
+    per output, named `<user_name>_<output>`.
+    """
+    __slots__ = ()
+    ind = None
+    ind_batch = None
+    outputs: tuple[str] = ()
+
+    @classmethod
+    def compute(cls, df_list: list[DataFrame], *, ind_cfg: IndicatorCfg, register: bool = True) -> list[DataFrame]:
+        """
+        Compute every output of the indicator for each OHLCV data in the input list.
+
+        Parameters
+        ----------
+        df_list : list[pandas.DataFrame]
+            List of OHLCV DataFrames.
+        ind_cfg : IndicatorCfg
+            Configuration object containing parameters for computation.
+        register : bool, default True
+            Whether to register the result in the user store.
+
+        Returns
+        -------
+        list[pandas.DataFrame]
+            List of DataFrames with one column per output.
+        """
+        validate_classes_names(cls.name(), ind_cfg.name)
+        indicators = [cls.to_dataframe(df, cls.calculate_values(df, ind_cfg=ind_cfg), ind_cfg.user_name) for df in df_list]
+        if register:
+            cls.register(ind_cfg.user_name, indicators)
+        return indicators
+
+    @classmethod
+    def compute_batch(cls, df_list: list[DataFrame], *, ind_cfg: IndicatorCfg, register: bool = True) -> list[DataFrame]:
+        """
+        Compute every output of the indicator for every OHLCV data in the input list with a single call
+        to the batched C backend. Gives the same result as `compute`.
+
+        Parameters
+        ----------
+        df_list : list[pandas.DataFrame]
+            List of OHLCV DataFrames.
+        ind_cfg : IndicatorCfg
+            Configuration object containing parameters for computation.
+        register : bool, default True
+            Whether to register the result in the user store.
+
+        Returns
+        -------
+        list[pandas.DataFrame]
+            List of DataFrames with one column per output.
+        """
+        validate_classes_names(cls.name(), ind_cfg.name)
+        values = cls.calculate_batch_values(df_list, ind_cfg=ind_cfg)
+        indicators = [cls.to_dataframe(df, ind, ind_cfg.user_name) for df, ind in zip(df_list, values)]
+        if register:
+            cls.register(ind_cfg.user_name, indicators)
+        return indicators
+
+    @classmethod
+    def calculate_values(cls, df: DataFrame, *, ind_cfg: IndicatorCfg) -> np.ndarray:
+        """
+        Prepare data, call the C backend function, and return the raw result.
+
+        Parameters
+        ----------
+        df : DataFrame
+            Input OHLCV data.
+        ind_cfg : IndicatorCfg
+            Configuration object containing parameters for computation.
+
+        Returns
+        -------
+        numpy.ndarray
+            The (outputs, bars) matrix of the indicator values.
+        """
+        symbol = df[PriceDataColumns.SYMBOL].iloc[0] if metrics.enabled and len(df) else None
+        with metrics.stage("indicator.prepare", symbol=symbol, indicator=cls.name()) as stage:
+            data, *inputs = (df[col].to_numpy(dtype=np.float64) for col in cls.inputs(ind_cfg))
+            out = np.zeros((len(cls.outputs), len(data)), dtype=np.float64)
+            data_to_prepare = {"to_d_ptr": [data, *out, *inputs], "to_i": [len(data)]}
+            for key, val in cls.params(ind_cfg).items():
+                data_to_prepare.setdefault(key, []).extend(val)
+            stage.add(rows=len(data), nbytes=data.nbytes + out.nbytes)
+
+        key = cls._cache_key(cls.ind, data, inputs, data_to_prepare)
+        cached = cls.result_cache.get(key) if key else None
+        if cached:
+            # the DataFrame is built without copying, so it must not share the cached array
+            out = cached[0].copy()
+        else:
+            with metrics.stage("indicator.convert", symbol=symbol, indicator=cls.name()):
+                res = ma_prepare_data_to_c(**data_to_prepare)
+            with metrics.stage("indicator.kernel", symbol=symbol, indicator=cls.name(), rows=len(data)):
+                cls.ind(*res)
+            if key:
+                cls.result_cache.put(key, out.copy())
+        return out
+
+    @classmethod
+    def calculate_batch_values(cls, df_list: list[DataFrame], *, ind_cfg: IndicatorCfg) -> list[np.ndarray]:
+        """
+        Make a single call to the batched C backend function and return the raw results.
+
+        Parameters
+        ----------
+        df_list : list[DataFrame]
+            Input OHLCV data for every symbol.
+        ind_cfg : IndicatorCfg
+            Configuration object containing parameters for computation.
+
+        Returns
+        -------
+        list[numpy.ndarray]
+            The (outputs, bars) matrices of the indicator values (one per symbol).
+        """
+        with metrics.stage("indicator.prepare", indicator=cls.name()) as stage:
+            stacked = [ma_stack_rows(df[col].to_numpy(dtype=np.float64) for df in df_list) for col in cls.inputs(ind_cfg)]
+            (data, lens), *inputs = stacked
+            inputs = [matrix for matrix, _ in inputs]
+            out = np.zeros((len(cls.outputs), *data.shape), dtype=np.float64)
+
+            n_rows, n_cols = data.shape
+            data_to_prepare = {"to_d_ptr": [data, *out, *inputs], "to_i_ptr": [lens], "to_i": [n_rows, n_cols]}
+            for key, val in cls.params(ind_cfg).items():
+                data_to_prepare.setdefault(key, []).extend(val)
+            stage.add(rows=int(lens.sum()), nbytes=data.nbytes + out.nbytes)
+
+        key = cls._cache_key(cls.ind_batch, data, inputs, data_to_prepare)
+        cached = cls.result_cache.get(key) if key else None
+        if cached:
+            out = cached[0].copy()
+        else:
+            with metrics.stage("indicator.convert", indicator=cls.name()):
+                res = ma_prepare_data_to_c(**data_to_prepare)
+            with metrics.stage("indicator.kernel", indicator=cls.name(), rows=int(lens.sum())):
+                cls.ind_batch(*res)
+            if key:
+                cls.result_cache.put(key, out.copy())
+        return [out[:, row, :lens[row]] for row in range(len(df_list))]
+
+    @classmethod
+    def to_dataframe(cls, df: DataFrame, values: np.ndarray, user_name: str) -> DataFrame:
+        """Return the DataFrame of the (outputs, bars) matrix of a symbol."""
+        symbol = df[PriceDataColumns.SYMBOL].iloc[0]
+        with metrics.stage("indicator.to_dataframe", symbol=symbol, indicator=cls.name()) as stage:
+            res = ma_grid_to_dataframe(values.T, df.index, symbol, [f"{user_name}_{output}" for output in cls.outputs])
+            if stage:
+                stage.add(rows=len(res), nbytes=int(res.memory_usage(index=True).sum()))
+        return res
+
+    @classmethod
+    def _cache_key(cls, ind, data: np.ndarray, inputs: list[np.ndarray], data_to_prepare: dict) -> bytes | None:
+        """Return the result cache key of the C call (None if the cache is disabled)."""
+        if not cls.result_cache.enabled:
+            return None
+        params = {key: val for key, val in data_to_prepare.items() if key not in ("to_d_ptr", "to_i_ptr")}
+        return cls.result_cache.fingerprint(data, *inputs, *data_to_prepare.get("to_i_ptr", []), kernel=ind.__name__, **params)
+
+    @classmethod
+    def register(cls, user_name: str, indicators: list[DataFrame]):
+        """Register the computed indicator in the user store (under the family of the indicator)."""
+        cls.user_store.add(user_name, kind=cls.name(), category=cls.__base__.name(), data=indicators)
+
+    @staticmethod
+    def inputs(ind_cfg: IndicatorCfg) -> tuple[str]:
+        """Return the source columns (the main source first, then extra inputs of the C function)."""
+        return (ind_cfg.src,)
+
+    @staticmethod
+    def params(ind_cfg: IndicatorCfg) -> dict:
+        """Return the parameters passed to the C function after the data."""
+        raise NotImplementedError
+
+class Oscillator(MultiOutputIndicator_):
+    """Abstract base class for oscillators."""
+    __slots__ = ()
+
+class Band(MultiOutputIndicator_):
+    """Abstract base class for bands and channels around a moving average."""
+    __slots__ = ()
+
+class MACD(Oscillator):
+    """Moving Average Convergence Divergence (line, signal and histogram)."""
+    __slots__ = ()
+    ind = ma_lib.macd
+    ind_batch = ma_lib.macd_batch
+    outputs = ("line", "signal", "hist")
+
+    @staticmethod
+    def params(ind_cfg: MACDCfg) -> dict:
+        return {"to_i": [ind_cfg.fast, ind_cfg.slow, ind_cfg.signal]}
+
+class BollingerBands(Band):
+    """Bollinger Bands (middle SMA, upper and lower band at mult population standard deviations)."""
+    __slots__ = ()
+    ind = ma_lib.bollinger
+    ind_batch = ma_lib.bollinger_batch
+    outputs = ("mid", "upper", "lower")
+
+    @staticmethod
+    def params(ind_cfg: BollingerBandsCfg) -> dict:
+        return {"to_i": [ind_cfg.period], "to_d": [ind_cfg.mult]}
+
+class KeltnerChannel(Band):
+    """Keltner Channel (middle EMA, upper and lower band at mult ATRs)."""
+    __slots__ = ()
+    ind = ma_lib.keltner
+    ind_batch = ma_lib.keltner_batch
+    outputs = ("mid", "upper", "lower")
+
+    @staticmethod
+    def inputs(ind_cfg: KeltnerChannelCfg) -> tuple[str]:
+        return ind_cfg.src, PriceDataColumns.HIGH, PriceDataColumns.LOW, PriceDataColumns.CLOSE
 
     @staticmethod
-    def extra(df: DataFrame, **kwargs):
-        high = df[PriceDataColumns.HIGH].to_numpy(dtype=np.float64)
-        low = df[PriceDataColumns.LOW].to_numpy(dtype=np.float64)
-        return {"to_d_ptr": [high, low]}
\ No newline at end of file
+    def params(ind_cfg: KeltnerChannelCfg) -> dict:
+        return {"to_i": [ind_cfg.period, ind_cfg.atr_period], "to_d": [ind_cfg.mult]}
@@ -1,4 +1,11 @@
-from .indicators import Indicator, MovingAverage, MovingAverageCfg
+from .indicators import Indicator, MovingAverage, MultiOutputIndicator_, IndicatorCfg, MovingAverageCfg, MovingAverageGridCfg
+from .streaming import StreamingMovingAverage, streaming_counterpart
+from .plan import IndicatorPlan
+from .columnar import ColumnarIndicator
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from math import ceil
+from os import cpu_count
 from typing import Type
 
 from pandas import DataFrame
@@ -9,25 +16,126 @@ from arcana.utils.df_utils import stack_data
 
 class IndicatorData:
     """The interface for handling indicators."""
-    def __init__(self, price_data: PriceData | list[DataFrame]):
+    def __init__(self, price_data: PriceData | list[DataFrame], *, max_workers: int = None):
         if isinstance(price_data, PriceData):
             self._raw_price_data = price_data.prices_raw
         else:
             self._raw_price_data = price_data
+        self._max_workers = max_workers
 
     @property
     def raw_price_data(self):
         return self._raw_price_data
 
-    def add_moving_average(self, indicator: Type[MovingAverage], *, ind_config: MovingAverageCfg):
+    def add_moving_average(self, indicator: Type[MovingAverage], *, ind_config: MovingAverageCfg, batch: bool = False,
+                           columnar: bool = False):
         """
         Add moving average.
 
         :param indicator: any moving average indicator
         :param ind_config: the indicator Cfg
+        :param batch: compute every symbol with a single call to the batched C backend. default is False
+        :param columnar: keep the result in the compact columnar form, DataFrames are built only on request. default is False
         """
         validate_classes_names(ind_config.name, indicator.name())
-        indicator.compute(self._raw_price_data, ma_cfg=ind_config)
+        if batch:
+            indicator.compute_batch(self._raw_price_data, ma_cfg=ind_config, columnar=columnar)
+        else:
+            indicator.compute(self._raw_price_data, ma_cfg=ind_config, columnar=columnar)
+
+    def add_indicator(self, indicator: Type[MultiOutputIndicator_], *, ind_config: IndicatorCfg, batch: bool = False) -> list[DataFrame]:
+        """
+        Add multi-output indicator (MACD, BollingerBands, KeltnerChannel).
+        All outputs are computed with one traversal of the data and kept in a single indicator,
+        one column per output.
+
+        :param indicator: any multi-output indicator
+        :param ind_config: the indicator Cfg
+        :param batch: compute every symbol with a single call to the batched C backend. default is False
+        :return: list of indicator data for every symbol
+        """
+        validate_classes_names(ind_config.name, indicator.name())
+        if batch:
+            return indicator.compute_batch(self._raw_price_data, ind_cfg=ind_config)
+        return indicator.compute(self._raw_price_data, ind_cfg=ind_config)
+
+    def add_moving_averages(self, jobs: Iterable[tuple[Type[MovingAverage], MovingAverageCfg]], *,
+                            max_workers: int = None, chunk_size: int = None) -> list[list[DataFrame]]:
+        """
+        Add many moving averages at once, computed in parallel on a thread pool.
+
+        Every job is split into chunks of symbols computed with the batched C backend
+        (which releases the GIL). Results are registered in the order of `jobs`,
+        exactly as if `add_moving_average` was called for every job.
+
+        :param jobs: pairs of moving average indicator and its Cfg
+        :param max_workers: size of the thread pool. default is the value given to the constructor or the CPU count
+        :param chunk_size: number of symbols in one task. default splits the symbols so that every worker gets a task
+        :return: list of indicator data for every job (in the order of jobs)
+        """
+        jobs = list(jobs)
+        for indicator, ind_config in jobs:
+            validate_classes_names(ind_config.name, indicator.name())
+        if not jobs:
+            return []
+
+        max_workers = max_workers or self._max_workers or cpu_count() or 1
+        n_symbols = len(self._raw_price_data)
+        if chunk_size is None:
+            n_chunks = max(1, min(n_symbols, ceil(max_workers / len(jobs))))
+            chunk_size = max(1, ceil(n_symbols / n_chunks))
+        chunks = [self._raw_price_data[i:i + chunk_size] for i in range(0, n_symbols, chunk_size)]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                [executor.submit(indicator.compute_batch, chunk, ma_cfg=ind_config, register=False) for chunk in chunks]
+                for indicator, ind_config in jobs
+            ]
+            results = [[df for future in job_futures for df in future.result()] for job_futures in futures]
+
+        for (indicator, ind_config), indicators in zip(jobs, results):
+            indicator.register(ind_config.user_name, indicators)
+        return results
+
+    def add_plan(self, jobs: Iterable[tuple[Type[MovingAverage], MovingAverageCfg]] | IndicatorPlan) -> list[list[DataFrame]]:
+        """
+        Add a set of moving averages computed together as a plan.
+        Intermediate series shared by several indicators (e.g. the EMA chains of EMA, DEMA and TEMA
+        with the same source and period) are computed once per symbol.
+        Results are registered in the order of `jobs`.
+
+        :param jobs: pairs of moving average indicator and its Cfg, or a ready plan
+        :return: list of indicator data for every job (in the order of jobs)
+        """
+        plan = jobs if isinstance(jobs, IndicatorPlan) else IndicatorPlan(jobs)
+        results = plan.compute(self._raw_price_data)
+        for (indicator, ind_config), indicators in zip(plan.jobs, results):
+            indicator.register(ind_config.user_name, indicators)
+        return results
+
+    def add_moving_average_grid(self, indicator: Type[MovingAverage], *, grid_config: MovingAverageGridCfg):
+        """
+        Add moving average for every period of the grid.
+        The result is a single indicator holding one column per period.
+
+        :param indicator: any moving average indicator supporting grids (SMA, EMA, WMA, RMA, DEMA, TEMA)
+        :param grid_config: the grid Cfg
+        """
+        indicator.compute_grid(self._raw_price_data, grid_cfg=grid_config)
+
+    def stream_moving_average(self, indicator: Type[MovingAverage], *, ind_config: MovingAverageCfg) -> list[StreamingMovingAverage]:
+        """
+        Add moving average and return its streaming counterparts seeded with the computed history.
+        Every new bar can then be applied with `update` in constant time.
+
+        :param indicator: any moving average indicator
+        :param ind_config: the indicator Cfg
+        :return: streaming moving average for every symbol
+        """
+        validate_classes_names(ind_config.name, indicator.name())
+        stream_cls = streaming_counterpart(indicator)
+        indicators = indicator.compute(self._raw_price_data, ma_cfg=ind_config)
+        return [stream_cls.from_compute(df, ind, ma_cfg=ind_config) for df, ind in zip(self._raw_price_data, indicators)]
 
     @staticmethod
     def get_ind_raw_data(ind_name: str) -> list[DataFrame]:
@@ -37,9 +145,31 @@ class IndicatorData:
         :param ind_name: the indicator name
         :return: list of indicator data for every symbol
         """
-        raw_data = Indicator.user_registry.get_data(ind_name, "raw_data")
+        raw_data = Indicator.user_store.get_raw_data(ind_name)
         return raw_data
 
+    @staticmethod
+    def get_ind_columnar(ind_name: str) -> ColumnarIndicator:
+        """
+        Get indicator data in the compact columnar form
+        (float64 values and int64 timestamps for every symbol, dictionary encoded symbols).
+
+        :param ind_name: the indicator name
+        :return: compact indicator data
+        """
+        return Indicator.user_store.get_columnar(ind_name)
+
+    @staticmethod
+    def get_ind_symbol_data(ind_name: str, symbol: str) -> DataFrame:
+        """
+        Get indicator data of a single symbol.
+
+        :param ind_name: the indicator name
+        :param symbol: the symbol
+        :return: indicator data of the symbol
+        """
+        return Indicator.user_store.get_symbol_data(ind_name, symbol)
+
     @staticmethod
     def get_ind_data(ind_name: str) -> DataFrame:
         """
@@ -48,20 +178,50 @@ class IndicatorData:
         :param ind_name: the indicator name
         :return: stacked indicator data
         """
-        raw_data = Indicator.user_registry.get_data(ind_name, "raw_data")
+        raw_data = Indicator.user_store.get_raw_data(ind_name)
         symbols = [df[PriceDataColumns.SYMBOL].iloc[0] for df in raw_data]
         data = stack_data(raw_data, symbols)
         return data
 
+    @staticmethod
+    def configure_cache(max_bytes: int):
+        """
+        Set the memory budget of the indicator result cache.
+        Repeated computations (same prices, indicator and parameters) are then served
+        from memory, least recently used results are evicted over the budget.
+
+        :param max_bytes: memory budget in bytes, 0 disables the cache
+        """
+        Indicator.result_cache.max_bytes = max_bytes
+
+    @staticmethod
+    def cache_stats() -> dict[str, int]:
+        """Return hit/miss/eviction counters and the memory usage of the indicator result cache."""
+        return Indicator.result_cache.stats()
+
     @staticmethod
     def get_supported_indicators() -> tuple[str]:
         """Return all supported indicators names."""
         return Indicator.registry.all_registered()
 
     @staticmethod
-    def get_user_indicators() -> tuple[str]:
-        """Return all user  indicators names."""
-        return Indicator.user_registry.all_registered()
+    def get_user_indicators(*, symbol: str = None, type_: str = None) -> tuple[str]:
+        """
+        Return user indicators names (in the order of registration).
+
+        :param symbol: only indicators computed for the symbol. default is None (any)
+        :param type_: only indicators of the type, e.g. "SMA" or "MovingAverage". default is None (any)
+        """
+        return Indicator.user_store.names(symbol=symbol, type_=type_)
+
+    @staticmethod
+    def remove_user_indicator(ind_name: str):
+        """
+        Remove user indicator.
+
+        :param ind_name: the indicator name
+        """
+        Indicator.user_store.remove(ind_name)
 
     @staticmethod
     def show_supported_indicators():
@@ -71,4 +231,4 @@ class IndicatorData:
     @staticmethod
     def show_user_indicators():
         """Render the tree of user indicators."""
-        Indicator.user_registry.render_tree()
\ No newline at end of file
+        Indicator.user_store.render_tree()
\ No newline at end of file
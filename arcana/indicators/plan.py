@@ -0,0 +1,172 @@
+from collections import Counter
+from collections.abc import Iterable
+from typing import Type
+
+import attrs
+import numpy as np
+from pandas import DataFrame
+
+from arcana.price_data.dev_types import PriceDataColumns
+from arcana.utils.classes_utils import validate_classes_names
+from arcana.utils.metrics import metrics
+from .c_definitions import ma_lib
+from .adapters import ma_numpy_to_dataframe
+from .cfg import IndicatorCfg
+
+
+@attrs.frozen
+class Node:
+    """
+    A series in the indicator dependency graph.
+
+    Nodes are compared by value, so two indicators asking for the same
+    intermediate series (e.g. EMA(20) of close) share the same node.
+
+    Attributes
+    ----------
+    op : str
+        "src" (a price column), "lin" (linear combination of the inputs)
+        or the name of a C kernel in `ma_lib`.
+    inputs : tuple[Node]
+        Series the node is computed from.
+    params : tuple
+        Source column, kernel parameters or linear coefficients.
+    """
+    op: str
+    inputs: tuple = ()
+    params: tuple = ()
+
+
+def source(column: str) -> Node:
+    """Return the node of a price column."""
+    return Node("src", (), (column,))
+
+
+def kernel(name: str, *inputs: Node, params: tuple = ()) -> Node:
+    """Return the node of a C kernel applied to the inputs (the data input first)."""
+    return Node(name, inputs, params)
+
+
+def linear(*terms: tuple[float, Node]) -> Node:
+    """Return the node of a linear combination `sum(coef * node)`, evaluated left to right."""
+    return Node("lin", tuple(node for _, node in terms), tuple(float(coef) for coef, _ in terms))
+
+
+def _evaluate_node(node: Node, inputs: list[np.ndarray], df: DataFrame, call_kernel, symbol: str) -> np.ndarray:
+    """Compute a single node from its already computed inputs (kernels are called through `call_kernel`)."""
+    if node.op == "src":
+        return df[node.params[0]].to_numpy(dtype=np.float64)
+
+    if node.op == "lin":
+        res = node.params[0] * inputs[0]
+        for coef, data in zip(node.params[1:], inputs[1:]):
+            res += coef * data
+        return res
+
+    data = inputs[0]
+    out = np.zeros_like(data)
+    ints = [param for param in node.params if isinstance(param, int)]
+    doubles = [param for param in node.params if isinstance(param, float)]
+    data_to_prepare = {"to_d_ptr": [data, out, *inputs[1:]], "to_i": [len(data), *ints]}
+    if doubles:
+        data_to_prepare["to_d"] = doubles
+    return call_kernel(getattr(ma_lib, node.op), data_to_prepare, out, symbol=symbol, rows=len(data), name=node.op)
+
+
+class IndicatorPlan:
+    """
+    A set of indicators computed together from a DAG of the primitive series they need.
+
+    Every unique node is computed once per symbol, so e.g. EMA(20), DEMA(20) and TEMA(20)
+    on the same source share their EMA chain, and every source column is extracted once.
+    Kernels are called through the result cache and the metrics of the indicators.
+    The graph is evaluated in double precision, float32 jobs are computed on their own
+    by the single precision kernels.
+    """
+    __slots__ = ("_jobs", "_outputs", "_order", "_consumers")
+
+    def __init__(self, jobs: Iterable[tuple[Type, IndicatorCfg]]):
+        """
+        :param jobs: pairs of indicator (with a `plan` method) and its Cfg
+        """
+        self._jobs = list(jobs)
+        for indicator, ind_config in self._jobs:
+            validate_classes_names(ind_config.name, indicator.name())
+        # None for the jobs outside of the graph
+        self._outputs = [
+            indicator.plan(ind_config) if getattr(ind_config, "precision", "float64") == "float64" else None
+            for indicator, ind_config in self._jobs
+        ]
+
+        # topological order of unique nodes (inputs before consumers)
+        self._order = []
+        visited = set()
+        stack = [(node, False) for node in reversed(self._outputs) if node is not None]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                self._order.append(node)
+                continue
+            if node in visited:
+                continue
+            visited.add(node)
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(node.inputs) if child not in visited)
+
+        self._consumers = Counter(child for node in self._order for child in node.inputs)
+
+    @property
+    def jobs(self) -> list[tuple[Type, IndicatorCfg]]:
+        return self._jobs
+
+    @property
+    def nodes(self) -> tuple[Node]:
+        """Return the unique nodes in evaluation order."""
+        return tuple(self._order)
+
+    def evaluate(self, df: DataFrame) -> list[np.ndarray]:
+        """
+        Compute the plan for a single symbol.
+
+        :param df: OHLCV data of the symbol
+        :return: indicator values for every job (in the order of jobs)
+        """
+        # imported here, the indicators module imports the nodes from this one
+        from .indicators import MovingAverage
+
+        symbol = df[PriceDataColumns.SYMBOL].iloc[0] if metrics.enabled and len(df) else None
+        outputs = set(self._outputs)
+        remaining = self._consumers.copy()
+        values = {}
+        for node in self._order:
+            values[node] = _evaluate_node(node, [values[child] for child in node.inputs], df, MovingAverage.call_kernel, symbol)
+            # intermediate series are dropped as soon as their last consumer is computed
+            for child in node.inputs:
+                remaining[child] -= 1
+                if not remaining[child] and child not in outputs:
+                    del values[child]
+
+        results = []
+        for (indicator, ind_config), node in zip(self._jobs, self._outputs):
+            if node is not None:
+                results.append(values[node])
+                continue
+            ma, _ = indicator.kernels(ind_config)
+            results.append(indicator.calculate_values(df, ma=ma, src=ind_config.src, period=ind_config.period,
+                                                      extra=indicator.extra(df=df, ma_cfg=ind_config),
+                                                      dtype=np.dtype(ind_config.precision)))
+        return results
+
+    def compute(self, df_list: list[DataFrame]) -> list[list[DataFrame]]:
+        """
+        Compute the plan for every symbol.
+
+        :param df_list: list of OHLCV DataFrames
+        :return: list of indicator data for every job (in the order of jobs)
+        """
+        results = [[] for _ in self._jobs]
+        for df in df_list:
+            symbol = df[PriceDataColumns.SYMBOL].iloc[0]
+            for res, (_, ind_config), data in zip(results, self._jobs, self.evaluate(df)):
+                res.append(ma_numpy_to_dataframe(data, df.index, symbol, ind_config.user_name))
+        return results
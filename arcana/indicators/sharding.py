@@ -0,0 +1,180 @@
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from os import cpu_count
+from typing import Type
+
+import attrs
+import numpy as np
+from pandas import Categorical, CategoricalDtype, DataFrame, DatetimeIndex
+
+from arcana.price_data import PriceData, PriceDataColumns
+from arcana.price_data.cfg import CSVCfg, PriceDataCfg
+from arcana.price_data.converters import index_to_timestamps
+from arcana.price_data.loader import PriceDataLoader, _csv_paths
+from arcana.utils.metrics import metrics
+from .indicators import Indicator, MultiOutputIndicator_
+from .cfg import IndicatorCfg
+
+
+def _compute(indicator: Type[Indicator], ind_cfg: IndicatorCfg, df_list: list[DataFrame]) -> list[DataFrame]:
+    if issubclass(indicator, MultiOutputIndicator_):
+        return indicator.compute(df_list, ind_cfg=ind_cfg, register=False)
+    return indicator.compute(df_list, ma_cfg=ind_cfg, register=False)
+
+
+def _frame_layout(df: DataFrame) -> dict:
+    """Return what is needed to rebuild the frame from its float64 columns and the shared dates."""
+    return {
+        "columns": list(df.columns),
+        "categorical_symbol": isinstance(df[PriceDataColumns.SYMBOL].dtype, CategoricalDtype),
+        "dtypes": [str(dtype) for col, dtype in df.dtypes.items() if col != PriceDataColumns.SYMBOL],
+        "index_name": df.index.name,
+        "tz": str(df.index.tz) if getattr(df.index, "tz", None) is not None else None,
+    }
+
+
+def _shard_cfg(data_cfg: PriceDataCfg, symbols: list[str]) -> PriceDataCfg:
+    """Return the Cfg loading the symbols of the shard (a CSV shard gets only the files of its symbols)."""
+    if isinstance(data_cfg, CSVCfg):
+        paths = _csv_paths(data_cfg)
+        return attrs.evolve(data_cfg, symbols=symbols, path=[paths[symbol] for symbol in symbols])
+    return attrs.evolve(data_cfg, symbols=symbols)
+
+
+def _run_shard(loader_factory: PriceDataLoader, data_cfg: PriceDataCfg,
+               jobs: list[tuple[Type[Indicator], IndicatorCfg]]) -> tuple[str, list[dict]]:
+    """
+    Load the shard and compute every job, then write the results into a shared memory block.
+
+    The block holds, for every symbol, the int64 dates followed by the (columns, bars) float64
+    values of the prices and of every job (indicators share the dates of the prices).
+    Only the block name and the small layout are returned (pickled) to the parent process.
+    Symbols without bars are left out (their symbol is only known from their rows).
+    """
+    price_data = PriceData(loader_factory)
+    price_data.load(data_cfg)
+    prices = price_data.prices_raw
+    results = [_compute(indicator, ind_cfg, prices) for indicator, ind_cfg in jobs]
+
+    kept = [i for i, df in enumerate(prices) if len(df)]
+    layout, size = [], 0
+    for i in kept:
+        df = prices[i]
+        frames = [df] + [res[i] for res in results]
+        for frame in frames[1:]:
+            if len(frame) != len(df):
+                raise ValueError(f"{frame.columns[-1]}: {len(frame)} values != {len(df)} bars.")
+        n_values = sum(len(frame.columns) - (PriceDataColumns.SYMBOL in frame.columns) for frame in frames)
+        layout.append({
+            "symbol": str(df[PriceDataColumns.SYMBOL].iloc[0]),
+            "rows": len(df),
+            "offset": size,
+            "frames": [_frame_layout(frame) for frame in frames],
+        })
+        size += len(df) * (1 + n_values) * 8
+
+    shm = SharedMemory(create=True, size=max(size, 1))
+    # the parent process owns (and frees) the block once it is returned
+    resource_tracker.unregister(shm._name, "shared_memory")
+    try:
+        for i, entry in zip(kept, layout):
+            rows = entry["rows"]
+            dates = np.ndarray((rows,), dtype=np.int64, buffer=shm.buf, offset=entry["offset"])
+            dates[:] = index_to_timestamps(prices[i].index)
+            offset = entry["offset"] + rows * 8
+            for frame in [prices[i]] + [res[i] for res in results]:
+                for col in frame.columns:
+                    if col == PriceDataColumns.SYMBOL:
+                        continue
+                    np.ndarray((rows,), dtype=np.float64, buffer=shm.buf, offset=offset)[:] = frame[col].to_numpy(dtype=np.float64)
+                    offset += rows * 8
+    except BaseException:
+        shm.unlink()
+        raise
+    finally:
+        shm.close()
+    return shm.name, layout
+
+
+def _read_shard(name: str, layout: list[dict]) -> list[list[DataFrame]]:
+    """Rebuild the frames of the shard (one copy of the block, every frame is a view of it) and free the block."""
+    shm = SharedMemory(name=name)
+    try:
+        buffer = np.frombuffer(shm.buf, dtype=np.uint8).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    shard = []
+    for entry in layout:
+        rows, offset = entry["rows"], entry["offset"]
+        dates = buffer[offset:offset + rows * 8].view(np.int64)
+        offset += rows * 8
+        frames = []
+        for frame in entry["frames"]:
+            index = DatetimeIndex(dates.view("M8[ns]"), name=frame["index_name"])
+            if frame["tz"] is not None:
+                index = index.tz_localize("UTC").tz_convert(frame["tz"])
+            data, dtypes = dict(), iter(frame["dtypes"])
+            for col in frame["columns"]:
+                if col == PriceDataColumns.SYMBOL:
+                    if frame["categorical_symbol"]:
+                        data[col] = Categorical.from_codes(np.zeros(rows, dtype=np.int8), [entry["symbol"]])
+                    else:
+                        data[col] = np.full(rows, entry["symbol"], dtype=object)
+                    continue
+                values = buffer[offset:offset + rows * 8].view(np.float64)
+                dtype = next(dtypes)
+                data[col] = values if dtype == "float64" else values.astype(dtype)
+                offset += rows * 8
+            frames.append(DataFrame(data, index=index, columns=frame["columns"], copy=False))
+        shard.append(frames)
+    return shard
+
+
+def compute_sharded(loader_factory: PriceDataLoader, data_cfg: PriceDataCfg,
+                    jobs: Iterable[tuple[Type[Indicator], IndicatorCfg]], *, max_workers: int = None,
+                    n_shards: int = None, register: bool = True) -> tuple[list[DataFrame], list[list[DataFrame]]]:
+    """
+    Load the symbols and compute the indicators on a process pool.
+
+    The symbols are split into contiguous shards, every worker process loads its shard and computes
+    every job for it, so the pandas-heavy parts (normalization, DataFrame construction) run in parallel.
+    Results are returned through shared memory blocks instead of pickled DataFrames and are the same
+    as loading with `PriceData` and computing the jobs in a single process, except that symbols
+    without bars are left out.
+
+    :param loader_factory: the loader factory (must be picklable)
+    :param data_cfg: the loader Cfg
+    :param jobs: pairs of indicator and its Cfg
+    :param max_workers: number of worker processes. default is the CPU count
+    :param n_shards: number of shards. default is the number of workers
+    :param register: register the indicators in the user store (in the order of jobs). default is True
+    :return: prices of every symbol and the indicator data of every job (in the order of symbols)
+    """
+    jobs = list(jobs)
+    max_workers = max_workers or cpu_count() or 1
+    symbols = list(data_cfg.symbols)
+    n_shards = max(1, min(len(symbols), n_shards or max_workers))
+    shards = [list(shard) for shard in np.array_split(np.array(symbols, dtype=object), n_shards)]
+
+    with metrics.stage("sharded", rows=len(symbols)):
+        with ProcessPoolExecutor(max_workers=min(max_workers, n_shards)) as executor:
+            futures = [executor.submit(_run_shard, loader_factory, _shard_cfg(data_cfg, shard), jobs)
+                       for shard in shards]
+            # every block is read (and freed) even if another shard failed
+            blocks = [future.exception() or future.result() for future in futures]
+        errors = [block for block in blocks if isinstance(block, BaseException)]
+        shard_frames = [_read_shard(*block) for block in blocks if not isinstance(block, BaseException)]
+        if errors:
+            raise errors[0]
+
+    frames = [symbol_frames for shard in shard_frames for symbol_frames in shard]
+    prices = [symbol_frames[0] for symbol_frames in frames]
+    results = [[symbol_frames[j + 1] for symbol_frames in frames] for j in range(len(jobs))]
+    if register:
+        for (indicator, ind_cfg), indicators in zip(jobs, results):
+            indicator.register(ind_cfg.user_name, indicators)
+    return prices, results
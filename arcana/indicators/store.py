@@ -0,0 +1,211 @@
+from collections.abc import Iterable
+from threading import RLock
+
+import attrs
+from pandas import DataFrame
+
+from arcana.price_data.dev_types import PriceDataColumns
+from arcana.utils.RegistryTree import RegistryTree
+from .columnar import ColumnarIndicator
+
+
+@attrs.frozen
+class StoredIndicator:
+    """
+    A registered user indicator.
+
+    Attributes
+    ----------
+    name : str
+        User name of the indicator.
+    kind : str
+        Name of the indicator class (e.g. "SMA").
+    category : str
+        Name of the indicator family (e.g. "MovingAverage").
+    data : list[pandas.DataFrame] | ColumnarIndicator
+        Indicator data for every symbol, as DataFrames or in the compact form.
+    positions : dict[str, int]
+        Position of every symbol in `data`.
+    """
+    name: str
+    kind: str
+    category: str
+    data: list | ColumnarIndicator = attrs.field(eq=False, repr=False)
+    positions: dict = attrs.field(eq=False, repr=False)
+
+    @classmethod
+    def create(cls, name: str, kind: str, category: str, data: Iterable[DataFrame] | ColumnarIndicator) -> "StoredIndicator":
+        if isinstance(data, ColumnarIndicator):
+            positions = {symbol: i for i, symbol in enumerate(data.symbols)}
+        else:
+            data = list(data)
+            positions = {df[PriceDataColumns.SYMBOL].iloc[0]: i for i, df in enumerate(data) if len(df)}
+        return cls(name, kind, category, data, positions)
+
+    @property
+    def symbols(self) -> tuple[str]:
+        return tuple(self.positions)
+
+    @property
+    def raw_data(self) -> list[DataFrame]:
+        """Return the indicator DataFrames of every symbol (built on request for the compact form)."""
+        if isinstance(self.data, ColumnarIndicator):
+            return self.data.to_frames()
+        return self.data
+
+    @property
+    def columnar(self) -> ColumnarIndicator:
+        """Return the compact form of the indicator."""
+        if isinstance(self.data, ColumnarIndicator):
+            return self.data
+        return ColumnarIndicator.from_frames(self.name, self.data)
+
+    def symbol_data(self, symbol: str) -> DataFrame:
+        """Return the indicator DataFrame of the symbol."""
+        if symbol not in self.positions:
+            raise KeyError(f"{symbol} is not a symbol of {self.name}.")
+        if isinstance(self.data, ColumnarIndicator):
+            return self.data.symbol_frame(symbol)
+        return self.data[self.positions[symbol]]
+
+
+class IndicatorStore:
+    """
+    Thread-safe in-memory store of user indicators.
+
+    Indicators are indexed by name, symbol, kind and category, so every lookup is O(1)
+    regardless of the number of stored indicators. The tree of user indicators is only
+    built on demand, as a view (see `tree`).
+    """
+    __slots__ = ("_root", "_entries", "_by_symbol", "_by_type", "_lock")
+
+    def __init__(self, root: str = "Indicator"):
+        """
+        :param root: name of the tree view root. default is "Indicator"
+        """
+        self._root = root
+        self._entries: dict[str, StoredIndicator] = dict()
+        self._by_symbol: dict[str, dict[str, None]] = dict()
+        self._by_type: dict[str, dict[str, None]] = dict()
+        self._lock = RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def add(self, name: str, *, kind: str, category: str, data: Iterable[DataFrame] | ColumnarIndicator,
+            replace: bool = False) -> bool:
+        """
+        Add an indicator into the store.
+        An indicator already stored under the same name is kept, unless `replace` is set.
+
+        :param name: user name of the indicator
+        :param kind: indicator class name
+        :param category: indicator family name
+        :param data: indicator data for every symbol (DataFrames or the compact form)
+        :param replace: replace the indicator stored under the same name. default is False
+        :return: True if the indicator was stored
+        """
+        entry = StoredIndicator.create(name, kind, category, data)
+        with self._lock:
+            if name in self._entries:
+                if not replace:
+                    return False
+                self._unindex(self._entries[name])
+            self._entries[name] = entry
+            for symbol in entry.positions:
+                self._by_symbol.setdefault(symbol, dict())[name] = None
+            for type_ in (kind, category):
+                self._by_type.setdefault(type_, dict())[name] = None
+        return True
+
+    def replace(self, name: str, *, kind: str, category: str, data: Iterable[DataFrame] | ColumnarIndicator):
+        """Add an indicator into the store, replacing the one stored under the same name."""
+        self.add(name, kind=kind, category=category, data=data, replace=True)
+
+    def remove(self, name: str) -> StoredIndicator:
+        """
+        Remove an indicator from the store.
+
+        :param name: user name of the indicator
+        :return: the removed indicator
+        """
+        with self._lock:
+            if name not in self._entries:
+                raise KeyError(f"{name} is not a registered indicator.")
+            entry = self._entries.pop(name)
+            self._unindex(entry)
+        return entry
+
+    def _unindex(self, entry: StoredIndicator):
+        for index, keys in ((self._by_symbol, entry.positions), (self._by_type, (entry.kind, entry.category))):
+            for key in keys:
+                names = index[key]
+                names.pop(entry.name, None)
+                if not names:
+                    del index[key]
+
+    def clear(self):
+        """Remove all indicators."""
+        with self._lock:
+            self._entries.clear()
+            self._by_symbol.clear()
+            self._by_type.clear()
+
+    def get(self, name: str) -> StoredIndicator:
+        """Return the indicator stored under the name."""
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"{name} is not a registered indicator.")
+        return entry
+
+    def get_raw_data(self, name: str) -> list[DataFrame]:
+        """Return the indicator data for every symbol."""
+        return self.get(name).raw_data
+
+    def get_columnar(self, name: str) -> ColumnarIndicator:
+        """Return the compact form of the indicator."""
+        return self.get(name).columnar
+
+    def get_symbol_data(self, name: str, symbol: str) -> DataFrame:
+        """Return the indicator data of a single symbol."""
+        return self.get(name).symbol_data(symbol)
+
+    def names(self, *, symbol: str = None, type_: str = None) -> tuple[str]:
+        """
+        Return the names of stored indicators (in the order of registration).
+
+        :param symbol: only indicators computed for the symbol. default is None (any)
+        :param type_: only indicators of the kind or category (e.g. "SMA" or "MovingAverage"). default is None (any)
+        :return: names of the indicators
+        """
+        with self._lock:
+            if symbol is None and type_ is None:
+                return tuple(self._entries)
+            selected = [
+                index.get(key, dict()) for index, key in ((self._by_symbol, symbol), (self._by_type, type_)) if key is not None
+            ]
+            # the indexes only filter, a replaced indicator keeps its place in the order of registration
+            return tuple(name for name in self._entries if all(name in names for names in selected))
+
+    def symbols(self) -> tuple[str]:
+        """Return all symbols having at least one stored indicator."""
+        with self._lock:
+            return tuple(self._by_symbol)
+
+    def tree(self) -> RegistryTree:
+        """Return the tree view of the stored indicators (root -> category -> kind -> name)."""
+        tree = RegistryTree(self._root)
+        with self._lock:
+            entries = list(self._entries.values())
+        for entry in entries:
+            tree.add_key(entry.category)
+            tree.add_key(f"{entry.category}.{entry.kind}", parent=entry.category)
+            tree.add_key(entry.name, parent=f"{entry.category}.{entry.kind}")
+        return tree
+
+    def render_tree(self):
+        """Render the tree view of the stored indicators."""
+        self.tree().render_tree()
@@ -0,0 +1,505 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from math import exp, log, nan, sqrt
+from typing import Type
+
+import attrs
+import numpy as np
+from pandas import DataFrame
+
+from arcana.utils.classes_utils import validate_classes_names
+from arcana.price_data.dev_types import PriceDataColumns
+from .c_definitions import ma_lib
+from .adapters import ma_prepare_data_to_c
+from .indicators import BaseMovingAverage_, SMA, ESMA, EMA, WMA, RMA, HMA, TEMA, DEMA, KAMA, FRAMA
+from .cfg import *
+
+
+def _bar_value(bar, key: str) -> float:
+    """Return the `key` field of a bar (mapping, Series) or the bar itself if it is a number."""
+    if isinstance(bar, (int, float)):
+        return float(bar)
+    return float(bar[key])
+
+
+def _run_kernel(ma, data: np.ndarray, period: int) -> np.ndarray:
+    """Run a basic C moving average kernel on the whole array."""
+    out = np.zeros_like(data)
+    ma(*ma_prepare_data_to_c(to_d_ptr=[data, out], to_i=[len(data), period]))
+    return out
+
+
+class _SMAState:
+    """Running window sum with the same warm-up as the `sma` kernel."""
+    __slots__ = ("period", "window", "sum", "since_anchor")
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.sum = 0.0
+        self.since_anchor = 0
+
+    def seed(self, data: np.ndarray):
+        self.window.extend(data[-self.period:].tolist())
+        self.sum = sum(self.window)
+
+    def push(self, x: float) -> float:
+        if len(self.window) < self.period:
+            self.window.append(x)
+            self.sum += x
+            return self.sum / len(self.window)
+
+        oldest = self.window[0]
+        self.window.append(x)
+        self.since_anchor += 1
+        if self.since_anchor == self.period:
+            # re-sum once per period to stop the rounding drift (amortized O(1))
+            self.sum = sum(self.window)
+            self.since_anchor = 0
+        else:
+            self.sum += x
+            self.sum -= oldest
+        return self.sum / self.period
+
+
+class _WMAState:
+    """Running weighted window sum with the same warm-up as the `wma` kernel."""
+    __slots__ = ("period", "window", "sum", "weighted_sum", "since_anchor")
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.sum = 0.0
+        self.weighted_sum = 0.0
+        self.since_anchor = 0
+
+    def _resum(self):
+        self.sum = sum(self.window)
+        self.weighted_sum = sum((j + 1) * x for j, x in enumerate(self.window))
+
+    def seed(self, data: np.ndarray):
+        if self.period:
+            self.window.extend(data[-self.period:].tolist())
+        self._resum()
+
+    def push(self, x: float) -> float:
+        if not self.period:
+            return nan
+
+        if len(self.window) < self.period:
+            self.window.append(x)
+            self.sum += x
+            self.weighted_sum += len(self.window) * x
+            n = len(self.window)
+            return self.weighted_sum / (n * (n + 1) / 2.0)
+
+        oldest = self.window[0]
+        self.window.append(x)
+        self.since_anchor += 1
+        if self.since_anchor == self.period:
+            self._resum()
+            self.since_anchor = 0
+        else:
+            # every bar in the window loses one weight unit, the new bar enters with weight period
+            self.weighted_sum += self.period * x - self.sum
+            self.sum += x - oldest
+        return self.weighted_sum / (self.period * (self.period + 1) / 2.0)
+
+
+class _MonotonicDeque:
+    """Sliding window max (keep_max=True) or min over the last `cap` pushed bars."""
+    __slots__ = ("cap", "keep_max", "items")
+
+    def __init__(self, cap: int, keep_max: bool):
+        self.cap = cap
+        self.keep_max = keep_max
+        self.items = deque()
+
+    def push(self, i: int, x: float):
+        items = self.items
+        while items and items[0][0] <= i - self.cap:
+            items.popleft()
+        if self.keep_max:
+            while items and items[-1][1] <= x:
+                items.pop()
+        else:
+            while items and items[-1][1] >= x:
+                items.pop()
+        items.append((i, x))
+
+    @property
+    def front(self) -> float:
+        return self.items[0][1]
+
+
+class StreamingMovingAverage(ABC):
+    """
+    Abstract base class for streaming moving averages.
+
+    A streaming moving average carries its own state (ring buffers, running sums,
+    last EMA values) and is updated with every new bar in constant time, giving
+    the same values as recomputing the batch indicator on the whole history.
+
+    Attributes
+    ----------
+    indicator : Type[BaseMovingAverage_]
+        The batch counterpart of the streaming moving average.
+    """
+    __slots__ = ("_ma_cfg", "_value", "_n")
+    indicator: Type[BaseMovingAverage_] = None
+
+    def __init__(self, ma_cfg: MovingAverageCfg):
+        validate_classes_names(self.indicator.name(), ma_cfg.name)
+        self._ma_cfg = ma_cfg
+        self._value = nan
+        self._n = 0
+
+    @classmethod
+    def from_compute(cls, df: DataFrame, ind: DataFrame = None, *, ma_cfg: MovingAverageCfg) -> "StreamingMovingAverage":
+        """
+        Create the streaming moving average seeded with the history of a single symbol.
+
+        Parameters
+        ----------
+        df : DataFrame
+            OHLCV history of the symbol.
+        ind : DataFrame, optional
+            Result of the batch `compute` for the same symbol and cfg.
+            If not provided, it is calculated.
+        ma_cfg : MovingAverageCfg
+            Configuration object for the moving average.
+
+        Returns
+        -------
+        StreamingMovingAverage
+            The streaming moving average ready for `update`.
+        """
+        stream = cls(ma_cfg)
+        data = df[ma_cfg.src].to_numpy(dtype=np.float64)
+        if len(data) == 0 or len(data) < stream._min_seed_length():
+            # the batch kernel does not run on such a short history, replay it bar by bar
+            stream._replay(df)
+            return stream
+
+        if ind is None:
+            # the streaming state is kept in double precision whatever the Cfg precision is
+            ma_cfg_64 = attrs.evolve(ma_cfg, precision="float64")
+            ind = cls.indicator.calculate(df, ma=cls.indicator.ma, src=ma_cfg.src, period=ma_cfg.period,
+                                          user_name=ma_cfg.user_name, extra=cls.indicator.extra(df=df, ma_cfg=ma_cfg_64))
+        out = ind[ma_cfg.user_name].to_numpy(dtype=np.float64)
+        stream._seed(df, data, out)
+        stream._value = float(out[-1])
+        stream._n = len(data)
+        return stream
+
+    @property
+    def value(self) -> float:
+        """Return the last value of the moving average."""
+        return self._value
+
+    @property
+    def n_bars(self) -> int:
+        """Return the number of bars seen (history and updates)."""
+        return self._n
+
+    def update(self, bar) -> float:
+        """
+        Update the moving average with a new bar.
+
+        Parameters
+        ----------
+        bar : Mapping | pandas.Series | float
+            The new bar (indexed by `PriceDataColumns`) or the new source value.
+
+        Returns
+        -------
+        float
+            The new value of the moving average.
+        """
+        self._value = self._push(bar)
+        self._n += 1
+        return self._value
+
+    def _min_seed_length(self) -> int:
+        """Return the shortest history the batch kernel gives values for."""
+        return self._ma_cfg.period
+
+    def _replay(self, df: DataFrame):
+        """Feed the whole history bar by bar."""
+        for x in df[self._ma_cfg.src].to_numpy(dtype=np.float64).tolist():
+            self.update(x)
+
+    @abstractmethod
+    def _seed(self, df: DataFrame, data: np.ndarray, out: np.ndarray):
+        """Restore the state from the history and the batch result."""
+
+    @abstractmethod
+    def _push(self, bar) -> float:
+        """Update the state with a new bar and return the new value."""
+
+
+class StreamingSMA(StreamingMovingAverage):
+    """Streaming Simple Moving Average (SMA)."""
+    __slots__ = ("_state",)
+    indicator = SMA
+
+    def __init__(self, ma_cfg: SMACfg):
+        super().__init__(ma_cfg)
+        self._state = _SMAState(ma_cfg.period)
+
+    def _seed(self, df, data, out):
+        self._state.seed(data)
+
+    def _push(self, bar) -> float:
+        return self._state.push(_bar_value(bar, self._ma_cfg.src))
+
+
+class StreamingESMA(StreamingMovingAverage):
+    """Streaming exponentially smoothed moving average with a custom alpha."""
+    __slots__ = ()
+    indicator = ESMA
+
+    @property
+    def alpha(self) -> float:
+        return self._ma_cfg.alpha
+
+    def _seed(self, df, data, out):
+        pass
+
+    def _push(self, bar) -> float:
+        x = _bar_value(bar, self._ma_cfg.src)
+        if not self._n:
+            return x
+        return self.alpha * x + (1.0 - self.alpha) * self._value
+
+
+class StreamingEMA(StreamingESMA):
+    """Streaming Exponential Moving Average (EMA)."""
+    __slots__ = ()
+    indicator = EMA
+
+    @property
+    def alpha(self) -> float:
+        return 2.0 / (self._ma_cfg.period + 1.0)
+
+
+class StreamingRMA(StreamingESMA):
+    """Streaming Rolling Moving Average (RMA)."""
+    __slots__ = ()
+    indicator = RMA
+
+    @property
+    def alpha(self) -> float:
+        return 1.0 / self._ma_cfg.period
+
+
+class StreamingDEMA(StreamingMovingAverage):
+    """Streaming Double Exponential Moving Average (DEMA)."""
+    __slots__ = ("_emas",)
+    indicator = DEMA
+    depth = 2
+
+    def __init__(self, ma_cfg: MovingAverageCfg):
+        super().__init__(ma_cfg)
+        self._emas = [nan] * self.depth
+
+    def _seed(self, df, data, out):
+        series = data
+        for k in range(self.depth):
+            series = _run_kernel(ma_lib.ema, series, self._ma_cfg.period)
+            self._emas[k] = float(series[-1])
+
+    def _combine(self) -> float:
+        e1, e2 = self._emas
+        return 2.0*e1 - e2
+
+    def _push(self, bar) -> float:
+        x = _bar_value(bar, self._ma_cfg.src)
+        alpha = 2.0 / (self._ma_cfg.period + 1.0)
+        for k in range(self.depth):
+            self._emas[k] = x if not self._n else alpha * x + (1.0 - alpha) * self._emas[k]
+            x = self._emas[k]
+        return self._combine()
+
+
+class StreamingTEMA(StreamingDEMA):
+    """Streaming Triple Exponential Moving Average (TEMA)."""
+    __slots__ = ()
+    indicator = TEMA
+    depth = 3
+
+    def _combine(self) -> float:
+        e1, e2, e3 = self._emas
+        return 3.0*e1 - 3.0*e2 + e3
+
+
+class StreamingWMA(StreamingMovingAverage):
+    """Streaming Weighted Moving Average (WMA)."""
+    __slots__ = ("_state",)
+    indicator = WMA
+
+    def __init__(self, ma_cfg: WMACfg):
+        super().__init__(ma_cfg)
+        self._state = _WMAState(ma_cfg.period)
+
+    def _seed(self, df, data, out):
+        self._state.seed(data)
+
+    def _push(self, bar) -> float:
+        return self._state.push(_bar_value(bar, self._ma_cfg.src))
+
+
+class StreamingHMA(StreamingMovingAverage):
+    """Streaming Hull Moving Average (HMA)."""
+    __slots__ = ("_wma_half", "_wma_full", "_wma_hull")
+    indicator = HMA
+
+    def __init__(self, ma_cfg: HMACfg):
+        super().__init__(ma_cfg)
+        self._wma_half = _WMAState(ma_cfg.period // 2)
+        self._wma_full = _WMAState(ma_cfg.period)
+        self._wma_hull = _WMAState(int(sqrt(ma_cfg.period)))
+
+    def _seed(self, df, data, out):
+        wma_half = _run_kernel(ma_lib.wma, data, self._wma_half.period)
+        wma_full = _run_kernel(ma_lib.wma, data, self._wma_full.period)
+        self._wma_half.seed(data)
+        self._wma_full.seed(data)
+        self._wma_hull.seed(2.0*wma_half - wma_full)
+
+    def _push(self, bar) -> float:
+        x = _bar_value(bar, self._ma_cfg.src)
+        return self._wma_hull.push(2.0*self._wma_half.push(x) - self._wma_full.push(x))
+
+
+class StreamingKAMA(StreamingMovingAverage):
+    """Streaming Kaufman Adaptive Moving Average (KAMA)."""
+    __slots__ = ("_sma", "_window", "_volatility", "_sc_fast", "_sc_slow")
+    indicator = KAMA
+
+    def __init__(self, ma_cfg: KAMACfg):
+        super().__init__(ma_cfg)
+        n_fast, n_slow = sorted((ma_cfg.n_fast, ma_cfg.n_slow))
+        self._sc_fast = 2.0 / (n_fast + 1.0)
+        self._sc_slow = 2.0 / (n_slow + 1.0)
+        self._sma = _SMAState(ma_cfg.period)
+        self._window = deque(maxlen=ma_cfg.period + 1)
+        self._volatility = 0.0
+
+    def _min_seed_length(self) -> int:
+        return max(self._ma_cfg.period + 1, self._ma_cfg.n_fast, self._ma_cfg.n_slow)
+
+    def _seed(self, df, data, out):
+        self._window.extend(data[-(self._ma_cfg.period + 1):].tolist())
+        window = list(self._window)
+        self._volatility = sum(abs(b - a) for a, b in zip(window, window[1:]))
+
+    def _push(self, bar) -> float:
+        x = _bar_value(bar, self._ma_cfg.src)
+        period = self._ma_cfg.period
+        if self._n < period:
+            self._window.append(x)
+            return self._sma.push(x)
+
+        if self._n == period:
+            self._window.append(x)
+            window = list(self._window)
+            self._volatility = sum(abs(b - a) for a, b in zip(window, window[1:]))
+        else:
+            leaving = abs(self._window[1] - self._window[0])
+            self._volatility += abs(x - self._window[-1]) - leaving
+            self._window.append(x)
+
+        # a flat window has no direction, so it has no efficiency either
+        er = abs(x - self._window[0]) / self._volatility if self._volatility > 0.0 else 0.0
+        sc = (er*(self._sc_fast - self._sc_slow) + self._sc_slow) ** 2
+        return self._value + sc*(x - self._value)
+
+
+class StreamingFRAMA(StreamingMovingAverage):
+    """Streaming Fractal Adaptive Moving Average (FRAMA)."""
+    __slots__ = ("_sma", "_delay", "_full_h", "_full_l", "_first_h", "_first_l", "_second_h", "_second_l")
+    indicator = FRAMA
+
+    def __init__(self, ma_cfg: FRAMACfg):
+        super().__init__(ma_cfg)
+        period = ma_cfg.period
+        half = period // 2
+        self._sma = _SMAState(period)
+        # the first half of the window is the bar stream delayed by (period - half) bars
+        self._delay = deque(maxlen=period - half + 1)
+        self._full_h, self._full_l = _MonotonicDeque(period, True), _MonotonicDeque(period, False)
+        self._first_h, self._first_l = _MonotonicDeque(half, True), _MonotonicDeque(half, False)
+        self._second_h, self._second_l = _MonotonicDeque(half, True), _MonotonicDeque(half, False)
+
+    def _push_window(self, t: int, high: float, low: float):
+        """Slide the high/low windows to bar `t`."""
+        period = self._ma_cfg.period
+        half = period // 2
+        self._full_h.push(t, high)
+        self._full_l.push(t, low)
+        if not half:
+            return
+        self._second_h.push(t, high)
+        self._second_l.push(t, low)
+        self._delay.append((high, low))
+        if len(self._delay) == self._delay.maxlen:
+            delayed_high, delayed_low = self._delay[0]
+            self._first_h.push(t - period + half, delayed_high)
+            self._first_l.push(t - period + half, delayed_low)
+
+    def _seed(self, df, data, out):
+        period = self._ma_cfg.period
+        high = df[PriceDataColumns.HIGH].to_numpy(dtype=np.float64)
+        low = df[PriceDataColumns.LOW].to_numpy(dtype=np.float64)
+        # enough bars to fill the delayed first half window
+        start = max(0, len(data) - (2*period - period // 2))
+        for t in range(start, len(data)):
+            self._push_window(t, float(high[t]), float(low[t]))
+
+    def _replay(self, df: DataFrame):
+        columns = [self._ma_cfg.src, PriceDataColumns.HIGH, PriceDataColumns.LOW]
+        for x, high, low in df[columns].to_numpy(dtype=np.float64).tolist():
+            self.update({self._ma_cfg.src: x, PriceDataColumns.HIGH: high, PriceDataColumns.LOW: low})
+
+    def _push(self, bar) -> float:
+        x = _bar_value(bar, self._ma_cfg.src)
+        t = self._n
+        period = self._ma_cfg.period
+        self._push_window(t, float(bar[PriceDataColumns.HIGH]), float(bar[PriceDataColumns.LOW]))
+
+        # a single bar window has no fractal dimension: D = 1, alpha = 1, FRAMA follows the data
+        if period // 2 == 0:
+            return x
+        if t < period:
+            return self._sma.push(x)
+
+        n = self._full_h.front - self._full_l.front
+        range_1 = self._first_h.front - self._first_l.front
+        range_2 = self._second_h.front - self._second_l.front
+
+        if n <= 0.0:
+            d = 0.0
+        elif range_1 + range_2 <= 0.0:
+            d = 1.0
+        else:
+            d = (log(range_1 + range_2) - log(n)) / log(2.0)
+        d = min(max(d, 1.0), 2.0)
+
+        alpha = min(max(exp(-4.6 * (d - 1.0)), 0.01), 1.0)
+        return alpha * x + (1.0 - alpha) * self._value
+
+
+STREAMING_MOVING_AVERAGES = {
+    stream.indicator: stream for stream in (
+        StreamingSMA, StreamingESMA, StreamingEMA, StreamingRMA, StreamingDEMA,
+        StreamingTEMA, StreamingWMA, StreamingHMA, StreamingKAMA, StreamingFRAMA,
+    )
+}
+
+
+def streaming_counterpart(indicator: Type[BaseMovingAverage_]) -> Type[StreamingMovingAverage]:
+    """Return the streaming class of a batch moving average."""
+    if indicator not in STREAMING_MOVING_AVERAGES:
+        raise ValueError(f"{indicator.name()} has no streaming counterpart. Use {[ind.name() for ind in STREAMING_MOVING_AVERAGES]}.")
+    return STREAMING_MOVING_AVERAGES[indicator]
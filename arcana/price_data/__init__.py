@@ -1,4 +1,9 @@
-from .cfg import CCTXCfg, TradingViewCfg
-from .loader import TradingViewLoader, CCTXLoader, PriceDataLoader
+from .cfg import CCTXCfg, TradingViewCfg, CSVCfg, BinaryCfg
+from .loader import TradingViewLoader, CCTXLoader, CSVLoader, BinaryLoader, PriceDataLoader
 from .interface import PriceData
+from .resample import Resampler, IncrementalResampler
+from .store import OHLCVStore
+from .binary import write_binary, open_binary
+from .ring import RingBuffer
+from .align import Alignment
 from .dev_types import PriceDataColumns
\ No newline at end of file
@@ -26,20 +26,28 @@ def tv_interval_adapter(v):
     raise ValueError(f"Interval {v.value} is not supported in TradingView. Use {[key.value for key in _TV_INTERVAL_MAP]}")
 
 
-def ccxt_symbol_adapter(v):
-    exchange, ticker = v.split(":")
+def ccxt_exchange_adapter(v):
+    if v.lower() in ccxt.exchanges:
+        return getattr(ccxt, v.lower())()
+    raise ValueError(f"Unknown exchange {v}.")
+
+
+def ccxt_ticker_map(markets):
+    return {
+        tick.replace("/", ""): tick for tick in markets
+    }
 
-    if exchange.lower() in ccxt.exchanges:
-        exg = getattr(ccxt, exchange.lower())()
 
-        ticker_map = {
-            tick.replace("/", ""): tick for tick in exg.load_markets()
-        }
+def ccxt_ticker_adapter(v, ticker_map):
+    if v in ticker_map:
+        return ticker_map[v]
+    raise ValueError(f"Unknown ticker {v}.")
 
-        if ticker in ticker_map:
-            return exg, ticker_map[ticker]
-        raise ValueError(f"Unknown ticker {ticker}.")
-    raise ValueError(f"Unknown exchange {exchange}.")
+
+def ccxt_symbol_adapter(v):
+    # pooled clients and cached markets (the pool is built on top of the adapters)
+    from .clients import client_pool
+    return client_pool.resolve(v)
 
 
 def ccxt_interval_adapter(interval, exchange):
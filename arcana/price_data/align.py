@@ -0,0 +1,216 @@
+from collections.abc import Iterable
+from functools import reduce
+
+import numpy as np
+from numpy import ndarray
+from pandas import DataFrame, DateOffset, DatetimeIndex, Timestamp, date_range
+
+from .converters import index_to_timestamps, interval_converter
+from .dev_types import Interval, PriceDataColumns
+from .resample import interval_length
+
+# intervals following the calendar (a day is not always 24 hours in a time zone with DST)
+_CALENDAR_STEPS = {
+    Interval.D1: DateOffset(days=1),
+    Interval.W1: DateOffset(weeks=1),
+    Interval.M1: DateOffset(months=1),
+    Interval.M3: DateOffset(months=3),
+    Interval.M6: DateOffset(months=6),
+    Interval.M12: DateOffset(months=12),
+}
+_HOW = ("union", "inner")
+
+
+def interval_grid(first: int, last: int, interval: Interval, tz: str = None) -> ndarray:
+    """
+    Return the regular grid of the interval from the first to the last date (int64 ns, both included).
+
+    Intraday grids have a fixed step, daily and longer grids follow the calendar of the time zone.
+    """
+    if last < first:
+        return np.empty(0, dtype=np.int64)
+    if interval in _CALENDAR_STEPS:
+        start, end = Timestamp(first, tz="UTC"), Timestamp(last, tz="UTC")
+        if tz is not None:
+            start, end = start.tz_convert(tz), end.tz_convert(tz)
+        else:
+            start, end = start.tz_localize(None), end.tz_localize(None)
+        return date_range(start, end, freq=_CALENDAR_STEPS[interval]).as_unit("ns").asi8
+    return np.arange(first, last + 1, interval_length(interval), dtype=np.int64)
+
+
+class Alignment:
+    """
+    Alignment of the dates of many symbols onto a common grid.
+
+    The grid is the union or the intersection (`how`) of the dates of the symbols, or with an interval,
+    the regular grid of the interval spanning the dates of any (union) or of every (inner) symbol,
+    so candles missing for every symbol are found as well.
+    Only the position of every bar in the grid is kept: index maps, gap runs and gathered values
+    are computed from them on request, nothing is padded.
+    """
+    __slots__ = ("_symbols", "_grid", "_positions", "_aligned", "_tz", "_name", "_dates")
+
+    def __init__(self, timestamps: Iterable[ndarray], symbols: Iterable[str], *, interval: Interval | str = None,
+                 how: str = "union", tz: str = None, name: str = PriceDataColumns.DATE):
+        """
+        :param timestamps: int64 ns dates of the bars of every symbol (unique)
+        :param symbols: symbols (in the order of `timestamps`)
+        :param interval: interval of the regular grid. default is None (the grid is made of the dates of the bars)
+        :param how: "union" or "inner". default is "union"
+        :param tz: time zone of the dates. default is None (naive)
+        :param name: name of the date index. default is "date"
+        """
+        if how not in _HOW:
+            raise ValueError(f"{how} is not a valid alignment. Use: {list(_HOW)}.")
+        timestamps = [np.asarray(ts, dtype=np.int64) for ts in timestamps]
+        self._symbols = list(symbols)
+        if len(self._symbols) != len(timestamps):
+            raise ValueError(f"{len(self._symbols)} symbols != {len(timestamps)} date arrays.")
+        for symbol, ts in zip(self._symbols, timestamps):
+            if len(ts) > 1 and not np.all(ts[1:] > ts[:-1]) and len(np.unique(ts)) != len(ts):
+                raise ValueError(f"Dates of {symbol} should be unique.")
+        self._tz = tz
+        self._name = name
+        self._dates = None
+
+        shared = all(len(ts) == len(timestamps[0]) and np.array_equal(ts, timestamps[0]) for ts in timestamps)
+        if not timestamps:
+            self._grid = np.empty(0, dtype=np.int64)
+        elif interval is None and shared:
+            # every symbol has the same dates, they are the grid as they are
+            self._grid = timestamps[0]
+        elif interval is None:
+            if how == "union":
+                self._grid = np.unique(np.concatenate(timestamps))
+            else:
+                self._grid = reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), timestamps)
+        else:
+            interval = interval_converter(interval)
+            non_empty = [ts for ts in timestamps if len(ts)]
+            firsts = [int(ts.min()) for ts in non_empty]
+            lasts = [int(ts.max()) for ts in non_empty]
+            if not non_empty:
+                first, last = 0, -1
+            elif how == "union":
+                first, last = min(firsts), max(lasts)
+            else:
+                first, last = (max(firsts), min(lasts)) if len(non_empty) == len(timestamps) else (0, -1)
+            self._grid = interval_grid(first, last, interval, tz)
+
+        self._positions = []
+        for symbol, ts in zip(self._symbols, timestamps):
+            if interval is None and shared:
+                pos = np.arange(len(ts))
+            else:
+                pos = np.searchsorted(self._grid, ts)
+                pos[pos == len(self._grid)] = 0
+                on_grid = self._grid[pos] == ts if len(self._grid) else np.zeros(len(ts), dtype=bool)
+                if interval is not None and len(self._grid):
+                    off_grid = ~on_grid & (ts >= self._grid[0]) & (ts <= self._grid[-1])
+                    if off_grid.any():
+                        raise ValueError(f"{int(off_grid.sum())} bars of {symbol} are not on the {interval.value} grid. "
+                                         f"Resample them first.")
+                pos[~on_grid] = -1
+            self._positions.append(pos)
+        identity = np.arange(len(self._grid))
+        self._aligned = all(len(pos) == len(self._grid) and np.array_equal(pos, identity) for pos in self._positions)
+
+    @classmethod
+    def from_frames(cls, df_: Iterable[DataFrame], symbols: Iterable[str], **kwargs) -> "Alignment":
+        """
+        Align the data of every symbol (indexed by date), the indexes are not rebuilt.
+
+        :param df_: data of every symbol
+        :param symbols: symbols (in the order of `df_`)
+        :param kwargs: interval and how, see the constructor
+        """
+        df_ = list(df_)
+        tz = next((str(df.index.tz) for df in df_ if getattr(df.index, "tz", None) is not None), None)
+        name = df_[0].index.name if df_ else PriceDataColumns.DATE
+        return cls((index_to_timestamps(df.index) for df in df_), symbols, tz=tz, name=name, **kwargs)
+
+    @property
+    def symbols(self) -> list[str]:
+        return self._symbols
+
+    @property
+    def grid(self) -> ndarray:
+        """Return the int64 ns dates of the grid."""
+        return self._grid
+
+    @property
+    def dates(self) -> DatetimeIndex:
+        """Return the dates of the grid (built once)."""
+        if self._dates is None:
+            dates = DatetimeIndex(self._grid.view("M8[ns]"), name=self._name)
+            self._dates = dates.tz_localize("UTC").tz_convert(self._tz) if self._tz is not None else dates
+        return self._dates
+
+    def __len__(self) -> int:
+        return len(self._grid)
+
+    @property
+    def aligned(self) -> bool:
+        """Return True if every symbol has exactly the dates of the grid (in its order), so nothing has to be gathered."""
+        return self._aligned
+
+    @property
+    def positions(self) -> list[ndarray]:
+        """Return the position in the grid of every bar of every symbol (-1 for bars outside the grid)."""
+        return self._positions
+
+    def _symbol_index(self, symbol: str | int) -> int:
+        if isinstance(symbol, int | np.integer):
+            return int(symbol)
+        try:
+            return self._symbols.index(symbol)
+        except ValueError:
+            raise KeyError(f"{symbol} is not aligned. Use: {self._symbols}.") from None
+
+    def index_map(self, symbol: str | int) -> ndarray:
+        """
+        Return the row of the bar of the symbol at every date of the grid (-1 where the bar is missing),
+        so the values of the symbol are gathered with `values[index_map]`.
+
+        :param symbol: the symbol or its position
+        """
+        pos = self._positions[self._symbol_index(symbol)]
+        rows = np.full(len(self._grid), -1, dtype=np.int64)
+        valid = pos >= 0
+        rows[pos[valid]] = np.flatnonzero(valid)
+        return rows
+
+    def gaps(self, symbol: str | int) -> ndarray:
+        """
+        Return the runs of grid dates without a bar of the symbol.
+
+        :param symbol: the symbol or its position
+        :return: (n_runs, 2) int64 array of the grid position of the first missing date and the length of every run
+        """
+        pos = self._positions[self._symbol_index(symbol)]
+        missing = np.ones(len(self._grid) + 2, dtype=np.int8)
+        missing[0] = missing[-1] = 0
+        missing[pos[pos >= 0] + 1] = 0
+        edges = np.diff(missing)
+        starts = np.flatnonzero(edges == 1)
+        return np.stack((starts, np.flatnonzero(edges == -1) - starts), axis=1).astype(np.int64)
+
+    def gap_counts(self) -> dict[str, int]:
+        """Return the number of missing grid dates of every symbol."""
+        return {symbol: len(self._grid) - int((pos >= 0).sum()) for symbol, pos in zip(self._symbols, self._positions)}
+
+    def gather(self, symbol: str | int, values: ndarray, fill=np.nan) -> ndarray:
+        """
+        Return the values of the bars of the symbol on the grid.
+
+        :param symbol: the symbol or its position
+        :param values: values of the bars (in the order of its dates), the first axis is the bar
+        :param fill: value of the missing dates. default is NaN
+        """
+        pos = self._positions[self._symbol_index(symbol)]
+        values = np.asarray(values)
+        out = np.full((len(self._grid),) + values.shape[1:], fill, dtype=np.result_type(values.dtype, np.min_scalar_type(fill)))
+        valid = pos >= 0
+        out[pos[valid]] = values[valid]
+        return out
@@ -0,0 +1,118 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+from pandas import Categorical, DataFrame, DatetimeIndex
+
+from .converters import index_to_timestamps
+from .dev_types import PriceDataColumns
+from arcana.utils.metrics import metrics
+
+_META = "meta.json"
+_DATE = "date"
+BINARY_COLUMNS = (
+    PriceDataColumns.OPEN,
+    PriceDataColumns.HIGH,
+    PriceDataColumns.LOW,
+    PriceDataColumns.CLOSE,
+    PriceDataColumns.VOLUME,
+)
+
+
+def binary_path(root: str | Path, symbol: str) -> Path:
+    """Return the folder of the symbol, e.g. root/BINANCE_BTCUSDT for BINANCE:BTCUSDT."""
+    return Path(root) / symbol.replace(":", "_")
+
+
+def _array_path(path: Path, name: str, version: int) -> Path:
+    return path / f"{name}.{version}.npy"
+
+
+def _read_meta(path: Path) -> dict | None:
+    try:
+        with open(path / _META) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _remove_stale(path: Path, version: int):
+    """Remove the arrays of older versions. Files still mapped (on Windows) are left for a later write."""
+    for file in path.glob("*.npy"):
+        if not file.name.endswith(f".{version}.npy"):
+            try:
+                file.unlink()
+            except OSError:
+                pass
+
+
+def write_binary(root: str | Path, df: DataFrame):
+    """
+    Write the OHLCV data of a symbol in the binary layout:
+    one contiguous int64 array of dates (ns, UTC for tz-aware data) and one contiguous
+    float64 array per price column, every array in its own `.npy` file.
+
+    Mapped files are never replaced (which fails on Windows): every write creates the files
+    of a new version and switches `meta.json` to it, readers which mapped the previous version
+    keep reading it.
+
+    :param root: folder of the binary data
+    :param df: data of a single symbol (indexed by date, with the symbol column)
+    """
+    symbol = str(df[PriceDataColumns.SYMBOL].iloc[0])
+    path = binary_path(root, symbol)
+    tz = getattr(df.index, "tz", None)
+    tz = str(tz) if tz is not None else None
+    dates = index_to_timestamps(df.index)
+    columns = [col for col in BINARY_COLUMNS if col in df.columns]
+
+    with metrics.stage("binary.write", symbol=symbol, rows=len(df)):
+        path.mkdir(parents=True, exist_ok=True)
+        meta = _read_meta(path)
+        version = meta["version"] + 1 if meta is not None else 0
+        order = np.argsort(dates, kind="stable")
+        np.save(_array_path(path, _DATE, version), dates[order])
+        for col in columns:
+            np.save(_array_path(path, col, version), np.ascontiguousarray(df[col].to_numpy(dtype=np.float64)[order]))
+        tmp = path / f"{_META}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"symbol": symbol, "columns": columns, "tz": tz, "rows": len(df), "version": version}, f)
+        os.replace(tmp, path / _META)
+        _remove_stale(path, version)
+
+
+def open_binary(root: str | Path, symbol: str, *, start: int = None, end: int = None) -> DataFrame:
+    """
+    Open the binary data of the symbol without reading it.
+
+    Every array is memory-mapped read-only and the DataFrame columns are views of the maps,
+    so the pages are loaded on access (data larger than memory can be used) and shared
+    with every other process mapping the same files. Columns are handed to the C backend
+    without copying.
+
+    :param root: folder of the binary data
+    :param symbol: the symbol
+    :param start: first date (inclusive, int64 ns). default is None (from the first bar)
+    :param end: last date (exclusive, int64 ns). default is None (up to the last bar)
+    :return: the bars indexed by date
+    """
+    path = binary_path(root, symbol)
+    meta = _read_meta(path)
+    if meta is None:
+        raise KeyError(f"There is no binary data of {symbol} in {root}.")
+
+    version = meta["version"]
+    dates = np.load(_array_path(path, _DATE, version), mmap_mode="r")
+    lo = 0 if start is None else int(np.searchsorted(dates, start, side="left"))
+    hi = len(dates) if end is None else int(np.searchsorted(dates, end, side="left"))
+    rows = slice(lo, hi)
+
+    index = DatetimeIndex(dates[rows].view("M8[ns]"), name=PriceDataColumns.DATE, copy=False)
+    if meta["tz"] is not None:
+        index = index.tz_localize("UTC").tz_convert(meta["tz"])
+    data = {PriceDataColumns.SYMBOL: Categorical.from_codes(np.zeros(hi - lo, dtype=np.int8), [meta["symbol"]])}
+    for col in meta["columns"]:
+        data[col] = np.load(_array_path(path, col, version), mmap_mode="r")[rows]
+    # copy=False keeps one block per map instead of consolidating (copying) the columns
+    return DataFrame(data, index=index, copy=False)
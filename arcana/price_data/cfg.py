@@ -14,22 +14,68 @@ class PriceDataCfg:
         return self.__class__.__name__.removesuffix("Cfg")
 
 @attrs.define(slots=True, kw_only=True)
-class TradingViewCfg(PriceDataCfg):
+class DownloadCfg(PriceDataCfg):
+    """
+    Concurrency, rate limit and retries of the loaders downloading the data.
+
+    `rate` is the number of requests per second allowed for every exchange (or source),
+    None keeps the default of the source. Up to `burst` requests can be sent at once.
+    """
+    max_workers = attrs.field(default=4, validator=[attrs.validators.instance_of(int), attrs.validators.gt(0)])
+    rate = attrs.field(default=None, validator=attrs.validators.optional([attrs.validators.instance_of(float | int), attrs.validators.gt(0)]))
+    burst = attrs.field(default=1, validator=[attrs.validators.instance_of(int), attrs.validators.gt(0)])
+    retries = attrs.field(default=3, validator=[attrs.validators.instance_of(int), attrs.validators.ge(0)])
+    backoff = attrs.field(default=1.0, validator=[attrs.validators.instance_of(float | int), attrs.validators.ge(0)])
+
+@attrs.define(slots=True, kw_only=True)
+class TradingViewCfg(DownloadCfg):
     n_bars = attrs.field(validator=attrs.validators.instance_of(int), converter=tv_n_bars_converter)
     fut_contract = attrs.field(default=0, validator=attrs.validators.instance_of(int), converter=tv_fut_contract_converter)
     extended_session = attrs.field(default=False, validator=attrs.validators.instance_of(bool))
 
 
 @attrs.define(slots=True, kw_only=True)
-class CCTXCfg(PriceDataCfg):
+class CCTXCfg(DownloadCfg):
     limit = attrs.field(validator=attrs.validators.instance_of(int), converter=ccxt_limit_converter)
-    # since = attrs.field()
+    # backfill: [since, until) is downloaded in windows of `limit` candles. default until is now
+    since = attrs.field(default=None, converter=ccxt_time_converter)
+    until = attrs.field(default=None, converter=ccxt_time_converter)
+
+    def __attrs_post_init__(self):
+        if self.until is not None and self.since is None:
+            raise ValueError("until requires since.")
+        if self.since is not None and self.until is not None and self.until <= self.since:
+            raise ValueError(f"until ({self.until}) should be after since ({self.since}).")
 
 @attrs.define(slots=True, kw_only=True)
 class CSVCfg(PriceDataCfg):
+    """
+    Per-symbol csv files, the symbol is the file name (e.g. BINANCE_BTCUSDT.csv for BINANCE:BTCUSDT).
+
+    `columns` maps the file columns to `PriceDataColumns` (only those are read), None matches the
+    column names (case-insensitive, with the usual aliases as "timestamp" or "Close").
+    Dates are parsed with `date_format`, or as epoch numbers of `date_unit` ("s", "ms", "us", "ns").
+    `chunksize` rows are parsed at once when streaming files larger than memory.
+    """
     suffix = attrs.field(validator=attrs.validators.instance_of(str), default=".csv")
     deep_search = attrs.field(validator=attrs.validators.instance_of(bool), default=False)
-    path = attrs.field(validator=attrs.validators.instance_of(str | Path), default=DOWNLOADED_DATA)
+    # a file, a folder or an iterable of both, resolved to the list of files
+    path = attrs.field(validator=attrs.validators.instance_of(str | Path | Iterable), default=DOWNLOADED_DATA)
+    columns = attrs.field(default=None, converter=csv_columns_converter)
+    sep = attrs.field(default=",", validator=attrs.validators.instance_of(str))
+    date_format = attrs.field(default=None, validator=attrs.validators.optional(attrs.validators.instance_of(str)))
+    date_unit = attrs.field(default=None, validator=attrs.validators.optional(attrs.validators.in_(("s", "ms", "us", "ns"))))
+    chunksize = attrs.field(default=1_000_000, validator=[attrs.validators.instance_of(int), attrs.validators.gt(0)])
+    max_workers = attrs.field(default=4, validator=[attrs.validators.instance_of(int), attrs.validators.gt(0)])
 
     def __attrs_post_init__(self):
         self.path = path_converter(self.path, self.suffix, self.deep_search)
+
+@attrs.define(slots=True, kw_only=True)
+class BinaryCfg(PriceDataCfg):
+    """
+    Memory-mapped binary data (see `write_binary`), only the bars of [start, end) are mapped.
+    """
+    path = attrs.field(validator=attrs.validators.instance_of(str | Path), default=DOWNLOADED_DATA / "binary")
+    start = attrs.field(default=None, converter=ccxt_time_converter)
+    end = attrs.field(default=None, converter=ccxt_time_converter)
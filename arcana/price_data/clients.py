@@ -0,0 +1,189 @@
+import json
+import os
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock, RLock
+from time import time
+
+from .adapters import ccxt_exchange_adapter, ccxt_ticker_map, ccxt_ticker_adapter
+
+
+def _create_exchange(exchange_id: str):
+    exchange = ccxt_exchange_adapter(exchange_id)
+    # requests are throttled by the loader's rate limiters
+    exchange.enableRateLimit = False
+    return exchange
+
+
+def _load_markets(exchange, reload: bool) -> dict:
+    return exchange.load_markets(reload)
+
+
+class ClientPool:
+    """
+    Process-wide pool of data source clients.
+
+    Keeps one CCXT exchange client per exchange (and factory) together with its ticker map,
+    so resolving a symbol is a dictionary lookup once the markets of its exchange are loaded.
+    Markets expire after `market_ttl` seconds and can be cached on disk (`cache_dir`), so new
+    processes skip the download as well. TradingView clients are reused between loads,
+    every client is used by a single thread at a time.
+    """
+    __slots__ = ("_market_ttl", "_cache_dir", "_exchanges", "_markets", "_key_locks", "_tv_clients", "_lock")
+
+    def __init__(self, *, market_ttl: float = 3600.0, cache_dir: str | Path = None):
+        """
+        :param market_ttl: seconds after which the markets are downloaded again, None never expires. default is 3600.0
+        :param cache_dir: folder of the on-disk market cache. default is None (memory only)
+        """
+        self._market_ttl = market_ttl
+        self._cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._exchanges = dict()
+        self._markets: dict[tuple, tuple[float, dict[str, str]]] = dict()
+        self._key_locks: dict[tuple, RLock] = dict()
+        self._tv_clients: dict[tuple, list] = dict()
+        self._lock = Lock()
+
+    def configure(self, *, market_ttl: float = None, cache_dir: str | Path = None):
+        """
+        Change the market cache settings (cached markets are kept).
+
+        :param market_ttl: seconds after which the markets are downloaded again. default is None (unchanged)
+        :param cache_dir: folder of the on-disk market cache. default is None (unchanged)
+        """
+        if market_ttl is not None:
+            if market_ttl <= 0:
+                raise ValueError(f"{market_ttl} should be positive.")
+            self._market_ttl = market_ttl
+        if cache_dir is not None:
+            self._cache_dir = Path(cache_dir)
+
+    def clear(self):
+        """Drop every pooled client and the cached markets (the on-disk cache is kept)."""
+        with self._lock:
+            self._exchanges.clear()
+            self._markets.clear()
+            self._tv_clients.clear()
+
+    def _key_lock(self, key: tuple) -> RLock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = RLock()
+            return lock
+
+    def _expired(self, created: float) -> bool:
+        return self._market_ttl is not None and time() - created > self._market_ttl
+
+    def exchange(self, exchange_id: str, factory: Callable = None):
+        """
+        Return the pooled exchange client.
+
+        :param exchange_id: exchange id, e.g. "BINANCE"
+        :param factory: function creating the client from the exchange id. default is None (ccxt)
+        """
+        key = (exchange_id.upper(), factory)
+        exchange = self._exchanges.get(key)
+        if exchange is None:
+            with self._key_lock(key):
+                exchange = self._exchanges.get(key)
+                if exchange is None:
+                    exchange = self._exchanges[key] = (factory or _create_exchange)(exchange_id)
+        return exchange
+
+    def ticker_map(self, exchange_id: str, factory: Callable = None, *, load: Callable = None) -> dict[str, str]:
+        """
+        Return the map of tickers (e.g. "BTCUSDT") to the market symbols (e.g. "BTC/USDT") of the exchange.
+
+        :param exchange_id: exchange id, e.g. "BINANCE"
+        :param factory: function creating the client from the exchange id. default is None (ccxt)
+        :param load: function downloading the markets, called as `load(exchange, reload)`. default is `exchange.load_markets`
+        """
+        key = (exchange_id.upper(), factory)
+        entry = self._markets.get(key)
+        if entry is not None and not self._expired(entry[0]):
+            return entry[1]
+
+        with self._key_lock(key):
+            entry = self._markets.get(key)
+            if entry is not None and not self._expired(entry[0]):
+                return entry[1]
+
+            exchange = self.exchange(exchange_id, factory)
+            cached = self._read_markets(key[0]) if entry is None else None
+            if cached is not None:
+                created, markets = cached
+                exchange.set_markets(markets)
+            else:
+                created = time()
+                markets = (load or _load_markets)(exchange, entry is not None)
+                self._write_markets(key[0], created, markets)
+
+            ticker_map = ccxt_ticker_map(markets)
+            self._markets[key] = (created, ticker_map)
+            return ticker_map
+
+    def resolve(self, symbol: str, factory: Callable = None, *, load: Callable = None) -> tuple:
+        """
+        Return the exchange client and the market symbol of the symbol.
+
+        :param symbol: symbol in the format EXCHANGE:TICKER
+        :param factory: function creating the client from the exchange id. default is None (ccxt)
+        :param load: function downloading the markets, see `ticker_map`
+        """
+        exchange_id, ticker = symbol.split(":")
+        ticker_map = self.ticker_map(exchange_id, factory, load=load)
+        return self.exchange(exchange_id, factory), ccxt_ticker_adapter(ticker, ticker_map)
+
+    def _markets_path(self, exchange_id: str) -> Path:
+        return self._cache_dir / f"{exchange_id.lower()}_markets.json"
+
+    def _read_markets(self, exchange_id: str) -> tuple[float, dict] | None:
+        if self._cache_dir is None:
+            return None
+        try:
+            with open(self._markets_path(exchange_id)) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self._expired(cached["created"]):
+            return None
+        return cached["created"], cached["markets"]
+
+    def _write_markets(self, exchange_id: str, created: float, markets: dict):
+        if self._cache_dir is None:
+            return
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._markets_path(exchange_id)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"created": created, "markets": markets}, f)
+        # readers never see a partially written cache
+        os.replace(tmp, path)
+
+    @contextmanager
+    def tv_client(self, credentials: dict, factory: Callable = None) -> Iterator:
+        """
+        Borrow a TradingView client (created on demand, returned to the pool on exit).
+
+        :param credentials: username and password of the client
+        :param factory: function creating the client from the credentials. default is None (TvDatafeed)
+        """
+        key = (tuple(sorted(credentials.items())), factory)
+        with self._lock:
+            idle = self._tv_clients.setdefault(key, [])
+            client = idle.pop() if idle else None
+        if client is None:
+            if factory is None:
+                from tvDatafeed import TvDatafeed
+                factory = TvDatafeed
+            client = factory(**credentials)
+        try:
+            yield client
+        finally:
+            with self._lock:
+                self._tv_clients.setdefault(key, []).append(client)
+
+
+client_pool = ClientPool()
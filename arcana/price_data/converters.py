@@ -1,7 +1,11 @@
 import re
+from datetime import datetime
 from pathlib import Path
 
-from .dev_types import Interval
+from numpy import ndarray
+from pandas import DatetimeIndex, Index, Timestamp, to_datetime
+
+from .dev_types import Interval, PriceDataColumns
 
 
 INTERVAL_ALIASES = {
@@ -23,6 +27,14 @@ INTERVAL_ALIASES = {
     Interval.M12: ("yearly", "M12", "12M", "year", "R"),
 }
 
+def index_to_timestamps(index: Index) -> ndarray:
+    """Return the int64 nanosecond timestamps (UTC for tz-aware dates) of a date index (a view for a nanosecond DatetimeIndex)."""
+    if not isinstance(index, DatetimeIndex):
+        index = to_datetime(index)
+    if index.unit != "ns":
+        index = index.as_unit("ns")
+    return index.asi8
+
 def interval_converter(v):
     interval_map = {val: key for key, vals in INTERVAL_ALIASES.items() for val in vals}
     if v not in interval_map:
@@ -70,12 +82,28 @@ def ccxt_limit_converter(v):
         v = 1000
     return v
 
+def ccxt_time_converter(v):
+    """Convert a date (datetime, string or milliseconds since epoch) to milliseconds since epoch (UTC)."""
+    if v is None or isinstance(v, int):
+        return v
+    if not isinstance(v, str | datetime):
+        raise ValueError(f"{v} is not a valid time. Use a datetime, a date string or milliseconds since epoch.")
+    ts = Timestamp(v)
+    ts = ts.tz_localize("UTC") if ts.tz is None else ts.tz_convert("UTC")
+    return ts.value // 10**6
+
 def path_converter(v, suffix, deep_search: bool = False) -> list[Path]:
     if "." not in suffix:
         suffix = "." + suffix
 
     if isinstance(v, str):
         v = Path(v)
+    elif not isinstance(v, Path):
+        # files and folders, e.g. an already resolved list of files
+        files = [f for item in v for f in path_converter(item, suffix, deep_search)]
+        if not files:
+            raise ValueError(f"There is no files {suffix} in {v}.")
+        return list(dict.fromkeys(files))
 
     if v.is_file():
         if v.suffix == suffix:
@@ -84,9 +112,9 @@ def path_converter(v, suffix, deep_search: bool = False) -> list[Path]:
             raise IOError(f"The file hase wrong suffix. Expects {suffix}, got {v.suffix}")
     elif v.is_dir():
         if not deep_search:
-            files = [f for f in v.iterdir() if v.is_file() and v.suffix == suffix]
+            files = sorted(f for f in v.iterdir() if f.is_file() and f.suffix == suffix)
         else:
-            files = list(v.rglob(suffix))
+            files = sorted(f for f in v.rglob(f"*{suffix}") if f.is_file())
 
         if files:
             return files
@@ -96,3 +124,17 @@ def path_converter(v, suffix, deep_search: bool = False) -> list[Path]:
         raise ValueError(f"There is no files {suffix} linked to this folder.")
     else:
         raise IOError(f"Make sure that the folder or file {suffix} exists. Provided path {v}")
+
+def csv_columns_converter(v):
+    if v is None:
+        return v
+    if not isinstance(v, dict):
+        raise ValueError(f"{v} is not a valid column mapping. Use a dict of file column names to {[col.value for col in PriceDataColumns]}.")
+    columns = dict()
+    for file_col, col in v.items():
+        if col not in PriceDataColumns.__members__.values():
+            raise ValueError(f"{col} is not a valid column. Use: {[col.value for col in PriceDataColumns]}.")
+        columns[file_col] = PriceDataColumns(col)
+    if PriceDataColumns.DATE not in columns.values():
+        raise ValueError(f"The column mapping {v} has no {PriceDataColumns.DATE.value} column.")
+    return columns
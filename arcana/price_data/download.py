@@ -0,0 +1,118 @@
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from random import random
+from threading import Lock
+from time import monotonic, sleep
+from typing import Any
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    The bucket holds up to `capacity` tokens and is refilled with `rate` tokens per second.
+    Every request takes a token, waiting for the refill when the bucket is empty,
+    so bursts of `capacity` requests are allowed and the long run rate is `rate`.
+    """
+    __slots__ = ("_rate", "_capacity", "_tokens", "_last", "_clock", "_sleep", "_lock")
+
+    def __init__(self, rate: float, capacity: float = 1.0, *, clock: Callable[[], float] = monotonic,
+                 sleep_: Callable[[float], Any] = sleep):
+        """
+        :param rate: tokens added per second
+        :param capacity: maximum number of tokens (the burst size). default is 1.0
+        :param clock: monotonic clock in seconds. default is time.monotonic
+        :param sleep_: function waiting for the given seconds. default is time.sleep
+        """
+        if rate <= 0.0:
+            raise ValueError(f"{rate} should be positive.")
+        if capacity < 1.0:
+            raise ValueError(f"{capacity} should be at least 1.")
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._clock = clock
+        self._sleep = sleep_
+        self._last = clock()
+        self._lock = Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def acquire(self, tokens: float = 1.0):
+        """Take the tokens, waiting until they are available."""
+        if tokens > self._capacity:
+            raise ValueError(f"{tokens} tokens exceed the capacity {self._capacity}.")
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self._capacity, self._tokens + (now - self._last) * self._rate)
+                self._last = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self._rate
+            self._sleep(wait)
+
+
+class RateLimiters:
+    """Token buckets created on first use, one per exchange or source."""
+    __slots__ = ("_factory", "_buckets", "_lock")
+
+    def __init__(self, factory: Callable[[str], TokenBucket]):
+        """
+        :param factory: function creating the bucket of an exchange or source
+        """
+        self._factory = factory
+        self._buckets: dict[str, TokenBucket] = dict()
+        self._lock = Lock()
+
+    def __getitem__(self, key: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = self._factory(key)
+            return bucket
+
+
+def retry(fn: Callable[[], Any], *, retries: int, backoff: float, retry_on: tuple[type[Exception], ...],
+          max_backoff: float = 60.0, sleep_: Callable[[float], Any] = sleep) -> Any:
+    """
+    Call the function, retrying failed calls with exponential backoff.
+
+    The n-th retry waits `backoff * 2**n` seconds (at most `max_backoff`) with a random jitter
+    of up to a half of the delay, so concurrent callers do not retry in lockstep.
+
+    :param fn: the function to call
+    :param retries: number of retries after the first failed call
+    :param backoff: delay before the first retry (seconds)
+    :param retry_on: exceptions which are retried, other exceptions are raised immediately
+    :param max_backoff: maximum delay between two calls (seconds). default is 60.0
+    :param sleep_: function waiting for the given seconds. default is time.sleep
+    :return: result of the function
+    """
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except retry_on:
+            if attempt == retries:
+                raise
+        delay = min(max_backoff, backoff * 2 ** attempt)
+        sleep_(delay * (1.0 - random() / 2.0))
+
+
+def download_all(fetch: Callable[[str], Any], symbols: Iterable[str], *, max_workers: int) -> list:
+    """
+    Download the data of every symbol on a thread pool.
+
+    :param fetch: function downloading the data of a symbol
+    :param symbols: the symbols
+    :param max_workers: maximum number of concurrent downloads
+    :return: results in the order of `symbols`
+    """
+    symbols = list(symbols)
+    if max_workers <= 1 or len(symbols) <= 1:
+        return [fetch(symbol) for symbol in symbols]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(symbols))) as executor:
+        return list(executor.map(fetch, symbols))
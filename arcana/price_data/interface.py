@@ -1,37 +1,157 @@
-from pandas import DataFrame
+from collections.abc import Sequence
 
-from . import PriceDataColumns
+from pandas import DataFrame, Timestamp
+
+from .converters import index_to_timestamps
+from .dev_types import Interval, PriceDataColumns
 from .loader import PriceDataLoader
 from .cfg import PriceDataCfg
-from arcana.utils.df_utils import stack_data
+from .resample import Resampler
+from .store import OHLCVStore
+from .ring import RingBuffer
+from .align import Alignment
+from arcana.utils.df_utils import Panel
+from arcana.utils.metrics import metrics
 from arcana.utils.classes_utils import validate_classes_names
-from arcana.plotter import Plotter
 
 class PriceData:
     """The main obj for handling price data"""
 
-    __slots__ = ('loader', '_prices', "_data_cfg")
+    __slots__ = ('loader', 'store', 'window', '_prices', '_buffers', "_data_cfg", "_panel")
 
-    def __init__(self, loader_factory: PriceDataLoader):
+    def __init__(self, loader_factory: PriceDataLoader, *, store: OHLCVStore = None, window: int = None):
+        """
+        :param loader_factory: the loader factory
+        :param store: on-disk store checked before downloading, only the missing bars are downloaded and stored. default is None (no store)
+        :param window: number of the last bars kept for every symbol, new bars are added with `append` or `push`
+            and the oldest are evicted, so the memory stays constant. default is None (no limit, `load` replaces the data)
+        """
+        if window is not None and window <= 0:
+            raise ValueError(f"{window} should be positive.")
         self.loader = loader_factory.loader()
+        self.store = store
+        self.window = window
         validate_classes_names(loader_factory.name(), self.loader.name())
 
         self._prices = None
+        self._buffers: dict[str, RingBuffer] | None = None
         self._data_cfg = None
+        self._panel = None
 
     def load(self, data_cfg: PriceDataCfg) -> DataFrame:
         validate_classes_names(self.loader.name(), data_cfg.name)
         self._data_cfg = data_cfg
-        self._prices = self.loader.load(self._data_cfg)
-        return stack_data(self._prices, self._data_cfg.symbols)
+        with metrics.stage("load") as stage:
+            if self.store is not None and hasattr(self.loader, "load_stored"):
+                self._prices = self.loader.load_stored(self._data_cfg, self.store)
+            else:
+                self._prices = self.loader.load(self._data_cfg)
+            if stage:
+                stage.add(rows=sum(len(df) for df in self._prices))
+        if self.window is not None:
+            self._buffers = {symbol: RingBuffer.from_frame(df, self.window) for symbol, df in zip(data_cfg.symbols, self._prices)}
+            self._prices = None
+        self._panel = None
+        return self.prices
+
+    def append(self, bars: DataFrame):
+        """
+        Add new bars to the windows of the symbols (requires `window`).
+        A bar with the date of the last bar of its symbol replaces it (a bar which is still forming).
+
+        :param bars: bars of one or many symbols indexed by date, with the symbol column
+        """
+        buffers = self._live_buffers()
+        for symbol, df in bars.groupby(PriceDataColumns.SYMBOL, sort=False, observed=True):
+            buffer = buffers.get(symbol)
+            if buffer is None:
+                buffers[symbol] = RingBuffer.from_frame(df, self.window)
+            else:
+                buffer.extend(index_to_timestamps(df.index), df[list(buffer.columns)].to_numpy(dtype=float).T)
+        self._panel = None
+
+    def push(self, symbol: str, date, values: Sequence[float]):
+        """
+        Add a single bar to the window of the symbol in constant time (requires `window`).
+
+        :param symbol: the symbol
+        :param date: date of the bar (int64 ns or anything pandas can convert)
+        :param values: value of every price column, see `columns`
+        """
+        buffers = self._live_buffers()
+        buffer = buffers.get(symbol)
+        if buffer is None:
+            buffer = buffers[symbol] = RingBuffer(self.window)
+        buffer.push(date if isinstance(date, int) else Timestamp(date).value, values)
+        self._panel = None
+
+    def _live_buffers(self) -> dict[str, RingBuffer]:
+        if self.window is None:
+            raise ValueError("Bars can be added only to live data. Create PriceData with a window.")
+        if self._buffers is None:
+            self._buffers = dict()
+        return self._buffers
+
+    @property
+    def buffers(self) -> dict[str, RingBuffer]:
+        """Return the window of every symbol (contiguous NumPy views are available via `column` and `values`)."""
+        return self._live_buffers()
+
+    @property
+    def symbols(self) -> list[str]:
+        if self._buffers is not None:
+            return list(self._buffers)
+        return self._data_cfg.symbols
 
     @property
     def prices_raw(self) -> list[DataFrame]:
+        """Return the data of every symbol (for live data, views of the windows valid until new bars are added)."""
+        if self._buffers is not None:
+            return [buffer.to_frame(symbol) for symbol, buffer in self._buffers.items()]
         return self._prices
 
     @property
     def prices(self) -> DataFrame:
-        return stack_data(self._prices, self._data_cfg.symbols)
+        return self.panel.to_frame()
+
+    @property
+    def panel(self) -> Panel:
+        """Return the prices of all symbols aligned on a common time grid (built once per load)."""
+        if self._panel is None:
+            with metrics.stage("panel") as stage:
+                self._panel = Panel(self.prices_raw, self.symbols)
+                stage.add(rows=len(self._panel.dates) * len(self._panel.symbols), nbytes=self._panel.values.nbytes)
+        return self._panel
+
+    def align(self, *, how: str = "union", regular: bool = True) -> Alignment:
+        """
+        Align the dates of the symbols without copying their data.
+
+        :param how: "union" or "inner" grid. default is "union"
+        :param regular: use the regular grid of the loaded interval, so candles missing for every symbol are found as gaps too.
+            default is True
+        :return: the grid, index maps and gaps of every symbol
+        """
+        interval = self._data_cfg.interval if regular and self._data_cfg is not None else None
+        with metrics.stage("align") as stage:
+            alignment = Alignment.from_frames(self.prices_raw, self.symbols, interval=interval, how=how)
+            stage.add(rows=len(alignment))
+        return alignment
+
+    def resample(self, interval: Interval | str, **kwargs) -> list[DataFrame]:
+        """
+        Build bars of a coarser interval from the loaded bars of every symbol.
+
+        :param interval: the target interval (coarser than the loaded one)
+        :param kwargs: session anchoring, see `Resampler`
+        :return: resampled data of every symbol
+        """
+        resampler = Resampler(interval, source=self._data_cfg.interval, **kwargs)
+        with metrics.stage("resample") as stage:
+            res = resampler.resample_all(self.prices_raw)
+            if stage:
+                stage.add(rows=sum(len(df) for df in res))
+        return res
 
     @property
     def data_cfg(self) -> PriceDataCfg:
@@ -46,4 +166,7 @@ class PriceData:
         PriceDataLoader.registry.render_tree()
 
     def plot(self):
+        # plotting is optional, its dependencies are only needed here
+        from arcana.plotter import Plotter
+
         plotter = Plotter(rows=1, cols=1, row_heights=[1.0], subplot_titles=self.data_cfg.symbols)
\ No newline at end of file
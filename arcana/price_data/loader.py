@@ -1,10 +1,24 @@
 from abc import ABC, abstractmethod
-from pandas import DataFrame, to_datetime, read_csv
-
-from arcana.price_data.cfg import CSVCfg, TradingViewCfg, CCTXCfg
-from arcana.price_data.adapters import tv_interval_adapter, ccxt_symbol_adapter, ccxt_interval_adapter
+from collections.abc import Callable, Iterator
+from functools import partial
+from pathlib import Path
+from math import ceil
+from time import time, time_ns
+import attrs
+import numpy as np
+from pandas import DataFrame, DatetimeIndex, to_datetime, read_csv
+import ccxt
+
+from arcana.price_data.cfg import CSVCfg, TradingViewCfg, CCTXCfg, BinaryCfg
+from arcana.price_data.adapters import tv_interval_adapter, ccxt_interval_adapter
+from arcana.price_data.clients import client_pool
+from arcana.price_data.download import TokenBucket, RateLimiters, retry, download_all
 from arcana.price_data.dev_types import PriceDataColumns
+from arcana.price_data.resample import interval_length
+from arcana.price_data.store import OHLCVStore
+from arcana.price_data.binary import open_binary, write_binary
 from arcana.utils.RegistryTree import RegistryTree
+from arcana.utils.metrics import metrics
 
 COLUMN_ORDER = {
     's': PriceDataColumns.SYMBOL,
@@ -33,6 +47,102 @@ def _create_df_from_raw_array(raw_data: DataFrame, symbol: str) -> DataFrame:
     df.set_index("date", drop=True, inplace=True)
     return df
 
+def _read_stored(store: OHLCVStore, source: str, symbol: str, interval, columns: list[str], **kwargs) -> DataFrame:
+    """Read the stored bars, an empty frame with the price columns if nothing is stored (e.g. an empty download)."""
+    df = store.read(source, symbol, interval, **kwargs)
+    if df is None:
+        df = DataFrame({col: np.empty(0) for col in columns}, index=DatetimeIndex([], dtype="M8[ns]", name=INDEX_NAME))
+        df.insert(0, PriceDataColumns.SYMBOL, symbol)
+    return df
+
+def _backfill_windows(since: int, until: int, timeframe_ms: int, limit: int) -> range:
+    """Return the starts of the windows of `limit` candles covering [since, until) (milliseconds)."""
+    return range(since, until, timeframe_ms * limit)
+
+def _stitch_windows(windows: list[list], since: int, until: int) -> DataFrame:
+    """Join the candles of the windows into one sorted frame without duplicates (first received is kept)."""
+    rows = [row for window in windows for row in window]
+    data = np.array(rows, dtype=np.float64).reshape(len(rows), 6)
+    dates = data[:, 0].astype(np.int64)
+    mask = (dates >= since) & (dates < until)
+    data, dates = data[mask], dates[mask]
+    order = np.argsort(dates, kind="stable")
+    _, first = np.unique(dates[order], return_index=True)
+    keep = order[first]
+    df = DataFrame(data[keep, 1:], columns=["open", "high", "low", "close", "volume"])
+    df.insert(0, "date", dates[keep])
+    return df
+
+# file column names (lower case) recognized without an explicit column mapping
+CSV_COLUMN_ALIASES = {
+    "date": PriceDataColumns.DATE,
+    "datetime": PriceDataColumns.DATE,
+    "time": PriceDataColumns.DATE,
+    "timestamp": PriceDataColumns.DATE,
+    "open_time": PriceDataColumns.DATE,
+    "open": PriceDataColumns.OPEN,
+    "o": PriceDataColumns.OPEN,
+    "high": PriceDataColumns.HIGH,
+    "h": PriceDataColumns.HIGH,
+    "low": PriceDataColumns.LOW,
+    "l": PriceDataColumns.LOW,
+    "close": PriceDataColumns.CLOSE,
+    "c": PriceDataColumns.CLOSE,
+    "volume": PriceDataColumns.VOLUME,
+    "vol": PriceDataColumns.VOLUME,
+    "v": PriceDataColumns.VOLUME,
+}
+CSV_PRICE_COLUMNS = (
+    PriceDataColumns.OPEN,
+    PriceDataColumns.HIGH,
+    PriceDataColumns.LOW,
+    PriceDataColumns.CLOSE,
+    PriceDataColumns.VOLUME,
+)
+
+def _file_symbol(path: Path) -> str:
+    """Return the symbol of the file, e.g. BINANCE:BTCUSDT for BINANCE_BTCUSDT.csv."""
+    return path.stem.replace("_", ":", 1).upper()
+
+def _csv_paths(data_cfg: CSVCfg) -> dict[str, Path]:
+    paths = {_file_symbol(path): path for path in data_cfg.path}
+    missing = [symbol for symbol in data_cfg.symbols if symbol not in paths]
+    if missing:
+        raise KeyError(f"There is no {data_cfg.suffix} file of {missing}.")
+    return paths
+
+def _csv_columns(path: Path, data_cfg: CSVCfg) -> dict[str, PriceDataColumns]:
+    """Return the mapping of the file columns to read (only the header is parsed)."""
+    if data_cfg.columns is not None:
+        return {file_col: col for file_col, col in data_cfg.columns.items() if col != PriceDataColumns.SYMBOL}
+    columns = dict()
+    for file_col in read_csv(path, sep=data_cfg.sep, nrows=0).columns:
+        col = CSV_COLUMN_ALIASES.get(file_col.strip().lower())
+        if col is not None and col not in columns.values():
+            columns[file_col] = col
+    if PriceDataColumns.DATE not in columns.values():
+        raise ValueError(f"{path} has no date column. Provide the column mapping.")
+    return columns
+
+def _read_csv(path: Path, columns: dict[str, PriceDataColumns], data_cfg: CSVCfg, **kwargs):
+    dtype = {file_col: np.int64 if data_cfg.date_unit is not None else object
+             for file_col, col in columns.items() if col == PriceDataColumns.DATE}
+    dtype.update({file_col: np.float64 for file_col, col in columns.items() if col != PriceDataColumns.DATE})
+    return read_csv(path, sep=data_cfg.sep, usecols=list(columns), dtype=dtype, engine="c", **kwargs)
+
+def _normalize_csv(df: DataFrame, columns: dict[str, PriceDataColumns], symbol: str, data_cfg: CSVCfg) -> DataFrame:
+    df = df.rename(columns=columns)
+    dates = df.pop(INDEX_NAME)
+    if data_cfg.date_unit is not None:
+        index = to_datetime(dates.to_numpy(), unit=data_cfg.date_unit)
+    else:
+        # without a format, it is inferred from the first date and applied to the whole column
+        index = to_datetime(dates.to_numpy(), format=data_cfg.date_format, cache=True)
+    df.index = DatetimeIndex(index, name=INDEX_NAME)
+    df = df.reindex(columns=[col for col in CSV_PRICE_COLUMNS if col in df.columns])
+    df.insert(0, PriceDataColumns.SYMBOL, symbol)
+    return df
+
 class PriceDataLoader(ABC):
     """The main factory for loading OHLCV data."""
 
@@ -57,6 +167,17 @@ class PriceDataLoader(ABC):
     def registered(cls):
         return cls.registry.render_tree()
 
+def _group_symbols(requests: dict[str, list]) -> dict[object, list[str]]:
+    """Group the symbols by identical download requests, so every group is loaded with one call."""
+    groups = dict()
+    for symbol, symbol_requests in requests.items():
+        for request in symbol_requests:
+            groups.setdefault(request, []).append(symbol)
+    return groups
+
+# margin for the unknown offset between UTC and the exchange time of TradingView bars
+_TV_CLOCK_MARGIN = 14 * 3600 * 10**9
+
 class _LoaderName:
     __slots__ = ()
 
@@ -67,113 +188,324 @@ class _LoaderName:
 class _TradingView(_LoaderName):
     """Obj for handling Trading View OHLCV data."""
 
-    __slots__ = ('_loader_cfg',)
+    __slots__ = ('_loader_cfg', '_client_factory')
+    # requests per second (TradingView is a single source for every exchange)
+    RATE = 1.0
+    RETRY_ON = (OSError,)
 
-    def __init__(self, loader_cfg):
+    def __init__(self, loader_cfg, client_factory: Callable = None):
         self._loader_cfg = loader_cfg
+        self._client_factory = client_factory
 
     def load(self, data_cfg: TradingViewCfg) -> list[DataFrame]:
-        """Loading OHLCV data from Trading View via tvDatafeed logic."""
-        from tvDatafeed import TvDatafeed
-
-        client = TvDatafeed(**self._loader_cfg)
-        symbols = data_cfg.symbols
+        """
+        Loading OHLCV data from Trading View via tvDatafeed logic.
+        Symbols are downloaded concurrently within the rate limit, clients are borrowed from the pool.
+        """
         interval = tv_interval_adapter(data_cfg.interval)
-        n_bars = data_cfg.n_bars
-        fut_contract = data_cfg.fut_contract
-        extended_session = data_cfg.extended_session
-
-        print("Downloading data...")
-        df_ = []
-        for symbol in symbols:
-            print(symbol)
-            df: DataFrame = client.get_hist(
-                symbol=symbol,
-                interval=interval,
-                n_bars=n_bars,
-                fut_contract=fut_contract,
-                extended_session=extended_session
-            )
-            df = _normalize_columns(df)
-            df_.append(df)
-            print(df)
-            from time import sleep
-            sleep(1)
-        return df_
+        bucket = TokenBucket(data_cfg.rate or self.RATE, data_cfg.burst)
+
+        def fetch(symbol: str) -> DataFrame:
+            def get_hist() -> DataFrame:
+                bucket.acquire()
+                with client_pool.tv_client(self._loader_cfg, self._client_factory) as client:
+                    df = client.get_hist(
+                        symbol=symbol,
+                        interval=interval,
+                        n_bars=data_cfg.n_bars,
+                        fut_contract=data_cfg.fut_contract,
+                        extended_session=data_cfg.extended_session
+                    )
+                if df is None:
+                    raise ConnectionError(f"No data received for {symbol}.")
+                return df
+
+            with metrics.stage("load.fetch", symbol=symbol) as stage:
+                df = retry(get_hist, retries=data_cfg.retries, backoff=data_cfg.backoff, retry_on=self.RETRY_ON)
+                if stage:
+                    stage.add(rows=len(df), nbytes=int(df.memory_usage(index=True).sum()))
+            with metrics.stage("load.normalize", symbol=symbol) as stage:
+                df = _normalize_columns(df)
+                if stage:
+                    stage.add(rows=len(df), nbytes=int(df.memory_usage(index=True).sum()))
+            return df
+
+        return download_all(fetch, data_cfg.symbols, max_workers=data_cfg.max_workers)
+
+    def load_stored(self, data_cfg: TradingViewCfg, store: OHLCVStore) -> list[DataFrame]:
+        """
+        Loading OHLCV data through the store.
+        Symbols with less than `n_bars` stored bars are downloaded in full, the others only download
+        the bars after the last stored one (which is downloaded again, it may have been still forming).
+        The new bars are appended to the store and the last `n_bars` bars are read back.
+        """
+        interval = data_cfg.interval
+        length = interval_length(interval)
+        now = time_ns()
+        requests = dict()
+        for symbol in data_cfg.symbols:
+            bounds = store.bounds(self.name(), symbol, interval)
+            if bounds is None or bounds[2] < data_cfg.n_bars:
+                requests[symbol] = [data_cfg.n_bars]
+            else:
+                missing = ceil((now + _TV_CLOCK_MARGIN - bounds[1]) / length) + 1
+                requests[symbol] = [min(data_cfg.n_bars, max(1, missing))]
+
+        for n_bars, symbols in _group_symbols(requests).items():
+            for symbol, df in zip(symbols, self.load(attrs.evolve(data_cfg, symbols=symbols, n_bars=n_bars))):
+                store.write(self.name(), symbol, interval, df)
+        columns = [col for col in COLUMN_ORDER.values() if col != PriceDataColumns.SYMBOL]
+        return [_read_stored(store, self.name(), symbol, interval, columns, tail=data_cfg.n_bars)
+                for symbol in data_cfg.symbols]
 
 
 class _CCTX(_LoaderName):
     """Obj for handling CCTX OHLCV data."""
 
-    __slots__ = ()
+    __slots__ = ('_exchange_factory',)
+    RETRY_ON = (ccxt.NetworkError, OSError)
 
-    @staticmethod
-    def load(data_cfg: CCTXCfg) -> list[DataFrame]:
-        """Loading OHLCV data via CCTX."""
+    def __init__(self, exchange_factory: Callable = None):
+        self._exchange_factory = exchange_factory
 
+    def load(self, data_cfg: CCTXCfg) -> list[DataFrame]:
+        """
+        Loading OHLCV data via CCTX.
+        Symbols are downloaded concurrently, every exchange has its own rate limit
+        (by default the one declared by the exchange). Clients and markets come from the pool.
+
+        With `since` set, the whole range [since, until) is backfilled: it is split into windows
+        of `limit` candles fetched concurrently, then deduplicated and stitched per symbol.
+        """
         symbols = data_cfg.symbols
         limit = data_cfg.limit
+        retry_kwargs = dict(retries=data_cfg.retries, backoff=data_cfg.backoff, retry_on=self.RETRY_ON)
+
+        # pooled client per exchange, its markets are downloaded once and cached
+        factory = self._exchange_factory
+        exchange_ids = list(dict.fromkeys(symbol.split(":")[0] for symbol in symbols))
+        exchanges = dict(zip(exchange_ids, download_all(partial(client_pool.exchange, factory=factory), exchange_ids,
+                                                        max_workers=data_cfg.max_workers)))
+        limiters = RateLimiters(
+            lambda exchange_id: TokenBucket(data_cfg.rate or 1000.0 / exchanges[exchange_id].rateLimit, data_cfg.burst)
+        )
+
+        def load_markets(exchange_id: str, exchange, reload: bool) -> dict:
+            def load() -> dict:
+                limiters[exchange_id].acquire()
+                return exchange.load_markets(reload)
+            return retry(load, **retry_kwargs)
+
+        download_all(lambda exchange_id: client_pool.ticker_map(exchange_id, factory, load=partial(load_markets, exchange_id)),
+                     exchange_ids, max_workers=data_cfg.max_workers)
+
+        def fetch_window(job: tuple[str, int | None]) -> list:
+            symbol, start = job
+            exchange_id = symbol.split(":")[0]
+            exchange, ticker = client_pool.resolve(symbol, factory, load=partial(load_markets, exchange_id))
+            timeframe = ccxt_interval_adapter(data_cfg.interval, exchange)
 
+            def fetch_ohlcv() -> list:
+                limiters[exchange_id].acquire()
+                return exchange.fetch_ohlcv(
+                    symbol=ticker,
+                    timeframe=timeframe,
+                    limit=limit,
+                    since=start,
+                )
+
+            with metrics.stage("load.fetch", symbol=symbol) as stage:
+                raw_data = retry(fetch_ohlcv, **retry_kwargs)
+                stage.add(rows=len(raw_data))
+            return raw_data
+
+        if data_cfg.since is None:
+            jobs = {symbol: [(symbol, None)] for symbol in symbols}
+        else:
+            # backfill: every window of every symbol is a separate request
+            since = data_cfg.since
+            until = data_cfg.until if data_cfg.until is not None else int(time() * 1000)
+            timeframe_ms = interval_length(data_cfg.interval) // 10**6
+            jobs = {symbol: [(symbol, start) for start in _backfill_windows(since, until, timeframe_ms, limit)]
+                    for symbol in symbols}
+
+        windows = iter(download_all(fetch_window, [job for symbol in symbols for job in jobs[symbol]],
+                                    max_workers=data_cfg.max_workers))
         df_ = []
         for symbol in symbols:
-            exchange, ticker = ccxt_symbol_adapter(symbol)
-            timeframe = ccxt_interval_adapter(data_cfg.interval, exchange)
-            raw_data = exchange.fetch_ohlcv(
-                symbol=ticker,
-                timeframe=timeframe,
-                limit=limit,
-                since=None,
-            )
-            df = _create_df_from_raw_array(raw_data, symbol)
+            symbol_windows = [next(windows) for _ in jobs[symbol]]
+            with metrics.stage("load.normalize", symbol=symbol) as stage:
+                if data_cfg.since is None:
+                    raw_data, = symbol_windows
+                else:
+                    raw_data = _stitch_windows(symbol_windows, since, until)
+                df = _create_df_from_raw_array(raw_data, symbol)
+                if stage:
+                    stage.add(rows=len(df), nbytes=int(df.memory_usage(index=True).sum()))
             df_.append(df)
         return df_
 
+    def load_stored(self, data_cfg: CCTXCfg, store: OHLCVStore) -> list[DataFrame]:
+        """
+        Loading OHLCV data through the store.
+        Only the ranges missing before the first and after the last stored bar are downloaded
+        (the last stored bar again, it may have been still forming), appended to the store,
+        and the requested range is read back. Without `since` the last `limit` candles are requested.
+        """
+        interval = data_cfg.interval
+        timeframe_ms = interval_length(interval) // 10**6
+        until = data_cfg.until if data_cfg.until is not None else int(time() * 1000)
+        since = data_cfg.since if data_cfg.since is not None else until - timeframe_ms * data_cfg.limit
+
+        requests = dict()
+        for symbol in data_cfg.symbols:
+            bounds = store.bounds(self.name(), symbol, interval)
+            if bounds is None:
+                requests[symbol] = [(since, until)]
+                continue
+            first, last = bounds[0] // 10**6, bounds[1] // 10**6
+            requests[symbol] = []
+            if since < first:
+                requests[symbol].append((since, min(first, until)))
+            if last < until:
+                requests[symbol].append((max(last, since), until))
+
+        for (start, end), symbols in _group_symbols(requests).items():
+            for symbol, df in zip(symbols, self.load(attrs.evolve(data_cfg, symbols=symbols, since=start, until=end))):
+                store.write(self.name(), symbol, interval, df)
+        columns = ["open", "high", "low", "close", "volume"]
+        return [_read_stored(store, self.name(), symbol, interval, columns, start=since * 10**6, end=until * 10**6)
+                for symbol in data_cfg.symbols]
+
 
 class _CSV(_LoaderName):
     """Load data via csv file."""
 
     __slots__ = ()
 
-    @staticmethod
-    def load(data_cfg: CSVCfg) -> list[DataFrame]:
-        df_ = []
-        for path in data_cfg.path:
-            df = read_csv(path)
+    def load(self, data_cfg: CSVCfg) -> list[DataFrame]:
+        """
+        Loading OHLCV data from the csv files of the symbols.
+        Files are parsed concurrently (the C parser releases the GIL), only the mapped columns are read
+        with explicit dtypes and the dates are converted in one vectorized call.
+        """
+        paths = _csv_paths(data_cfg)
+
+        def read(symbol: str) -> DataFrame:
+            path = paths[symbol]
+            columns = _csv_columns(path, data_cfg)
+            with metrics.stage("load.read", symbol=symbol) as stage:
+                df = _read_csv(path, columns, data_cfg)
+                if stage:
+                    stage.add(rows=len(df), nbytes=int(df.memory_usage(index=True).sum()))
+            with metrics.stage("load.normalize", symbol=symbol):
+                df = _normalize_csv(df, columns, symbol, data_cfg)
+                if not df.index.is_monotonic_increasing:
+                    df = df.sort_index(kind="stable")
+            return df
+
+        return download_all(read, data_cfg.symbols, max_workers=data_cfg.max_workers)
+
+    def stream(self, data_cfg: CSVCfg) -> Iterator[tuple[str, DataFrame]]:
+        """
+        Loading OHLCV data from the csv files in chunks of `chunksize` rows, for files larger than memory.
+        Symbols are read one after another.
+
+        :return: iterator of the symbol and the normalized chunk
+        """
+        paths = _csv_paths(data_cfg)
+        for symbol in data_cfg.symbols:
+            columns = _csv_columns(paths[symbol], data_cfg)
+            with _read_csv(paths[symbol], columns, data_cfg, chunksize=data_cfg.chunksize) as reader:
+                for chunk in reader:
+                    with metrics.stage("load.read", symbol=symbol, rows=len(chunk)):
+                        chunk = _normalize_csv(chunk, columns, symbol, data_cfg)
+                    yield symbol, chunk
+
+    def ingest(self, data_cfg: CSVCfg, store: OHLCVStore):
+        """
+        Stream the csv files into the store chunk by chunk, so files larger than memory
+        can then be queried by time range.
+        """
+        for symbol, chunk in self.stream(data_cfg):
+            store.write(self.name(), symbol, data_cfg.interval, chunk)
+
+class _Binary(_LoaderName):
+    """Load memory-mapped binary data."""
 
-            # normalization...
+    __slots__ = ()
 
+    @staticmethod
+    def load(data_cfg: BinaryCfg) -> list[DataFrame]:
+        """
+        Loading OHLCV data by mapping the binary files of the symbols, nothing is read until used.
+        """
+        start = data_cfg.start * 10**6 if data_cfg.start is not None else None
+        end = data_cfg.end * 10**6 if data_cfg.end is not None else None
+        df_ = []
+        for symbol in data_cfg.symbols:
+            with metrics.stage("load.map", symbol=symbol) as stage:
+                df = open_binary(data_cfg.path, symbol, start=start, end=end)
+                stage.add(rows=len(df))
             df_.append(df)
-
         return df_
 
+    @staticmethod
+    def save(df_list: list[DataFrame], data_cfg: BinaryCfg):
+        """Write the data of every symbol (e.g. loaded from another source) in the binary layout."""
+        for df in df_list:
+            write_binary(data_cfg.path, df)
+
 class TradingViewLoader(PriceDataLoader):
     """The TradingView OHLCV data loader factory."""
 
-    __slots__ = ('loader_params',)
+    __slots__ = ('loader_params', 'client_factory')
     PriceDataLoader.registry.add_key("TradingView", "PriceDataLoader")
 
-    def __init__(self, *, username: str = None, password: str = None):
+    def __init__(self, *, username: str = None, password: str = None, client_factory: Callable = None):
+        """
+        :param username: TradingView username. default is None (anonymous access)
+        :param password: TradingView password. default is None
+        :param client_factory: function creating the client from the credentials, e.g. a fake client in tests. default is TvDatafeed
+        """
         self.loader_params = {
             "username": username,
             "password": password,
         }
+        self.client_factory = client_factory
 
     def loader(self) -> _TradingView:
-        return _TradingView(self.loader_params)
+        return _TradingView(self.loader_params, self.client_factory)
 
 class CCTXLoader(PriceDataLoader):
     """The CCTX price OHLCV loader factory."""
 
-    __slots__ = ()
+    __slots__ = ('exchange_factory',)
     PriceDataLoader.registry.add_key("CCTX", "PriceDataLoader")
 
+    def __init__(self, *, exchange_factory: Callable = None):
+        """
+        :param exchange_factory: function creating the exchange client from its id, e.g. a fake client in tests. default is ccxt
+        """
+        self.exchange_factory = exchange_factory
+
     def loader(self) -> _CCTX:
-        return _CCTX()
+        return _CCTX(self.exchange_factory)
 
 class CSVLoader(PriceDataLoader):
     """The csv price OHLCV loader factory."""
 
     __slots__ = ()
+    PriceDataLoader.registry.add_key("CSV", "PriceDataLoader")
 
     def loader(self) -> _CSV:
         return _CSV()
+
+class BinaryLoader(PriceDataLoader):
+    """The memory-mapped binary OHLCV data loader factory."""
+
+    __slots__ = ()
+    PriceDataLoader.registry.add_key("Binary", "PriceDataLoader")
+
+    def loader(self) -> _Binary:
+        return _Binary()
@@ -0,0 +1,306 @@
+from collections.abc import Iterable
+
+import numpy as np
+from numpy import ndarray
+from pandas import DataFrame, DatetimeIndex, Timedelta, to_datetime
+
+from .converters import interval_converter
+from .dev_types import Interval, PriceDataColumns
+
+_MINUTE = 60 * 10**9
+_DAY = 1440 * _MINUTE
+
+# fixed length intervals (ns)
+_DURATIONS = {
+    Interval.m1: _MINUTE,
+    Interval.m3: 3 * _MINUTE,
+    Interval.m5: 5 * _MINUTE,
+    Interval.m15: 15 * _MINUTE,
+    Interval.m30: 30 * _MINUTE,
+    Interval.m45: 45 * _MINUTE,
+    Interval.h1: 60 * _MINUTE,
+    Interval.h2: 120 * _MINUTE,
+    Interval.h3: 180 * _MINUTE,
+    Interval.h4: 240 * _MINUTE,
+    Interval.D1: _DAY,
+    Interval.W1: 7 * _DAY,
+}
+# calendar intervals (months)
+_MONTHS = {
+    Interval.M1: 1,
+    Interval.M3: 3,
+    Interval.M6: 6,
+    Interval.M12: 12,
+}
+
+# how every OHLCV column is aggregated, other columns keep their last value
+_AGGREGATION = {
+    PriceDataColumns.OPEN: "first",
+    PriceDataColumns.HIGH: "max",
+    PriceDataColumns.LOW: "min",
+    PriceDataColumns.CLOSE: "last",
+    PriceDataColumns.VOLUME: "sum",
+}
+
+
+def interval_length(interval: Interval) -> int:
+    """Return the length of bars of the interval in ns (the longest one for calendar intervals)."""
+    if interval in _MONTHS:
+        return _MONTHS[interval] * 31 * _DAY
+    return _DURATIONS[interval]
+
+
+def _validate_intervals(source: Interval, target: Interval):
+    """Ensure that bars of the target interval are made of whole bars of the source interval."""
+    if source in _MONTHS:
+        valid = target in _MONTHS and _MONTHS[target] % _MONTHS[source] == 0
+    elif target in _MONTHS or target == Interval.D1:
+        # calendar buckets and days are made of bars which divide a day
+        valid = _DURATIONS[source] <= _DAY and _DAY % _DURATIONS[source] == 0
+    elif target == Interval.W1:
+        valid = source == Interval.W1 or (_DURATIONS[source] <= _DAY and _DAY % _DURATIONS[source] == 0)
+    else:
+        valid = source != Interval.W1 and _DURATIONS[target] % _DURATIONS[source] == 0
+    if not valid:
+        raise ValueError(f"{target.value} bars can not be built from {source.value} bars.")
+
+
+def _aggregate(values: ndarray, how: str, starts: ndarray) -> ndarray:
+    """Aggregate runs of values starting at `starts` (every run is non-empty)."""
+    if how == "first":
+        return values[starts]
+    if how == "last":
+        return values[np.append(starts[1:], len(values)) - 1]
+    if how == "max":
+        return np.maximum.reduceat(values, starts)
+    if how == "min":
+        return np.minimum.reduceat(values, starts)
+    return np.add.reduceat(values, starts)
+
+
+def _merge(old, new, how: str):
+    """Merge an aggregated value with the aggregate of newer bars of the same bucket."""
+    if how == "first":
+        return old
+    if how == "max":
+        return max(old, new)
+    if how == "min":
+        return min(old, new)
+    if how == "sum":
+        return old + new
+    return new
+
+
+class Resampler:
+    """
+    Build bars of a coarser interval from loaded finer bars.
+
+    Fine bars are assigned to buckets with vectorized integer arithmetic on their timestamps
+    and every bucket is aggregated with `reduceat` (open: first, high: max, low: min,
+    close: last, volume: sum, other columns: last). Bars are labeled with the bucket start.
+
+    Buckets are anchored as follows:
+        intraday intervals restart every day at the session anchor (`offset`),
+        days start at `offset`,
+        weeks start at `offset` of `week_start` (0 is Monday),
+        months, quarters, half-years and years follow the calendar (Jan is the first month of all of them).
+    """
+    __slots__ = ("_interval", "_source", "_offset", "_tz", "_week_start")
+
+    def __init__(self, interval: Interval | str, *, source: Interval | str = None, offset: str | Timedelta = None,
+                 tz: str = None, week_start: int = 0):
+        """
+        :param interval: the target interval
+        :param source: interval of the fine bars, used to validate the target. default is None (not validated)
+        :param offset: session anchor, e.g. "9h30min" (bars start at 09:30). default is None (midnight)
+        :param tz: time zone of the session anchor. default is None (timestamps as they are, UTC for tz-aware data)
+        :param week_start: first day of the week, 0 is Monday. default is 0
+        """
+        self._interval = interval_converter(interval) if not isinstance(interval, Interval) else interval
+        self._source = None
+        if source is not None:
+            self._source = interval_converter(source) if not isinstance(source, Interval) else source
+            _validate_intervals(self._source, self._interval)
+        self._offset = Timedelta(offset or 0).value
+        if not 0 <= self._offset < _DAY:
+            raise ValueError(f"{offset} should be within a day.")
+        if not 0 <= week_start < 7:
+            raise ValueError(f"{week_start} is not a valid week day. Use 0 (Monday) - 6 (Sunday).")
+        self._tz = tz
+        self._week_start = week_start
+
+    @property
+    def interval(self) -> Interval:
+        return self._interval
+
+    def _local_timestamps(self, index: DatetimeIndex) -> ndarray:
+        """Return the wall clock timestamps (ns) the buckets are computed on."""
+        if not isinstance(index, DatetimeIndex):
+            index = to_datetime(index)
+        if self._tz is not None:
+            index = (index.tz_localize("UTC") if index.tz is None else index).tz_convert(self._tz).tz_localize(None)
+        elif index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        return index.as_unit("ns").asi8
+
+    def _labels(self, starts: ndarray, index: DatetimeIndex) -> DatetimeIndex:
+        """Return the bucket starts as the index of the coarse bars (in the time zone of the fine bars)."""
+        labels = DatetimeIndex(starts.view("M8[ns]"), name=index.name)
+        tz = getattr(index, "tz", None)
+        if self._tz is not None:
+            labels = labels.tz_localize(self._tz, ambiguous=False, nonexistent="shift_forward")
+            return labels.tz_convert(tz) if tz is not None else labels.tz_convert("UTC").tz_localize(None)
+        return labels.tz_localize("UTC").tz_convert(tz) if tz is not None else labels
+
+    def buckets(self, timestamps: ndarray) -> ndarray:
+        """
+        Return the bucket start of every wall clock timestamp.
+
+        :param timestamps: int64 nanosecond timestamps
+        :return: int64 nanosecond bucket starts
+        """
+        local = np.asarray(timestamps, dtype=np.int64) - self._offset
+        interval = self._interval
+        day = local // _DAY
+        if interval in _MONTHS:
+            months = local.view("M8[ns]").astype("M8[M]").astype(np.int64)
+            k = _MONTHS[interval]
+            starts = ((months // k) * k).astype("M8[M]").astype("M8[ns]").astype(np.int64)
+        elif interval == Interval.W1:
+            # 1970-01-01 was a Thursday (weekday 3)
+            starts = (day - (day + 3 - self._week_start) % 7) * _DAY
+        elif interval == Interval.D1:
+            starts = day * _DAY
+        else:
+            duration = _DURATIONS[interval]
+            starts = day * _DAY + ((local - day * _DAY) // duration) * duration
+        return starts + self._offset
+
+    def _aggregate_frame(self, df: DataFrame) -> tuple[ndarray, dict]:
+        """Return bucket starts and aggregated columns of the fine bars."""
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        starts = self.buckets(self._local_timestamps(df.index))
+        if not len(df):
+            return starts, {col: df[col].to_numpy() for col in df.columns if col != PriceDataColumns.SYMBOL}
+        runs = np.concatenate(([0], np.flatnonzero(np.diff(starts)) + 1))
+        columns = dict()
+        for col in df.columns:
+            if col == PriceDataColumns.SYMBOL:
+                continue
+            columns[col] = _aggregate(df[col].to_numpy(), _AGGREGATION.get(col, "last"), runs)
+        return starts[runs], columns
+
+    def resample(self, df: DataFrame) -> DataFrame:
+        """
+        Resample OHLCV data of a single symbol.
+
+        :param df: fine bars (indexed by date)
+        :return: coarse bars with the same columns
+        """
+        starts, columns = self._aggregate_frame(df)
+        res = DataFrame(columns, index=self._labels(starts, df.index))
+        if PriceDataColumns.SYMBOL in df.columns:
+            res.insert(list(df.columns).index(PriceDataColumns.SYMBOL), PriceDataColumns.SYMBOL,
+                       df[PriceDataColumns.SYMBOL].iloc[0] if len(df) else None)
+        return res
+
+    def resample_all(self, df_: Iterable[DataFrame]) -> list[DataFrame]:
+        """Resample OHLCV data of every symbol."""
+        return [self.resample(df) for df in df_]
+
+    def incremental(self, df: DataFrame = None) -> "IncrementalResampler":
+        """Return the incremental resampler seeded with the fine bars."""
+        res = IncrementalResampler(self)
+        if df is not None:
+            res.update(df)
+        return res
+
+
+class IncrementalResampler:
+    """
+    Coarse bars of a single symbol kept up to date as new fine bars arrive.
+
+    Only the new fine bars are aggregated, the last (possibly partial) coarse bar
+    is merged with them. Coarse bars are kept in growing buffers.
+    """
+    __slots__ = ("_resampler", "_columns", "_starts", "_values", "_size", "_symbol", "_index")
+
+    def __init__(self, resampler: Resampler):
+        self._resampler = resampler
+        self._columns: list[str] = []
+        self._starts = np.empty(0, dtype=np.int64)
+        self._values: dict[str, ndarray] = dict()
+        self._size = 0
+        self._symbol = None
+        self._index = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _grow(self, n: int):
+        capacity = len(self._starts)
+        if self._size + n <= capacity:
+            return
+        capacity = max(2 * capacity, self._size + n, 16)
+        starts = np.empty(capacity, dtype=np.int64)
+        starts[:self._size] = self._starts[:self._size]
+        self._starts = starts
+        for col, values in self._values.items():
+            grown = np.empty(capacity, dtype=values.dtype)
+            grown[:self._size] = values[:self._size]
+            self._values[col] = grown
+
+    def update(self, df: DataFrame) -> DataFrame:
+        """
+        Apply new fine bars (newer than every bar applied before).
+
+        :param df: new fine bars (indexed by date)
+        :return: coarse bars changed or created by the update
+        """
+        if not len(df):
+            return self._frame(self._size, self._size)
+        starts, columns = self._resampler._aggregate_frame(df)
+        if self._index is None:
+            self._index = df.index[:0]
+            self._columns = list(columns)
+            self._values = {col: np.empty(0, dtype=values.dtype) for col, values in columns.items()}
+            if PriceDataColumns.SYMBOL in df.columns:
+                self._symbol = df[PriceDataColumns.SYMBOL].iloc[0]
+        elif list(columns) != self._columns:
+            raise ValueError(f"Columns {list(columns)} != {self._columns}.")
+
+        if self._size and starts[0] < self._starts[self._size - 1]:
+            raise ValueError("New bars should not be older than the last coarse bar.")
+
+        first = self._size
+        skip = 0
+        if self._size and starts[0] == self._starts[self._size - 1]:
+            # the first new bucket continues the last coarse bar
+            first -= 1
+            for col in self._columns:
+                how = _AGGREGATION.get(col, "last")
+                self._values[col][first] = _merge(self._values[col][first], columns[col][0], how)
+            skip = 1
+
+        n = len(starts) - skip
+        self._grow(n)
+        self._starts[self._size:self._size + n] = starts[skip:]
+        for col in self._columns:
+            self._values[col][self._size:self._size + n] = columns[col][skip:]
+        self._size += n
+        return self._frame(first, self._size)
+
+    def _frame(self, start: int, stop: int) -> DataFrame:
+        if self._index is None:
+            return DataFrame()
+        res = DataFrame({col: self._values[col][start:stop].copy() for col in self._columns},
+                        index=self._resampler._labels(self._starts[start:stop], self._index))
+        if self._symbol is not None:
+            res.insert(0, PriceDataColumns.SYMBOL, self._symbol)
+        return res
+
+    @property
+    def frame(self) -> DataFrame:
+        """Return all coarse bars."""
+        return self._frame(0, self._size)
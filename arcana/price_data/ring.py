@@ -0,0 +1,156 @@
+from collections.abc import Sequence
+
+import numpy as np
+from numpy import ndarray
+from pandas import Categorical, DataFrame, DatetimeIndex
+
+from .converters import index_to_timestamps
+from .dev_types import PriceDataColumns
+
+RING_COLUMNS = (
+    PriceDataColumns.OPEN,
+    PriceDataColumns.HIGH,
+    PriceDataColumns.LOW,
+    PriceDataColumns.CLOSE,
+    PriceDataColumns.VOLUME,
+)
+
+
+class RingBuffer:
+    """
+    Fixed-capacity columnar buffer of the last bars of a symbol.
+
+    Every bar is written twice, at `i` and `i + capacity` of arrays of twice the capacity,
+    so the window (the last `capacity` bars, oldest first) is always a contiguous slice:
+    pushing a bar is O(1), the oldest bar is evicted implicitly and no memory is allocated
+    after the construction.
+    """
+    __slots__ = ("_capacity", "_columns", "_dates", "_values", "_head", "_size", "_tz")
+
+    def __init__(self, capacity: int, columns: Sequence[str] = RING_COLUMNS, *, tz: str = None):
+        """
+        :param capacity: maximum number of bars kept
+        :param columns: price columns of the bars. default is open, high, low, close, volume
+        :param tz: time zone of the dates. default is None (naive)
+        """
+        if capacity <= 0:
+            raise ValueError(f"{capacity} should be positive.")
+        self._capacity = capacity
+        self._columns = tuple(columns)
+        self._dates = np.zeros(2 * capacity, dtype=np.int64)
+        self._values = np.full((len(self._columns), 2 * capacity), np.nan)
+        # position of the next bar in [0, capacity)
+        self._head = 0
+        self._size = 0
+        self._tz = tz
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def columns(self) -> tuple[str]:
+        return self._columns
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_date(self) -> int | None:
+        """Return the date of the last bar (int64 ns), None if empty."""
+        return int(self._dates[self._head + self._capacity - 1]) if self._size else None
+
+    def push(self, date: int, values: Sequence[float]):
+        """
+        Add a bar. A bar with the date of the last bar replaces it (a bar which is still forming).
+
+        :param date: date of the bar (int64 ns)
+        :param values: value of every column
+        """
+        last = self.last_date
+        if last is not None and date <= last:
+            if date < last:
+                raise ValueError(f"The bar at {date} is older than the last bar at {last}.")
+            i = self._head - 1 if self._head else self._capacity - 1
+        else:
+            i = self._head
+            self._head = i + 1 if i + 1 < self._capacity else 0
+            self._size = min(self._size + 1, self._capacity)
+        self._dates[i] = self._dates[i + self._capacity] = date
+        self._values[:, i] = self._values[:, i + self._capacity] = values
+
+    def extend(self, dates: ndarray, values: ndarray):
+        """
+        Add bars in the order of dates (only the last `capacity` new bars are written).
+
+        :param dates: int64 dates (ns) of the bars
+        :param values: (n_columns, n_bars) values of the bars
+        """
+        dates = np.asarray(dates, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        if len(dates) and np.any(dates[1:] <= dates[:-1]):
+            raise ValueError("Dates of the bars should be increasing.")
+        if len(dates) and self._size and dates[0] <= self.last_date:
+            # the first bar may update the forming bar, then the rest is appended
+            self.push(int(dates[0]), values[:, 0])
+            dates, values = dates[1:], values[:, 1:]
+        dates, values = dates[-self._capacity:], values[:, -self._capacity:]
+        n = len(dates)
+        if not n:
+            return
+        cap = self._capacity
+        # positions of the new bars, wrapping around at most once
+        pos = (self._head + np.arange(n)) % cap
+        self._dates[pos] = self._dates[pos + cap] = dates
+        self._values[:, pos] = values
+        self._values[:, pos + cap] = values
+        self._head = (self._head + n) % cap
+        self._size = min(self._size + n, cap)
+
+    def _window(self) -> slice:
+        end = self._head + self._capacity
+        return slice(end - self._size, end)
+
+    @property
+    def dates(self) -> ndarray:
+        """Return the dates of the window (int64 ns, oldest first) as a contiguous view."""
+        return self._dates[self._window()]
+
+    @property
+    def values(self) -> ndarray:
+        """Return the (n_columns, n_bars) values of the window, every row is a contiguous view."""
+        return self._values[:, self._window()]
+
+    def column(self, col: str) -> ndarray:
+        """Return the values of the column in the window as a contiguous view."""
+        try:
+            return self._values[self._columns.index(col), self._window()]
+        except ValueError:
+            raise KeyError(f"{col} is not a column of the buffer. Use: {list(self._columns)}.") from None
+
+    def to_frame(self, symbol: str) -> DataFrame:
+        """
+        Return the window as DataFrame of views of the buffer (valid until the next push).
+
+        :param symbol: the symbol of the bars
+        """
+        index = DatetimeIndex(self.dates.view("M8[ns]"), name=PriceDataColumns.DATE)
+        if self._tz is not None:
+            index = index.tz_localize("UTC").tz_convert(self._tz)
+        data = {PriceDataColumns.SYMBOL: Categorical.from_codes(np.zeros(self._size, dtype=np.int8), [symbol])}
+        data.update((col, self.column(col)) for col in self._columns)
+        return DataFrame(data, index=index, copy=False)
+
+    @classmethod
+    def from_frame(cls, df: DataFrame, capacity: int) -> "RingBuffer":
+        """
+        Create the buffer holding the last `capacity` bars of the data of a symbol.
+
+        :param df: data of the symbol (indexed by date)
+        :param capacity: maximum number of bars kept
+        """
+        columns = [col for col in RING_COLUMNS if col in df.columns]
+        tz = getattr(df.index, "tz", None)
+        buffer = cls(capacity, columns, tz=str(tz) if tz is not None else None)
+        buffer.extend(index_to_timestamps(df.index), np.vstack([df[col].to_numpy(dtype=np.float64) for col in columns]))
+        return buffer
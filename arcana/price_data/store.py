@@ -0,0 +1,212 @@
+import json
+import os
+from pathlib import Path
+from threading import RLock
+
+import numpy as np
+from numpy import ndarray
+from pandas import DataFrame, DatetimeIndex
+
+from .dev_types import Interval, PriceDataColumns
+from .utils.PATHS import DOWNLOADED_DATA
+from arcana.utils.metrics import metrics
+
+_META = "meta.json"
+_DATE = "date"
+
+
+def _partition_name(v: str) -> str:
+    return v.replace(":", "_").replace("/", "_")
+
+
+def _chunk_keys(dates: ndarray, interval: Interval) -> ndarray:
+    """Return the chunk of every date: a month for intraday bars, a year for longer bars."""
+    unit = "M8[M]" if interval.value.endswith(("m", "h")) else "M8[Y]"
+    return dates.view("M8[ns]").astype(unit).astype(str)
+
+
+def _save(path: Path, arr: ndarray):
+    """Write the array atomically (readers never see a partially written file)."""
+    tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+    np.save(tmp, arr)
+    os.replace(tmp, path)
+
+
+class OHLCVStore:
+    """
+    Persistent on-disk store of OHLCV data partitioned by source, symbol and interval.
+
+    Every partition is split into time chunks (a month of intraday bars, a year of longer bars)
+    holding one `.npy` file per column, so appending new bars rewrites only the chunks they fall into
+    and time-range reads memory-map only the overlapping chunks and copy the requested rows.
+    The chunk bounds are kept in the partition metadata.
+
+    Layout: root/source/symbol/interval/chunk/column.npy
+    """
+    __slots__ = ("_root", "_lock")
+
+    def __init__(self, root: str | Path = DOWNLOADED_DATA):
+        """
+        :param root: folder of the store. default is DOWNLOADED_DATA
+        """
+        self._root = Path(root)
+        self._lock = RLock()
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def partition(self, source: str, symbol: str, interval: Interval) -> Path:
+        """Return the folder of the partition."""
+        return self._root / _partition_name(source) / _partition_name(symbol) / interval.value
+
+    def _meta(self, path: Path) -> dict | None:
+        try:
+            with open(path / _META) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_meta(self, path: Path, meta: dict):
+        tmp = path / f"{_META}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, path / _META)
+
+    def bounds(self, source: str, symbol: str, interval: Interval) -> tuple[int, int, int] | None:
+        """
+        Return the first and the last stored date (int64 ns) and the number of stored bars.
+
+        :return: (first, last, n_bars), None if nothing is stored
+        """
+        meta = self._meta(self.partition(source, symbol, interval))
+        if not meta or not meta["chunks"]:
+            return None
+        chunks = meta["chunks"].values()
+        return min(c[0] for c in chunks), max(c[1] for c in chunks), sum(c[2] for c in chunks)
+
+    def write(self, source: str, symbol: str, interval: Interval, df: DataFrame):
+        """
+        Store the bars (indexed by date). Bars already stored at the same dates are replaced.
+
+        :param source: data source, e.g. "CCTX"
+        :param symbol: the symbol
+        :param interval: interval of the bars
+        :param df: the bars
+        """
+        if not len(df):
+            return
+        path = self.partition(source, symbol, interval)
+        index = df.index if isinstance(df.index, DatetimeIndex) else DatetimeIndex(df.index)
+        tz = str(index.tz) if index.tz is not None else None
+        if tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        dates = index.as_unit("ns").asi8
+
+        with self._lock, metrics.stage("store.write", symbol=symbol, rows=len(df)):
+            path.mkdir(parents=True, exist_ok=True)
+            meta = self._meta(path) or {
+                "symbol": symbol,
+                "columns": [col for col in df.columns if col != PriceDataColumns.SYMBOL],
+                "tz": tz,
+                "chunks": {},
+            }
+            columns = meta["columns"]
+            values = {col: df[col].to_numpy(dtype=np.float64) if col in df.columns else np.full(len(df), np.nan)
+                      for col in columns}
+
+            keys = _chunk_keys(dates, interval)
+            for key in np.unique(keys):
+                mask = keys == key
+                chunk = path / key
+                new_dates = dates[mask]
+                new_values = {col: val[mask] for col, val in values.items()}
+                if key in meta["chunks"]:
+                    new_dates = np.concatenate((np.load(chunk / f"{_DATE}.npy"), new_dates))
+                    new_values = {col: np.concatenate((np.load(chunk / f"{col}.npy"), val)) for col, val in new_values.items()}
+                else:
+                    chunk.mkdir(exist_ok=True)
+                # sort and keep the last (newest) bar of every date
+                order = np.argsort(new_dates, kind="stable")
+                new_dates = new_dates[order]
+                keep = np.append(new_dates[1:] != new_dates[:-1], True)
+                new_dates = new_dates[keep]
+                for col, val in new_values.items():
+                    _save(chunk / f"{col}.npy", val[order][keep])
+                _save(chunk / f"{_DATE}.npy", new_dates)
+                meta["chunks"][key] = [int(new_dates[0]), int(new_dates[-1]), len(new_dates)]
+
+            meta["chunks"] = dict(sorted(meta["chunks"].items()))
+            self._write_meta(path, meta)
+
+    def read(self, source: str, symbol: str, interval: Interval, *, start=None, end=None, tail: int = None) -> DataFrame | None:
+        """
+        Read the stored bars of the time range.
+
+        :param source: data source, e.g. "CCTX"
+        :param symbol: the symbol
+        :param interval: interval of the bars
+        :param start: first date (inclusive, int64 ns or anything pandas can convert). default is None (from the first bar)
+        :param end: last date (exclusive). default is None (up to the last bar)
+        :param tail: return only the last `tail` bars of the range. default is None (all)
+        :return: the bars indexed by date, None if nothing is stored
+        """
+        path = self.partition(source, symbol, interval)
+        meta = self._meta(path)
+        if not meta or not meta["chunks"]:
+            return None
+        start = _to_ns(start, meta["tz"])
+        end = _to_ns(end, meta["tz"])
+
+        with metrics.stage("store.read", symbol=symbol) as stage:
+            chunks = [key for key, (first, last, _) in meta["chunks"].items()
+                      if (start is None or last >= start) and (end is None or first < end)]
+            if tail is not None:
+                # only the newest chunks which hold the last `tail` bars are read
+                n, first_chunk = 0, len(chunks)
+                while first_chunk > 0 and n < tail:
+                    first_chunk -= 1
+                    n += meta["chunks"][chunks[first_chunk]][2]
+                chunks = chunks[first_chunk:]
+
+            dates, values = [], {col: [] for col in meta["columns"]}
+            for key in chunks:
+                chunk_dates = np.load(path / key / f"{_DATE}.npy", mmap_mode="r")
+                lo = 0 if start is None else int(np.searchsorted(chunk_dates, start, side="left"))
+                hi = len(chunk_dates) if end is None else int(np.searchsorted(chunk_dates, end, side="left"))
+                dates.append(np.array(chunk_dates[lo:hi]))
+                for col in values:
+                    values[col].append(np.array(np.load(path / key / f"{col}.npy", mmap_mode="r")[lo:hi]))
+
+            dates = np.concatenate(dates) if dates else np.empty(0, dtype=np.int64)
+            rows = slice(max(0, len(dates) - tail) if tail is not None else 0, None)
+            index = DatetimeIndex(dates[rows].view("M8[ns]"), name=PriceDataColumns.DATE)
+            if meta["tz"] is not None:
+                index = index.tz_localize("UTC").tz_convert(meta["tz"])
+            df = DataFrame({col: np.concatenate(val)[rows] if val else np.empty(0) for col, val in values.items()}, index=index)
+            df.insert(0, PriceDataColumns.SYMBOL, meta["symbol"])
+            stage.add(rows=len(df))
+        return df
+
+    def delete(self, source: str, symbol: str, interval: Interval):
+        """Remove the partition."""
+        path = self.partition(source, symbol, interval)
+        with self._lock:
+            meta = self._meta(path)
+            if meta is None:
+                raise KeyError(f"{symbol} ({interval.value}) is not stored for {source}.")
+            for key in meta["chunks"]:
+                for file in (path / key).iterdir():
+                    file.unlink()
+                (path / key).rmdir()
+            (path / _META).unlink()
+
+
+def _to_ns(v, tz: str | None) -> int | None:
+    """Convert a date bound to int64 ns in the stored (naive, UTC for tz-aware data) time."""
+    if v is None or isinstance(v, int | np.integer):
+        return v
+    index = DatetimeIndex([v])
+    if index.tz is not None and tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return int(index.as_unit("ns").asi8[0])
@@ -1,13 +1,124 @@
 from arcana.price_data.dev_types import PriceDataColumns
 
-from pandas import DataFrame, concat
+import numpy as np
+from numpy import ndarray
+from pandas import DataFrame, DatetimeIndex, Index, MultiIndex
 from collections.abc import Iterable
 
+from .metrics import metrics
+
+
+class Panel:
+    """
+    Per-symbol data aligned onto the sorted union of their dates.
+
+    The data is held in one dense float64 buffer laid out as (time, symbol, field),
+    so the long format frame (date x symbol rows) and the (symbol, time, field) view
+    are both built without copying. Bars missing for a symbol are NaN.
+    """
+    __slots__ = ("_symbols", "_fields", "_dates", "_alignment", "_buffer", "_positions", "_dtypes", "_frame")
+
+    def __init__(self, df_: Iterable[DataFrame], symbols: Iterable[str]):
+        """
+        :param df_: data of every symbol (indexed by date)
+        :param symbols: symbols (in the order of `df_`)
+        """
+        # imported here, arcana.price_data imports this module
+        from arcana.price_data.align import Alignment
+
+        df_ = list(df_)
+        self._symbols = list(symbols)
+        if len(self._symbols) != len(df_):
+            raise ValueError(f"{len(self._symbols)} symbols != {len(df_)} DataFrames.")
+
+        self._fields = []
+        for df in df_:
+            self._fields.extend(col for col in df.columns if col != PriceDataColumns.SYMBOL and col not in self._fields)
+
+        for symbol, df in zip(self._symbols, df_):
+            if not df.index.is_unique:
+                raise ValueError(f"Dates of {symbol} should be unique.")
+        self._alignment = Alignment.from_frames(df_, self._symbols)
+        aligned = self._alignment.aligned
+        grid = self._alignment.grid
+        self._positions = [None if aligned else pos for pos in self._alignment.positions]
+        self._dates = self._alignment.dates
+
+        self._buffer = np.full((len(grid), len(self._symbols), len(self._fields)), np.nan, dtype=np.float64)
+        for i, (df, pos) in enumerate(zip(df_, self._positions)):
+            columns = [j for j, field in enumerate(self._fields) if field in df.columns]
+            values = df[[self._fields[j] for j in columns]].to_numpy(dtype=np.float64)
+            if len(columns) == len(self._fields):
+                if pos is None:
+                    self._buffer[:, i, :] = values
+                else:
+                    self._buffer[pos, i, :] = values
+            else:
+                for k, j in enumerate(columns):
+                    self._buffer[slice(None) if pos is None else pos, i, j] = values[:, k]
+
+        # without gaps the original (e.g. integer) dtypes can be kept in the long frame
+        self._dtypes = dict()
+        if aligned:
+            for field in self._fields:
+                dtypes = {df[field].dtype for df in df_ if field in df.columns}
+                if len(dtypes) == 1 and all(field in df.columns for df in df_):
+                    dtype, = dtypes
+                    if dtype != np.float64:
+                        self._dtypes[field] = dtype
+        self._frame = None
+
+    @property
+    def symbols(self) -> list[str]:
+        return self._symbols
+
+    @property
+    def fields(self) -> list[str]:
+        return self._fields
+
+    @property
+    def dates(self) -> DatetimeIndex:
+        """Return the union of dates of all symbols (sorted)."""
+        return self._dates
+
+    @property
+    def alignment(self) -> "Alignment":
+        """Return the alignment of the symbols (index maps and gaps)."""
+        return self._alignment
+
+    @property
+    def values(self) -> ndarray:
+        """Return the dense (symbol, time, field) view of the data."""
+        return self._buffer.transpose(1, 0, 2)
+
+    @property
+    def positions(self) -> list[ndarray | None]:
+        """Return the positions of every symbol's bars in `dates` (None if the symbol has every date)."""
+        return self._positions
+
+    def field(self, field: str) -> ndarray:
+        """Return the (symbol, time) view of a single field."""
+        return self._buffer[:, :, self._fields.index(field)].T
+
+    def to_frame(self) -> DataFrame:
+        """Return the long format frame indexed by (date, symbol), built once and cached."""
+        if self._frame is None:
+            n_dates, n_symbols = len(self._dates), len(self._symbols)
+            index = MultiIndex(
+                levels=[self._dates, Index(self._symbols)],
+                codes=[np.repeat(np.arange(n_dates), n_symbols), np.tile(np.arange(n_symbols), n_dates)],
+                names=[self._dates.name, None],
+                verify_integrity=False,
+            )
+            frame = DataFrame(self._buffer.reshape(n_dates * n_symbols, len(self._fields)), index=index,
+                              columns=Index(self._fields, dtype=object), copy=False)
+            self._frame = frame.astype(self._dtypes) if self._dtypes else frame
+        return self._frame
+
 
 def stack_data(df_: Iterable[DataFrame], symbols: Iterable[str]) -> DataFrame:
-    data = concat(df_, keys=symbols, axis=1)
-    data = data.swaplevel(axis=1)
-    data = data.stack(future_stack=True)
-    if PriceDataColumns.SYMBOL in data.columns:
-        data = data.drop(columns=PriceDataColumns.SYMBOL)
+    with metrics.stage("stack") as stage:
+        data = Panel(df_, symbols).to_frame()
+        if stage:
+            stage.add(rows=len(data), nbytes=int(data.memory_usage(index=True).sum()))
     return data
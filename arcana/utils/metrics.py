@@ -0,0 +1,187 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter
+
+
+class _NullStage:
+    """Stage used while the metrics are disabled: records nothing."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __bool__(self):
+        return False
+
+    def add(self, *, rows: int = 0, nbytes: int = 0):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """A timed pipeline stage, recorded on exit."""
+    __slots__ = ("_metrics", "_key", "_rows", "_nbytes", "_start")
+
+    def __init__(self, metrics: "Metrics", key: tuple[str, str, str], rows: int, nbytes: int):
+        self._metrics = metrics
+        self._key = key
+        self._rows = rows
+        self._nbytes = nbytes
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._metrics._record(self._key, perf_counter() - self._start, self._rows, self._nbytes)
+        return False
+
+    def __bool__(self):
+        return True
+
+    def add(self, *, rows: int = 0, nbytes: int = 0):
+        """Add processed rows and allocated bytes to the stage."""
+        self._rows += rows
+        self._nbytes += nbytes
+
+
+class Metrics:
+    """
+    Opt-in instrumentation of the pipeline stages.
+
+    Every stage (e.g. "load.fetch", "indicator.kernel", "stack") records its wall time,
+    the number of calls, the rows it processed and the bytes of the arrays/frames it allocated,
+    keyed by stage, symbol and indicator. While disabled, `stage` returns a shared no-op
+    object, so instrumented code pays a single attribute check.
+    """
+    __slots__ = ("_enabled", "_per_symbol", "_stats", "_lock")
+
+    def __init__(self):
+        self._enabled = False
+        self._per_symbol = True
+        self._stats: dict[tuple[str, str, str], list] = dict()
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def enable(self, *, per_symbol: bool = True):
+        """
+        Start recording.
+
+        :param per_symbol: keep a separate record for every symbol. default is True
+        """
+        self._per_symbol = per_symbol
+        self._enabled = True
+
+    def disable(self):
+        """Stop recording (recorded metrics are kept)."""
+        self._enabled = False
+
+    def reset(self):
+        """Remove all recorded metrics."""
+        with self._lock:
+            self._stats.clear()
+
+    def stage(self, name: str, *, symbol: str = None, indicator: str = None, rows: int = 0, nbytes: int = 0) -> _Stage | _NullStage:
+        """
+        Return the context manager timing a stage.
+
+        :param name: stage name
+        :param symbol: symbol being processed. default is None (not symbol specific)
+        :param indicator: indicator being computed. default is None (not indicator specific)
+        :param rows: processed rows (more can be added with `add`). default is 0
+        :param nbytes: allocated bytes (more can be added with `add`). default is 0
+        """
+        if not self._enabled:
+            return _NULL_STAGE
+        key = (name, (symbol or "") if self._per_symbol else "", indicator or "")
+        return _Stage(self, key, rows, nbytes)
+
+    def _record(self, key: tuple[str, str, str], seconds: float, rows: int, nbytes: int):
+        with self._lock:
+            stat = self._stats.get(key)
+            if stat is None:
+                self._stats[key] = [1, seconds, rows, nbytes]
+            else:
+                stat[0] += 1
+                stat[1] += seconds
+                stat[2] += rows
+                stat[3] += nbytes
+
+    def snapshot(self) -> list[dict]:
+        """Return the recorded metrics (one record per stage, symbol and indicator)."""
+        with self._lock:
+            items = [(key, list(stat)) for key, stat in self._stats.items()]
+        return [
+            {"stage": stage, "symbol": symbol, "indicator": indicator, "calls": calls, "seconds": seconds, "rows": rows, "bytes": nbytes}
+            for (stage, symbol, indicator), (calls, seconds, rows, nbytes) in items
+        ]
+
+    def summary(self) -> dict[str, dict]:
+        """Return the recorded metrics aggregated by stage."""
+        res = dict()
+        for record in self.snapshot():
+            stage = res.setdefault(record["stage"], {"calls": 0, "seconds": 0.0, "rows": 0, "bytes": 0})
+            for field in stage:
+                stage[field] += record[field]
+        return res
+
+    def to_prometheus(self, prefix: str = "arcana") -> str:
+        """
+        Return the recorded metrics in the Prometheus text exposition format.
+
+        :param prefix: prefix of the metric names. default is "arcana"
+        """
+        metrics = (
+            ("stage_calls_total", "Number of stage calls.", "calls"),
+            ("stage_seconds_total", "Wall time spent in the stage.", "seconds"),
+            ("stage_rows_total", "Rows processed by the stage.", "rows"),
+            ("stage_bytes_total", "Bytes allocated by the stage.", "bytes"),
+        )
+        records = self.snapshot()
+        lines = []
+        for name, help_, field in metrics:
+            lines.append(f"# HELP {prefix}_{name} {help_}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for record in records:
+                labels = ",".join(
+                    f'{label}="{_escape(record[label])}"' for label in ("stage", "symbol", "indicator") if record[label]
+                )
+                lines.append(f"{prefix}_{name}{{{labels}}} {record[field]}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+metrics = Metrics()
+
+
+@contextmanager
+def collect_metrics(*, per_symbol: bool = True, reset: bool = True) -> Iterator[Metrics]:
+    """
+    Record the metrics of the enclosed code.
+
+    :param per_symbol: keep a separate record for every symbol. default is True
+    :param reset: remove previously recorded metrics. default is True
+    :return: the process-wide metrics
+    """
+    was_enabled = metrics.enabled
+    if reset:
+        metrics.reset()
+    metrics.enable(per_symbol=per_symbol)
+    try:
+        yield metrics
+    finally:
+        if not was_enabled:
+            metrics.disable()
@@ -0,0 +1,78 @@
+"""
+Compare two benchmark reports of `benchmarks.run`.
+
+Usage (from the repository root):
+
+    python -m benchmarks.compare base.json new.json --threshold 0.1
+
+Benchmarks slower than the base by more than `threshold` (relative, best times),
+and kernels whose period slope grew above `--max-period-slope`, are reported
+as regressions and the exit code is 1.
+"""
+import argparse
+import json
+import sys
+
+
+def _key(res: dict) -> tuple:
+    return res["suite"], res["name"], res["variant"], json.dumps(res["params"], sort_keys=True)
+
+
+def compare(base: dict, new: dict, *, threshold: float, max_period_slope: float) -> tuple[list[str], list[str]]:
+    """
+    Compare two reports.
+
+    :param base: the base report
+    :param new: the new report
+    :param threshold: allowed relative slowdown
+    :param max_period_slope: allowed log-log slope of the time over the period
+    :return: lines of the comparison and the regressions
+    """
+    base_results = {_key(res): res for res in base["results"]}
+    lines, regressions = [], []
+    for res in new["results"]:
+        key = _key(res)
+        old = base_results.get(key)
+        label = f"{res['suite']}/{res['name']}/{res['variant']}"
+        if "best" in res:
+            if old is None:
+                lines.append(f"{label:<50} {res['best'] * 1e3:>12.4f} ms (new)")
+                continue
+            ratio = res["best"] / old["best"]
+            line = f"{label:<50} {old['best'] * 1e3:>12.4f} ms -> {res['best'] * 1e3:>12.4f} ms  x{ratio:.3f}"
+            lines.append(line)
+            if ratio > 1.0 + threshold:
+                regressions.append(line)
+        else:
+            line = f"{label:<50} period slope {res['period_slope']:.2f}"
+            if old is not None:
+                line += f" (was {old['period_slope']:.2f})"
+            lines.append(line)
+            if res["period_slope"] > max_period_slope and (old is None or old["period_slope"] <= max_period_slope):
+                regressions.append(line)
+    return lines, regressions
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base", help="base JSON report")
+    parser.add_argument("new", help="new JSON report")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed relative slowdown")
+    parser.add_argument("--max-period-slope", type=float, default=0.5, help="allowed time over period log-log slope")
+    args = parser.parse_args(argv)
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    lines, regressions = compare(base, new, threshold=args.threshold, max_period_slope=args.max_period_slope)
+    print("\n".join(lines))
+    if regressions:
+        print(f"\n{len(regressions)} regression(s):")
+        print("\n".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
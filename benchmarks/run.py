@@ -0,0 +1,270 @@
+"""
+Offline benchmark suite of the indicator kernels and of the Python driver layer.
+
+Usage (from the repository root):
+
+    python -m benchmarks.run --bars 100000 --symbols 50 --output bench.json
+    python -m benchmarks.compare base.json bench.json
+
+Suites:
+    kernels    every `ma_lib` kernel called directly (single, float32, batched and grid variants)
+    scaling    single kernels over a range of periods and of lengths, with the fitted log-log slope
+               (a period slope close to 1 flags an O(n * period) kernel)
+    compute    `compute` and `compute_batch` of every moving average (DataFrames in, DataFrames out)
+    stack      `stack_data` over the whole universe
+    normalize  the loaders' normalization of raw TradingView and CCXT data
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import timeit
+from datetime import datetime, timezone
+from os import cpu_count
+
+import numpy as np
+import pandas as pd
+
+from arcana.indicators import (SMA, ESMA, EMA, WMA, RMA, HMA, FRAMA, TEMA, DEMA, KAMA, SMACfg, ESMACfg, EMACfg, WMACfg,
+                               RMACfg, HMACfg, FRAMACfg, TEMACfg, DEMACfg, KAMACfg)
+from arcana.indicators.adapters import ma_prepare_data_to_c, ma_stack_rows
+from arcana.indicators.c_definitions import ma_lib
+from arcana.price_data.dev_types import PriceDataColumns
+from arcana.price_data.loader import _normalize_columns, _create_df_from_raw_array
+from arcana.utils.df_utils import stack_data
+from .synthetic import synthetic_ohlcv, synthetic_tv_frame, synthetic_ccxt_rows
+
+SUITES = ("kernels", "scaling", "compute", "stack", "normalize")
+
+# kernel name -> extra arguments: float arrays (taken from the OHLCV data), ints and doubles
+KERNELS = {
+    "sma": {},
+    "esma": {"to_d": [0.1]},
+    "ema": {},
+    "wma": {},
+    "hma": {},
+    "rma": {},
+    "tema": {},
+    "dema": {},
+    "kama": {"to_i": [2, 30]},
+    "frama": {"ptr": [PriceDataColumns.HIGH, PriceDataColumns.LOW]},
+}
+GRID_KERNELS = ("sma", "ema", "wma", "rma", "dema", "tema")
+
+INDICATORS = (
+    (SMA, SMACfg, {}),
+    (ESMA, ESMACfg, {"alpha": 0.1}),
+    (EMA, EMACfg, {}),
+    (WMA, WMACfg, {}),
+    (RMA, RMACfg, {}),
+    (HMA, HMACfg, {}),
+    (TEMA, TEMACfg, {}),
+    (DEMA, DEMACfg, {}),
+    (KAMA, KAMACfg, {"n_fast": 2, "n_slow": 30}),
+    (FRAMA, FRAMACfg, {}),
+)
+
+
+def measure(fn, *, repeat: int) -> dict:
+    """
+    Time a callable.
+
+    The number of calls per measurement is calibrated to last at least 0.2 s,
+    the best and the median of `repeat` measurements are reported (seconds per call).
+    """
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {"best": min(times), "median": statistics.median(times), "number": number, "repeat": repeat}
+
+
+def _kernel_args(name: str, df: pd.DataFrame, period: int, dtype=np.float64) -> tuple:
+    """Return the kernel function and its converted arguments (the output array included)."""
+    spec = KERNELS[name]
+    ptr = "to_f_ptr" if dtype == np.float32 else "to_d_ptr"
+    data = df[PriceDataColumns.CLOSE].to_numpy(dtype=dtype)
+    arrays = [data, np.zeros_like(data)] + [df[col].to_numpy(dtype=dtype) for col in spec.get("ptr", [])]
+    data_to_prepare = {ptr: arrays, "to_i": [len(data), period, *spec.get("to_i", [])]}
+    if "to_d" in spec:
+        data_to_prepare["to_d"] = spec["to_d"]
+    fn = getattr(ma_lib, name if dtype == np.float64 else f"{name}_f32")
+    # the arrays are returned as well, they must outlive the pointers
+    return fn, ma_prepare_data_to_c(**data_to_prepare), arrays
+
+
+def _batch_args(name: str, df_list: list[pd.DataFrame], period: int) -> tuple:
+    spec = KERNELS[name]
+    data, lens = ma_stack_rows(df[PriceDataColumns.CLOSE].to_numpy(dtype=np.float64) for df in df_list)
+    arrays = [data, np.zeros_like(data)]
+    arrays += [ma_stack_rows(df[col].to_numpy(dtype=np.float64) for df in df_list)[0] for col in spec.get("ptr", [])]
+    data_to_prepare = {"to_d_ptr": arrays, "to_i_ptr": [lens], "to_i": [*data.shape, period, *spec.get("to_i", [])]}
+    if "to_d" in spec:
+        data_to_prepare["to_d"] = spec["to_d"]
+    return getattr(ma_lib, f"{name}_batch"), ma_prepare_data_to_c(**data_to_prepare), arrays + [lens]
+
+
+def bench_kernels(df_list: list[pd.DataFrame], *, period: int, grid: tuple[int], repeat: int) -> list[dict]:
+    df = df_list[0]
+    n_bars = len(df)
+    results = []
+    for name in KERNELS:
+        for dtype, variant in ((np.float64, "single"), (np.float32, "single_f32")):
+            fn, args, _arrays = _kernel_args(name, df, period, dtype)
+            res = measure(lambda: fn(*args), repeat=repeat)
+            results.append({"suite": "kernels", "name": name, "variant": variant, "params": {"bars": n_bars, "period": period}, **res,
+                            "ns_per_bar": 1e9 * res["best"] / n_bars})
+
+        fn, args, _arrays = _batch_args(name, df_list, period)
+        res = measure(lambda: fn(*args), repeat=repeat)
+        n_total = sum(len(df) for df in df_list)
+        results.append({"suite": "kernels", "name": name, "variant": "batch",
+                        "params": {"bars": n_bars, "symbols": len(df_list), "period": period}, **res, "ns_per_bar": 1e9 * res["best"] / n_total})
+
+    data = df[PriceDataColumns.CLOSE].to_numpy(dtype=np.float64)
+    periods = np.asarray(grid, dtype=np.intc)
+    out = np.zeros((n_bars, len(periods)), dtype=np.float64)
+    args = ma_prepare_data_to_c(to_d_ptr=[data, out], to_i_ptr=[periods], to_i=[n_bars, len(periods)])
+    for name in GRID_KERNELS:
+        fn = getattr(ma_lib, f"{name}_grid")
+        res = measure(lambda: fn(*args), repeat=repeat)
+        results.append({"suite": "kernels", "name": name, "variant": "grid", "params": {"bars": n_bars, "periods": list(grid)}, **res,
+                        "ns_per_bar": 1e9 * res["best"] / (n_bars * len(periods))})
+    return results
+
+
+def _slope(x: list[int], y: list[float]) -> float:
+    """Return the slope of log(y) over log(x)."""
+    return float(np.polyfit(np.log(x), np.log(y), 1)[0])
+
+
+def bench_scaling(*, periods: tuple[int], lengths: tuple[int], period: int, n_bars: int, repeat: int, seed: int) -> list[dict]:
+    long_df, = synthetic_ohlcv(max(max(lengths), n_bars), seed=seed)
+    results = []
+    for name in KERNELS:
+        by_period = []
+        df = long_df.iloc[:n_bars]
+        for p in periods:
+            fn, args, _arrays = _kernel_args(name, df, p)
+            by_period.append(measure(lambda: fn(*args), repeat=repeat)["best"])
+
+        by_length = []
+        for length in lengths:
+            fn, args, _arrays = _kernel_args(name, long_df.iloc[:length], period)
+            by_length.append(measure(lambda: fn(*args), repeat=repeat)["best"])
+
+        results.append({
+            "suite": "scaling", "name": name, "variant": "single",
+            "params": {"bars": n_bars, "periods": list(periods), "period": period, "lengths": list(lengths)},
+            "by_period": by_period, "by_length": by_length,
+            "period_slope": _slope(periods, by_period), "length_slope": _slope(lengths, by_length),
+        })
+    return results
+
+
+def bench_compute(df_list: list[pd.DataFrame], *, period: int, repeat: int) -> list[dict]:
+    n_total = sum(len(df) for df in df_list)
+    results = []
+    for indicator, cfg, kwargs in INDICATORS:
+        ma_cfg = cfg(user_name=f"bench_{indicator.name()}", src="close", period=period, **kwargs)
+        for variant, compute in (("compute", indicator.compute), ("compute_batch", indicator.compute_batch)):
+            res = measure(lambda: compute(df_list, ma_cfg=ma_cfg, register=False), repeat=repeat)
+            results.append({"suite": "compute", "name": indicator.name(), "variant": variant,
+                            "params": {"bars": len(df_list[0]), "symbols": len(df_list), "period": period}, **res,
+                            "ns_per_bar": 1e9 * res["best"] / n_total})
+    return results
+
+
+def bench_stack(df_list: list[pd.DataFrame], *, repeat: int) -> list[dict]:
+    symbols = [df[PriceDataColumns.SYMBOL].iloc[0] for df in df_list]
+    res = measure(lambda: stack_data(df_list, symbols), repeat=repeat)
+    n_total = sum(len(df) for df in df_list)
+    return [{"suite": "stack", "name": "stack_data", "variant": "prices",
+             "params": {"bars": len(df_list[0]), "symbols": len(df_list)}, **res, "ns_per_bar": 1e9 * res["best"] / n_total}]
+
+
+def bench_normalize(df_list: list[pd.DataFrame], *, repeat: int) -> list[dict]:
+    df = df_list[0]
+    symbol = df[PriceDataColumns.SYMBOL].iloc[0]
+    tv_frame = synthetic_tv_frame(df)
+    rows = synthetic_ccxt_rows(df)
+    results = []
+    for name, fn in (("_normalize_columns", lambda: _normalize_columns(tv_frame)),
+                     ("_create_df_from_raw_array", lambda: _create_df_from_raw_array(rows, symbol))):
+        res = measure(fn, repeat=repeat)
+        results.append({"suite": "normalize", "name": name, "variant": "single", "params": {"bars": len(df)}, **res,
+                        "ns_per_bar": 1e9 * res["best"] / len(df)})
+    return results
+
+
+def run(*, bars: int, symbols: int, period: int, periods: tuple[int], lengths: tuple[int], grid: tuple[int],
+        suites: tuple[str], repeat: int, seed: int) -> dict:
+    """Run the selected suites and return the report."""
+    df_list = synthetic_ohlcv(bars, symbols, seed=seed)
+    results = []
+    for suite in suites:
+        print(f"running {suite}...", file=sys.stderr)
+        if suite == "kernels":
+            results += bench_kernels(df_list, period=period, grid=grid, repeat=repeat)
+        elif suite == "scaling":
+            results += bench_scaling(periods=periods, lengths=lengths, period=period, n_bars=bars, repeat=repeat, seed=seed)
+        elif suite == "compute":
+            results += bench_compute(df_list, period=period, repeat=repeat)
+        elif suite == "stack":
+            results += bench_stack(df_list, repeat=repeat)
+        elif suite == "normalize":
+            results += bench_normalize(df_list, repeat=repeat)
+        else:
+            raise ValueError(f"{suite} is not a valid suite. Use {list(SUITES)}")
+
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": cpu_count(),
+            "config": {"bars": bars, "symbols": symbols, "period": period, "periods": list(periods), "lengths": list(lengths),
+                       "grid": list(grid), "suites": list(suites), "repeat": repeat, "seed": seed},
+        },
+        "results": results,
+    }
+
+
+def _ints(v: str) -> tuple[int]:
+    return tuple(int(x) for x in v.split(","))
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bars", type=int, default=100_000, help="bars of every symbol")
+    parser.add_argument("--symbols", type=int, default=20, help="number of symbols")
+    parser.add_argument("--period", type=int, default=20, help="period of the kernels and indicators")
+    parser.add_argument("--periods", type=_ints, default=(5, 20, 100, 500), help="periods of the scaling curve (comma separated)")
+    parser.add_argument("--lengths", type=_ints, default=(10_000, 100_000, 1_000_000), help="lengths of the scaling curve (comma separated)")
+    parser.add_argument("--grid", type=_ints, default=tuple(range(5, 205, 5)), help="periods of the grid kernels (comma separated)")
+    parser.add_argument("--suites", type=lambda v: tuple(v.split(",")), default=SUITES, help=f"suites to run, any of {','.join(SUITES)}")
+    parser.add_argument("--repeat", type=int, default=5, help="measurements per benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic data")
+    parser.add_argument("--output", default=None, help="JSON report path (printed to stdout if not given)")
+    args = parser.parse_args(argv)
+
+    report = run(bars=args.bars, symbols=args.symbols, period=args.period, periods=args.periods, lengths=args.lengths,
+                 grid=args.grid, suites=args.suites, repeat=args.repeat, seed=args.seed)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+        for res in report["results"]:
+            if "best" in res:
+                print(f"{res['suite']:<10}{res['name']:<28}{res['variant']:<15}{res['best'] * 1e3:>12.4f} ms{res['ns_per_bar']:>12.2f} ns/bar")
+            else:
+                print(f"{res['suite']:<10}{res['name']:<28}{res['variant']:<15}period slope {res['period_slope']:>6.2f}  length slope {res['length_slope']:>6.2f}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Synthetic OHLCV data for offline benchmarks.
+"""
+import numpy as np
+from pandas import DataFrame, date_range
+
+from arcana.price_data.dev_types import PriceDataColumns
+
+
+def synthetic_ohlcv(n_bars: int, n_symbols: int = 1, *, seed: int = 0, freq: str = "min",
+                    start: str = "2020-01-01") -> list[DataFrame]:
+    """
+    Generate OHLCV data shaped like the output of the loaders (one DataFrame per symbol).
+
+    Closes follow a geometric random walk, highs and lows wrap the open/close range.
+
+    :param n_bars: number of bars of every symbol
+    :param n_symbols: number of symbols. default is 1
+    :param seed: random seed. default is 0
+    :param freq: bar frequency. default is "min"
+    :param start: date of the first bar. default is "2020-01-01"
+    :return: list of OHLCV DataFrames
+    """
+    rng = np.random.default_rng(seed)
+    index = date_range(start, periods=n_bars, freq=freq, name=PriceDataColumns.DATE)
+    df_ = []
+    for i in range(n_symbols):
+        close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 1e-3, n_bars)))
+        open_ = np.empty_like(close)
+        open_[0] = close[0]
+        open_[1:] = close[:-1]
+        spread = np.abs(rng.normal(0.0, 5e-4, (2, n_bars))) * close
+        df = DataFrame({
+            PriceDataColumns.SYMBOL: f"SYNTH:S{i:04d}",
+            PriceDataColumns.OPEN: open_,
+            PriceDataColumns.HIGH: np.maximum(open_, close) + spread[0],
+            PriceDataColumns.LOW: np.minimum(open_, close) - spread[1],
+            PriceDataColumns.CLOSE: close,
+            PriceDataColumns.VOLUME: rng.lognormal(10.0, 1.0, n_bars),
+        }, index=index)
+        df_.append(df)
+    return df_
+
+
+def synthetic_tv_frame(df: DataFrame) -> DataFrame:
+    """Return the data laid out like `TvDatafeed.get_hist` output (index named "datetime")."""
+    return df.rename_axis("datetime")
+
+
+def synthetic_ccxt_rows(df: DataFrame) -> list[list]:
+    """Return the data laid out like `fetch_ohlcv` output (rows of ms timestamp and OHLCV)."""
+    columns = [PriceDataColumns.OPEN, PriceDataColumns.HIGH, PriceDataColumns.LOW, PriceDataColumns.CLOSE, PriceDataColumns.VOLUME]
+    timestamps = df.index.as_unit("ms").asi8
+    return [[ts, *row] for ts, row in zip(timestamps.tolist(), df[columns].to_numpy().tolist())]
@@ -0,0 +1,89 @@
+import importlib.util
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+C_DEFINITIONS = Path(__file__).parents[1] / "arcana" / "indicators" / "c_definitions"
+
+
+def pytest_configure(config):
+    """Build the C library from the current sources, unless ARCANA_MA_LIB points to one."""
+    if os.environ.get("ARCANA_MA_LIB"):
+        return
+    # build.py is loaded by path, importing arcana.indicators needs the library
+    spec = importlib.util.spec_from_file_location("_arcana_build", C_DEFINITIONS / "build.py")
+    build = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(build)
+    output = Path(tempfile.mkdtemp(prefix="arcana_ma_")) / build.library_name()
+    os.environ["ARCANA_MA_LIB"] = str(build.build(output))
+
+
+def _make_prices(symbol: str, n: int, *, freq: str = "h", start: str = "2024-01-01", seed: int = 0, tz: str = None) -> pd.DataFrame:
+    """Return a random walk of OHLCV bars of the symbol, indexed by date."""
+    rng = np.random.default_rng(seed)
+    close = 100.0 + np.cumsum(rng.normal(size=n))
+    open_ = np.r_[close[:1], close[:-1]]
+    high = np.maximum(open_, close) + rng.random(n)
+    low = np.minimum(open_, close) - rng.random(n)
+    index = pd.date_range(start, periods=n, freq=freq, name="date", tz=tz)
+    return pd.DataFrame({"symbol": symbol, "open": open_, "high": high, "low": low, "close": close,
+                         "volume": rng.integers(1, 100, n).astype(np.float64)}, index=index)
+
+
+class FakeExchange:
+    """
+    In-memory CCXT exchange: hourly (or minute) candles of every market from `START`,
+    with a candle missing every `GAP` candles. Every request is recorded.
+    """
+    START = 1_704_067_200_000  # 2024-01-01 UTC
+    GAP = 97
+    rateLimit = 1
+    timeframes = {"1m": "1m", "1h": "1h"}
+    markets = {"BTC/USDT": {}, "ETH/USDT": {}, "SOL/USDT": {}}
+    failures = 0
+
+    def __init__(self, exchange_id: str):
+        self.exchange_id = exchange_id
+        self.requests = []
+
+    def load_markets(self, reload: bool = False) -> dict:
+        return self.markets
+
+    def set_markets(self, markets: dict):
+        pass
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str, limit: int, since: int = None) -> list[list]:
+        self.requests.append((symbol, since))
+        if type(self).failures:
+            type(self).failures -= 1
+            import ccxt
+            raise ccxt.NetworkError("connection reset")
+        step = 60_000 if timeframe == "1m" else 3_600_000
+        if since is None:
+            since = self.START + 1000 * step - limit * step
+        first = max(since, self.START)
+        first += -(first - self.START) % step
+        dates = np.arange(first, first + limit * step, step)
+        dates = dates[(dates - self.START) // step % self.GAP != self.GAP - 1]
+        price = dates / 1e9 + len(symbol)
+        return [[int(t), p, p + 1.0, p - 1.0, p, 1.0] for t, p in zip(dates, price)]
+
+
+@pytest.fixture
+def make_prices():
+    """Return the factory of random OHLCV bars, `make_prices(symbol, n, *, freq, start, seed, tz)`."""
+    return _make_prices
+
+
+@pytest.fixture
+def fake_exchange():
+    """Return a fresh FakeExchange class (pooled clients are keyed by their factory)."""
+    from arcana.price_data.clients import client_pool
+
+    exchange = type("FakeExchange", (FakeExchange,), {"failures": 0})
+    yield exchange
+    client_pool.clear()
@@ -0,0 +1,53 @@
+from math import ceil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from arcana.price_data import CCTXCfg, CCTXLoader
+from arcana.price_data.clients import client_pool
+
+HOUR = 3_600_000
+
+
+def _expected_dates(fake_exchange, since: int, until: int, step: int) -> np.ndarray:
+    dates = np.arange(since, until, step)
+    return dates[(dates - fake_exchange.START) // step % fake_exchange.GAP != fake_exchange.GAP - 1]
+
+
+@pytest.mark.parametrize("limit", [7, 100, 1000])
+def test_windows_are_stitched(fake_exchange, limit):
+    since, until = pd.Timestamp("2024-01-03 05:00"), pd.Timestamp("2024-02-11 17:00")
+    cfg = CCTXCfg(interval="1h", symbols=["BINANCE:BTCUSDT", "BYBIT:ETHUSDT"], limit=limit, since=since, until=until,
+                  rate=1e6, burst=100)
+    frames = CCTXLoader(exchange_factory=fake_exchange).loader().load(cfg)
+
+    expected = _expected_dates(fake_exchange, since.value // 10**6, until.value // 10**6, HOUR)
+    n_windows = ceil((until - since) / pd.Timedelta(hours=1) / limit)
+    for df, exchange_id in zip(frames, ["BINANCE", "BYBIT"]):
+        # no duplicates, no gaps besides the missing candles of the exchange
+        np.testing.assert_array_equal(df.index.asi8 // 10**6, expected)
+        assert len(client_pool.exchange(exchange_id, fake_exchange).requests) == n_windows
+
+
+def test_windows_start_at_since(fake_exchange):
+    since = pd.Timestamp("2024-01-05").value // 10**6
+    cfg = CCTXCfg(interval="1m", symbols=["BINANCE:BTCUSDT"], limit=500, since=since, until=since + 2000 * 60_000,
+                  rate=1e6, burst=100)
+    df = CCTXLoader(exchange_factory=fake_exchange).loader().load(cfg)[0]
+
+    requests = client_pool.exchange("BINANCE", fake_exchange).requests
+    assert sorted(start for _, start in requests) == [since + i * 500 * 60_000 for i in range(4)]
+    np.testing.assert_array_equal(df.index.asi8 // 10**6, _expected_dates(fake_exchange, since, since + 2000 * 60_000, 60_000))
+
+
+def test_limit_is_a_single_request():
+    # longer ranges are backfilled in windows, a request is at most 1000 candles
+    assert CCTXCfg(interval="1h", symbols=["BINANCE:BTCUSDT"], limit=5000).limit == 1000
+    with pytest.raises(ValueError):
+        CCTXCfg(interval="1h", symbols=["BINANCE:BTCUSDT"], limit=0)
+
+
+def test_until_requires_since():
+    with pytest.raises(ValueError):
+        CCTXCfg(interval="1h", symbols=["BINANCE:BTCUSDT"], limit=100, until="2024-01-05")
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from arcana.indicators import (SMA, ESMA, EMA, WMA, RMA, HMA, FRAMA, TEMA, DEMA, KAMA, SMACfg, ESMACfg, EMACfg, WMACfg,
+                               RMACfg, HMACfg, FRAMACfg, TEMACfg, DEMACfg, KAMACfg)
+
+MOVING_AVERAGES = [
+    (SMA, SMACfg, {}),
+    (ESMA, ESMACfg, {"alpha": 0.3}),
+    (EMA, EMACfg, {}),
+    (WMA, WMACfg, {}),
+    (RMA, RMACfg, {}),
+    (HMA, HMACfg, {}),
+    (TEMA, TEMACfg, {}),
+    (DEMA, DEMACfg, {}),
+    (KAMA, KAMACfg, {"n_fast": 2, "n_slow": 30}),
+    (FRAMA, FRAMACfg, {}),
+]
+
+
+@pytest.fixture
+def prices(make_prices):
+    # symbols of different lengths, so the batch rows are padded
+    return [make_prices("BINANCE:BTCUSDT", 500, seed=1), make_prices("BINANCE:ETHUSDT", 333, seed=2),
+            make_prices("BYBIT:SOLUSDT", 20, seed=3)]
+
+
+@pytest.mark.parametrize("indicator, cfg, kwargs", MOVING_AVERAGES, ids=[ma[0].name() for ma in MOVING_AVERAGES])
+@pytest.mark.parametrize("precision", ["float64", "float32"])
+def test_batch_equals_per_symbol(prices, indicator, cfg, kwargs, precision):
+    ma_cfg = cfg(user_name="ma", src="close", period=14, precision=precision, **kwargs)
+    single = indicator.compute(prices, ma_cfg=ma_cfg, register=False)
+    batch = indicator.compute_batch(prices, ma_cfg=ma_cfg, register=False)
+
+    assert len(batch) == len(prices)
+    for res, ref in zip(batch, single):
+        pd.testing.assert_frame_equal(res, ref)
+        assert res["ma"].dtype == np.dtype(precision)
+
+
+def test_batch_columnar_equals_frames(prices):
+    ma_cfg = SMACfg(user_name="sma", src="close", period=10)
+    frames = SMA.compute_batch(prices, ma_cfg=ma_cfg, register=False)
+    columnar = SMA.compute_batch(prices, ma_cfg=ma_cfg, register=False, columnar=True)
+
+    for res, ref in zip(columnar.to_frames(), frames):
+        np.testing.assert_array_equal(res["sma"].to_numpy(), ref["sma"].to_numpy())
+
+
+def test_batch_period_longer_than_a_symbol(prices):
+    ma_cfg = SMACfg(user_name="sma", src="close", period=50)
+    single = SMA.compute(prices, ma_cfg=ma_cfg, register=False)
+    batch = SMA.compute_batch(prices, ma_cfg=ma_cfg, register=False)
+
+    pd.testing.assert_frame_equal(batch[2], single[2])
@@ -0,0 +1,66 @@
+import attrs
+import numpy as np
+import pytest
+
+from arcana.price_data import CSVCfg, CSVLoader, OHLCVStore
+
+SYMBOLS = ["BINANCE:BTCUSDT", "BINANCE:ETHUSDT", "BYBIT:SOLUSDT"]
+
+
+@pytest.fixture
+def csv_folder(tmp_path, make_prices):
+    for seed, symbol in enumerate(SYMBOLS):
+        df = make_prices(symbol, 300, seed=seed).drop(columns="symbol")
+        df.to_csv(tmp_path / f"{symbol.replace(':', '_')}.csv")
+    (tmp_path / "notes.txt").write_text("not a csv file")
+    return tmp_path
+
+
+def test_path_is_resolved_to_files(csv_folder):
+    cfg = CSVCfg(path=csv_folder, symbols=SYMBOLS, interval="1h")
+
+    assert cfg.path == sorted(csv_folder.glob("*.csv"))
+
+
+def test_path_of_files_and_folders(csv_folder, tmp_path_factory):
+    other = tmp_path_factory.mktemp("other")
+    (other / "OKX_BTCUSDT.csv").write_text((csv_folder / "BINANCE_BTCUSDT.csv").read_text())
+    files = sorted(csv_folder.glob("*.csv"))
+    cfg = CSVCfg(path=[str(files[0]), other, files[0]], symbols=SYMBOLS[:1], interval="1h")
+
+    assert cfg.path == [files[0], other / "OKX_BTCUSDT.csv"]
+
+
+def test_evolve_keeps_the_files(csv_folder):
+    cfg = CSVCfg(path=str(csv_folder), symbols=SYMBOLS, interval="1h")
+    evolved = attrs.evolve(cfg, symbols=SYMBOLS[1:])
+
+    assert evolved.path == cfg.path
+    assert evolved.symbols == SYMBOLS[1:]
+
+
+def test_missing_files():
+    with pytest.raises(ValueError):
+        CSVCfg(path=[], symbols=SYMBOLS, interval="1h")
+
+
+def test_load(csv_folder, make_prices):
+    frames = CSVLoader().loader().load(CSVCfg(path=csv_folder, symbols=SYMBOLS[::-1], interval="1h"))
+
+    for symbol, df in zip(SYMBOLS[::-1], frames):
+        ref = make_prices(symbol, 300, seed=SYMBOLS.index(symbol))
+        assert (df["symbol"] == symbol).all()
+        np.testing.assert_array_equal(df.index.asi8, ref.index.asi8)
+        np.testing.assert_allclose(df[["open", "high", "low", "close", "volume"]].to_numpy(),
+                                   ref[["open", "high", "low", "close", "volume"]].to_numpy())
+
+
+def test_ingest_in_chunks(csv_folder, tmp_path_factory):
+    cfg = CSVCfg(path=csv_folder, symbols=SYMBOLS, interval="1h", chunksize=64)
+    store = OHLCVStore(tmp_path_factory.mktemp("store"))
+    CSVLoader().loader().ingest(cfg, store)
+
+    for symbol, df in zip(SYMBOLS, CSVLoader().loader().load(cfg)):
+        res = store.read("CSV", symbol, cfg.interval)
+        np.testing.assert_array_equal(res.index.asi8, df.index.asi8)
+        np.testing.assert_array_equal(res["close"].to_numpy(), df["close"].to_numpy())
@@ -0,0 +1,95 @@
+import ccxt
+import numpy as np
+import pytest
+
+from arcana.price_data import CCTXCfg, CCTXLoader
+from arcana.price_data.clients import client_pool
+from arcana.price_data.download import TokenBucket, download_all, retry
+
+SYMBOLS = ["BINANCE:BTCUSDT", "BYBIT:ETHUSDT", "BINANCE:SOLUSDT", "OKX:BTCUSDT", "BYBIT:SOLUSDT"]
+
+
+def _cfg(symbols=SYMBOLS, **kwargs):
+    return CCTXCfg(interval="1h", symbols=symbols, limit=200, max_workers=4, rate=1e6, burst=100, backoff=0, **kwargs)
+
+
+def test_symbols_keep_their_order(fake_exchange):
+    frames = CCTXLoader(exchange_factory=fake_exchange).loader().load(_cfg())
+
+    assert len(frames) == len(SYMBOLS)
+    for symbol, df in zip(SYMBOLS, frames):
+        ticker = symbol.split(":")[1].replace("USDT", "/USDT")
+        dates = df.index.asi8 // 10**6
+        assert (df["symbol"] == symbol).all()
+        assert len(df) == 200 - 2  # two candles are missing in the last 200
+        assert dates[-1] == fake_exchange.START + 999 * 3_600_000
+        np.testing.assert_array_equal(df["close"].to_numpy(), dates / 1e9 + len(ticker))
+
+
+def test_one_client_per_exchange(fake_exchange):
+    CCTXLoader(exchange_factory=fake_exchange).loader().load(_cfg())
+
+    for exchange_id, n_symbols in [("BINANCE", 2), ("BYBIT", 2), ("OKX", 1)]:
+        exchange = client_pool.exchange(exchange_id, fake_exchange)
+        assert exchange.exchange_id == exchange_id
+        assert len(exchange.requests) == n_symbols
+
+
+def test_network_errors_are_retried(fake_exchange):
+    fake_exchange.failures = 2
+    frames = CCTXLoader(exchange_factory=fake_exchange).loader().load(_cfg(["BINANCE:BTCUSDT"], retries=2))
+
+    assert len(frames[0]) == 198
+    assert len(client_pool.exchange("BINANCE", fake_exchange).requests) == 3
+
+
+def test_retries_are_limited(fake_exchange):
+    fake_exchange.failures = 3
+    with pytest.raises(ccxt.NetworkError):
+        CCTXLoader(exchange_factory=fake_exchange).loader().load(_cfg(["BINANCE:BTCUSDT"], retries=2))
+
+
+def test_retry_backoff():
+    delays = []
+    calls = iter([OSError(), OSError(), OSError(), "done"])
+
+    def fn():
+        res = next(calls)
+        if isinstance(res, Exception):
+            raise res
+        return res
+
+    assert retry(fn, retries=3, backoff=1.0, retry_on=(OSError,), max_backoff=3.0, sleep_=delays.append) == "done"
+    # up to a half of every delay is jitter
+    for delay, full in zip(delays, [1.0, 2.0, 3.0]):
+        assert full / 2 <= delay <= full
+
+
+def test_retry_raises_other_errors_immediately():
+    def fn():
+        raise KeyError("BTCUSDT")
+
+    with pytest.raises(KeyError):
+        retry(fn, retries=3, backoff=1.0, retry_on=(OSError,), sleep_=pytest.fail)
+
+
+def test_token_bucket():
+    now = [0.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    bucket = TokenBucket(2.0, 3, clock=lambda: now[0], sleep_=sleep)
+    for _ in range(3):
+        bucket.acquire()
+    assert now[0] == 0.0
+    # then 2 requests per second
+    for _ in range(4):
+        bucket.acquire()
+    assert now[0] == pytest.approx(2.0)
+
+
+def test_download_all_keeps_order():
+    symbols = [f"S{i}" for i in range(20)]
+
+    assert download_all(str.lower, symbols, max_workers=8) == [symbol.lower() for symbol in symbols]
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from arcana.indicators import (SMA, EMA, WMA, RMA, TEMA, DEMA, HMA, SMACfg, EMACfg, WMACfg, RMACfg, TEMACfg, DEMACfg,
+                               MovingAverageGridCfg)
+
+GRID_MOVING_AVERAGES = [(SMA, SMACfg), (EMA, EMACfg), (WMA, WMACfg), (RMA, RMACfg), (TEMA, TEMACfg), (DEMA, DEMACfg)]
+PERIODS = (1, 2, 5, 14, 50, 200)
+
+
+@pytest.mark.parametrize("indicator, cfg", GRID_MOVING_AVERAGES, ids=[ma[0].name() for ma in GRID_MOVING_AVERAGES])
+def test_grid_columns_equal_single_period(make_prices, indicator, cfg):
+    prices = [make_prices("BINANCE:BTCUSDT", 400, seed=1), make_prices("BINANCE:ETHUSDT", 120, seed=2)]
+    grid = indicator.compute_grid(prices, grid_cfg=MovingAverageGridCfg(user_name="g", src="close", periods=PERIODS))
+
+    for res, df in zip(grid, prices):
+        assert list(res.columns[1:]) == [f"g_{period}" for period in PERIODS]
+        for period in PERIODS:
+            ref = indicator.compute([df], ma_cfg=cfg(user_name="ma", src="close", period=period), register=False)[0]
+            np.testing.assert_allclose(res[f"g_{period}"].to_numpy(), ref["ma"].to_numpy(), rtol=1e-12, atol=1e-9,
+                                       err_msg=f"period {period}")
+
+
+def test_grid_float32_uses_single_precision_kernels(make_prices):
+    df = make_prices("BINANCE:BTCUSDT", 300)
+    grid = EMA.compute_grid([df], grid_cfg=MovingAverageGridCfg(user_name="g", src="close", periods=(5, 20),
+                                                                 precision="float32"))[0]
+
+    for period in (5, 20):
+        ref = EMA.compute([df], ma_cfg=EMACfg(user_name="ma", src="close", period=period, precision="float32"),
+                          register=False)[0]
+        assert grid[f"g_{period}"].dtype == np.float32
+        np.testing.assert_array_equal(grid[f"g_{period}"].to_numpy(), ref["ma"].to_numpy())
+
+
+def test_grid_requires_grid_kernel(make_prices):
+    with pytest.raises(ValueError):
+        HMA.compute_grid([make_prices("BINANCE:BTCUSDT", 50)],
+                         grid_cfg=MovingAverageGridCfg(user_name="g", src="close", periods=(5,)))
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from arcana.price_data import Resampler
+
+AGGREGATION = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+
+
+def pandas_resample(df: pd.DataFrame, rule: str, **kwargs) -> pd.DataFrame:
+    """Resample with pandas, dropping the buckets without bars."""
+    grouped = df[list(AGGREGATION)].resample(rule, closed="left", label="left", **kwargs)
+    res = grouped.agg(AGGREGATION)
+    return res[grouped.size() > 0]
+
+
+@pytest.fixture
+def minutes(make_prices):
+    df = make_prices("BINANCE:BTCUSDT", 3 * 24 * 60, freq="min", start="2024-02-27 13:07")
+    # missing bars, including whole hours
+    rng = np.random.default_rng(7)
+    keep = rng.random(len(df)) > 0.1
+    keep[600:800] = False
+    return df[keep]
+
+
+@pytest.mark.parametrize("interval, rule", [("5m", "5min"), ("15m", "15min"), ("1h", "h"), ("4h", "4h"), ("1D", "D")])
+def test_intraday_matches_pandas(minutes, interval, rule):
+    res = Resampler(interval, source="1m").resample(minutes)
+    ref = pandas_resample(minutes, rule, origin="epoch")
+
+    assert (res["symbol"] == "BINANCE:BTCUSDT").all()
+    pd.testing.assert_frame_equal(res[list(AGGREGATION)], ref, check_freq=False)
+
+
+def test_session_offset_matches_pandas(minutes):
+    res = Resampler("1h", source="1m", offset="30min").resample(minutes)
+    ref = pandas_resample(minutes, "h", origin="epoch", offset="30min")
+
+    pd.testing.assert_frame_equal(res[list(AGGREGATION)], ref, check_freq=False)
+
+
+@pytest.mark.parametrize("interval, rule", [("W1", "W-MON"), ("M1", "MS"), ("M3", "QS-JAN"), ("M12", "YS")])
+def test_calendar_matches_pandas(make_prices, interval, rule):
+    days = make_prices("BINANCE:BTCUSDT", 800, freq="D", start="2023-01-03").iloc[::2]
+    res = Resampler(interval, source="1D").resample(days)
+    ref = pandas_resample(days, rule)
+
+    pd.testing.assert_frame_equal(res[list(AGGREGATION)], ref, check_freq=False)
+
+
+def test_time_zone_keeps_the_index_zone(make_prices):
+    # crosses the switch to summer time (a 23 hour day)
+    df = make_prices("BINANCE:BTCUSDT", 96, freq="h", start="2024-03-29", tz="Europe/Warsaw")
+    res = Resampler("1D", source="1h", tz="Europe/Warsaw").resample(df)
+    ref = pandas_resample(df, "D")
+
+    assert str(res.index.tz) == "Europe/Warsaw"
+    pd.testing.assert_frame_equal(res[list(AGGREGATION)], ref, check_freq=False)
+
+
+def test_incremental_equals_full_resample(minutes):
+    resampler = Resampler("1h", source="1m")
+    incremental = resampler.incremental(minutes.iloc[:1000])
+    for start in range(1000, len(minutes), 337):
+        incremental.update(minutes.iloc[start:start + 337])
+
+    pd.testing.assert_frame_equal(incremental.frame, resampler.resample(minutes), check_freq=False)
+
+
+def test_empty_frame(make_prices):
+    empty = make_prices("BINANCE:BTCUSDT", 0, freq="min")
+    res = Resampler("1h", source="1m").resample(empty)
+
+    assert len(res) == 0
+    assert list(res.columns) == list(empty.columns)
+
+
+def test_invalid_target_interval():
+    with pytest.raises(ValueError):
+        Resampler("1h", source="45m")
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from arcana.indicators import SMA, EMA, SMACfg, EMACfg, compute_sharded
+from arcana.indicators.sharding import _shard_cfg
+from arcana.price_data import CSVCfg, CSVLoader, PriceData
+
+SYMBOLS = ["BINANCE:BTCUSDT", "BINANCE:ETHUSDT", "BYBIT:SOLUSDT", "OKX:BTCUSDT", "OKX:ETHUSDT"]
+JOBS = [(SMA, SMACfg(user_name="sma", src="close", period=10)), (EMA, EMACfg(user_name="ema", src="close", period=20))]
+
+
+@pytest.fixture
+def csv_cfg(tmp_path, make_prices):
+    for seed, symbol in enumerate(SYMBOLS):
+        df = make_prices(symbol, 100 + 50 * seed, seed=seed).drop(columns="symbol")
+        df.to_csv(tmp_path / f"{symbol.replace(':', '_')}.csv")
+    return CSVCfg(path=tmp_path, symbols=SYMBOLS, interval="1h")
+
+
+def test_csv_shard_keeps_its_files(csv_cfg):
+    shard = _shard_cfg(csv_cfg, SYMBOLS[1:3])
+
+    assert shard.symbols == SYMBOLS[1:3]
+    assert [path.stem for path in shard.path] == ["BINANCE_ETHUSDT", "BYBIT_SOLUSDT"]
+
+
+def test_csv_shard_without_file(csv_cfg):
+    with pytest.raises(KeyError):
+        _shard_cfg(CSVCfg(path=csv_cfg.path[:2], symbols=SYMBOLS, interval="1h"), SYMBOLS[:2])
+
+
+def test_sharded_csv_equals_single_process(csv_cfg):
+    prices, results = compute_sharded(CSVLoader(), csv_cfg, JOBS, max_workers=2, n_shards=3, register=False)
+
+    price_data = PriceData(CSVLoader())
+    price_data.load(csv_cfg)
+    assert len(prices) == len(SYMBOLS)
+    for res, ref in zip(prices, price_data.prices_raw):
+        pd.testing.assert_frame_equal(res, ref, check_freq=False)
+    for (indicator, ind_cfg), indicators in zip(JOBS, results):
+        refs = indicator.compute(price_data.prices_raw, ma_cfg=ind_cfg, register=False)
+        for res, ref in zip(indicators, refs):
+            pd.testing.assert_frame_equal(res, ref, check_freq=False)
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from arcana.price_data import CCTXCfg, CCTXLoader, OHLCVStore, PriceData
+from arcana.price_data.clients import client_pool
+from arcana.price_data.dev_types import Interval
+
+SYMBOL = "BINANCE:BTCUSDT"
+
+
+@pytest.fixture
+def store(tmp_path):
+    return OHLCVStore(tmp_path)
+
+
+@pytest.mark.parametrize("tz", [None, "America/New_York"])
+def test_round_trip(store, make_prices, tz):
+    # three months of hourly bars, so three chunks
+    df = make_prices(SYMBOL, 24 * 80, freq="h", start="2024-01-15", tz=tz)
+    store.write("CCTX", SYMBOL, Interval.h1, df)
+
+    res = store.read("CCTX", SYMBOL, Interval.h1)
+    pd.testing.assert_frame_equal(res, df[res.columns], check_freq=False)
+    assert res.columns[0] == "symbol"
+    assert store.bounds("CCTX", SYMBOL, Interval.h1) == (df.index[0].value, df.index[-1].value, len(df))
+
+
+def test_overlapping_write_replaces_bars(store, make_prices):
+    df = make_prices(SYMBOL, 100, freq="h")
+    store.write("CCTX", SYMBOL, Interval.h1, df.iloc[:60])
+    newer = df.iloc[50:].copy()
+    newer["close"] += 1.0
+    store.write("CCTX", SYMBOL, Interval.h1, newer)
+
+    res = store.read("CCTX", SYMBOL, Interval.h1)
+    expected = pd.concat([df.iloc[:50], newer])
+    pd.testing.assert_frame_equal(res, expected[res.columns], check_freq=False)
+
+
+def test_read_range_and_tail(store, make_prices):
+    df = make_prices(SYMBOL, 24 * 70, freq="h", start="2024-01-20")
+    store.write("CCTX", SYMBOL, Interval.h1, df)
+
+    res = store.read("CCTX", SYMBOL, Interval.h1, start="2024-02-10", end="2024-03-02 05:00")
+    expected = df.loc["2024-02-10":"2024-03-02 04:00"]
+    pd.testing.assert_frame_equal(res, expected[res.columns], check_freq=False)
+
+    tail = store.read("CCTX", SYMBOL, Interval.h1, tail=30)
+    pd.testing.assert_frame_equal(tail, df.iloc[-30:][tail.columns], check_freq=False)
+
+
+def test_missing_partition(store):
+    assert store.read("CCTX", SYMBOL, Interval.h1) is None
+    assert store.bounds("CCTX", SYMBOL, Interval.h1) is None
+    with pytest.raises(KeyError):
+        store.delete("CCTX", SYMBOL, Interval.h1)
+
+
+def test_delete(store, make_prices):
+    store.write("CCTX", SYMBOL, Interval.h1, make_prices(SYMBOL, 10))
+    store.delete("CCTX", SYMBOL, Interval.h1)
+
+    assert store.read("CCTX", SYMBOL, Interval.h1) is None
+
+
+def _cfg(since, until, symbols=(SYMBOL, "BYBIT:ETHUSDT")):
+    return CCTXCfg(interval="1h", symbols=list(symbols), limit=100, since=since, until=until, rate=1e6, burst=100)
+
+
+def _requested(fake_exchange, exchange_id: str) -> list[int]:
+    exchange = client_pool.exchange(exchange_id, fake_exchange)
+    since = [since for _, since in exchange.requests]
+    exchange.requests.clear()
+    return since
+
+
+def test_load_stored_fetches_only_gaps(store, fake_exchange):
+    price_data = PriceData(CCTXLoader(exchange_factory=fake_exchange), store=store)
+    price_data.load(_cfg("2024-01-10", "2024-01-20"))
+    first = [df.copy() for df in price_data.prices_raw]
+    assert _requested(fake_exchange, "BINANCE")
+    stored_first, stored_last, _ = store.bounds("CCTX", SYMBOL, Interval.h1)
+
+    # only the last stored bar (it may have been still forming) is requested again
+    price_data.load(_cfg("2024-01-10", "2024-01-20"))
+    assert _requested(fake_exchange, "BINANCE") == [stored_last // 10**6]
+    for res, ref in zip(price_data.prices_raw, first):
+        pd.testing.assert_frame_equal(res, ref)
+
+    price_data.load(_cfg("2024-01-05", "2024-01-25"))
+    requested = _requested(fake_exchange, "BINANCE")
+    assert min(requested) == pd.Timestamp("2024-01-05").value // 10**6
+    assert all(since < stored_first // 10**6 or since >= stored_last // 10**6 for since in requested)
+
+    direct = PriceData(CCTXLoader(exchange_factory=fake_exchange))
+    direct.load(_cfg("2024-01-05", "2024-01-25"))
+    for res, ref in zip(price_data.prices_raw, direct.prices_raw):
+        np.testing.assert_array_equal(res.index.asi8, ref.index.asi8)
+        np.testing.assert_array_equal(res["close"].to_numpy(), ref["close"].to_numpy())
+
+
+def test_load_stored_without_data(store, fake_exchange):
+    # the exchange has no candles before its first one, so nothing is stored
+    price_data = PriceData(CCTXLoader(exchange_factory=fake_exchange), store=store)
+    price_data.load(_cfg("2023-01-01", "2023-01-05"))
+
+    assert len(price_data.prices_raw) == 2
+    for df in price_data.prices_raw:
+        assert len(df) == 0
+        assert list(df.columns) == ["symbol", "open", "high", "low", "close", "volume"]
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from arcana.indicators import (SMA, ESMA, EMA, WMA, RMA, HMA, FRAMA, TEMA, DEMA, KAMA, SMACfg, ESMACfg, EMACfg, WMACfg,
+                               RMACfg, HMACfg, FRAMACfg, TEMACfg, DEMACfg, KAMACfg)
+from arcana.indicators.streaming import streaming_counterpart
+
+MOVING_AVERAGES = [
+    (SMA, SMACfg, {}),
+    (ESMA, ESMACfg, {"alpha": 0.3}),
+    (EMA, EMACfg, {}),
+    (WMA, WMACfg, {}),
+    (RMA, RMACfg, {}),
+    (HMA, HMACfg, {}),
+    (TEMA, TEMACfg, {}),
+    (DEMA, DEMACfg, {}),
+    (KAMA, KAMACfg, {"n_fast": 2, "n_slow": 30}),
+    (FRAMA, FRAMACfg, {}),
+]
+
+
+@pytest.fixture
+def prices(make_prices):
+    df = make_prices("BINANCE:BTCUSDT", 800)
+    # a flat stretch (no efficiency, no fractal dimension)
+    df.iloc[300:340, df.columns.get_indexer(["open", "high", "low", "close"])] = 100.0
+    return df
+
+
+@pytest.mark.parametrize("indicator, cfg, kwargs", MOVING_AVERAGES, ids=[ma[0].name() for ma in MOVING_AVERAGES])
+@pytest.mark.parametrize("period", [1, 2, 7, 20])
+@pytest.mark.parametrize("split", [0, 5, 20, 21, 400])
+def test_streaming_equals_full_recompute(prices, indicator, cfg, kwargs, period, split):
+    ma_cfg = cfg(user_name="ma", src="close", period=period, **kwargs)
+    full = indicator.compute([prices], ma_cfg=ma_cfg, register=False)[0]["ma"].to_numpy()
+
+    stream = streaming_counterpart(indicator).from_compute(prices.iloc[:split], ma_cfg=ma_cfg)
+    values = np.array([stream.update(bar) for bar in prices.iloc[split:][["close", "high", "low"]].to_dict("records")])
+
+    ref = full[split:]
+    assert np.array_equal(np.isfinite(values), np.isfinite(ref))
+    finite = np.isfinite(ref)
+    np.testing.assert_allclose(values[finite], ref[finite], rtol=1e-9, atol=1e-9)
+    assert stream.n_bars == len(prices)
+    if len(ref):
+        np.testing.assert_equal(stream.value, values[-1])